@@ -4,13 +4,59 @@ import numpy as np
 
 ROOT = Path(__file__).resolve().parents[1]
 EXAMPLES = ROOT / "data" / "examples"
-EXAMPLES.mkdir(parents=True, exist_ok=True)
 
-idx = pd.date_range("2020-01-01", periods=30, freq="B")
-np.random.seed(42)
 
-for t in ["SPY", "QQQ", "IWM"]:
-	ret = pd.Series(np.random.normal(0.0005, 0.01, size=len(idx)), index=idx, name=t)
-	ret.to_csv(EXAMPLES / f"{t}_returns.csv", header=True)
+def synthetic_returns(
+	n_tickers: int,
+	n_bars: int,
+	seed: int = 42,
+	start: str = "2000-01-03",
+	freq: str = "B",
+	mu: float = 0.0005,
+	sigma: float = 0.01,
+) -> pd.DataFrame:
+	"""Wide (n_bars x n_tickers) frame of i.i.d. normal returns with columns T0000, T0001, ..."""
+	rng = np.random.default_rng(seed)
+	idx = pd.date_range(start, periods=n_bars, freq=freq)
+	cols = [f"T{i:04d}" for i in range(n_tickers)]
+	return pd.DataFrame(rng.normal(mu, sigma, size=(n_bars, n_tickers)), index=idx, columns=cols)
 
-print(f"Wrote sample returns to {EXAMPLES}")
+
+def synthetic_ohlcv(n_tickers: int, n_bars: int, seed: int = 42, **kwargs) -> pd.DataFrame:
+	"""Long-format OHLCV frame with the same columns as ``fetch_ohlc`` output."""
+	rets = synthetic_returns(n_tickers, n_bars, seed=seed, **kwargs)
+	rng = np.random.default_rng(seed + 1)
+	close = 100.0 * (1.0 + rets).cumprod()
+	frames = []
+	for t in close.columns:
+		c = close[t].to_numpy()
+		o = np.concatenate([[c[0]], c[:-1]])
+		spread = np.abs(rng.normal(0.0, 0.005, size=len(c))) * c
+		frames.append(pd.DataFrame({
+			"ticker": t,
+			"datetime": close.index,
+			"open": o,
+			"high": np.maximum(o, c) + spread,
+			"low": np.minimum(o, c) - spread,
+			"close": c,
+			"adj_close": c,
+			"volume": rng.integers(100_000, 1_000_000, size=len(c)),
+		}))
+	return pd.concat(frames, ignore_index=True)
+
+
+def main() -> None:
+	EXAMPLES.mkdir(parents=True, exist_ok=True)
+
+	idx = pd.date_range("2020-01-01", periods=30, freq="B")
+	np.random.seed(42)
+
+	for t in ["SPY", "QQQ", "IWM"]:
+		ret = pd.Series(np.random.normal(0.0005, 0.01, size=len(idx)), index=idx, name=t)
+		ret.to_csv(EXAMPLES / f"{t}_returns.csv", header=True)
+
+	print(f"Wrote sample returns to {EXAMPLES}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,162 @@
+"""Performance benchmarks for the backtesting, risk and data paths.
+
+Usage (from the GatorAI/ root):
+
+    python scripts/run_benchmarks.py run --tiers small medium --output benchmarks/baseline.json
+    python scripts/run_benchmarks.py run --output benchmarks/current.json --compare benchmarks/baseline.json
+    python scripts/run_benchmarks.py compare benchmarks/baseline.json benchmarks/current.json --threshold 0.25
+
+``compare`` (and ``run --compare``) exits with status 1 when any benchmark's
+median time exceeds its baseline by more than ``threshold``.
+"""
+from pathlib import Path
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Ensure the packages under GatorAI/src are importable when running this script directly.
+root = Path(__file__).resolve().parents[1]
+src_path = str(root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import numpy as np
+import pandas as pd
+
+from backtesting.backtest_engine import run_vectorized_backtest
+from backtesting.backtest_runner import run_csv_backtest
+from backtesting.bootstrap import bootstrap_metrics
+from backtesting.metrics import compute_metrics, max_drawdown
+from optimization.optimizer import mean_variance_optimize
+from optimization.risk_models import ewma_covariance, factor_covariance
+from generate_sample_data import synthetic_ohlcv, synthetic_returns
+
+# (n_tickers, n_bars) per size tier
+TIERS = {
+    "small": (10, 1_000),
+    "medium": (100, 5_000),
+    "large": (500, 20_000),
+}
+
+
+def _time(func, repeat: int) -> dict:
+    func()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    return {"median": statistics.median(samples), "min": min(samples), "repeat": repeat}
+
+
+def run_tier(tier: str, repeat: int, workdir: Path) -> dict:
+    n_tickers, n_bars = TIERS[tier]
+    returns = synthetic_returns(n_tickers, n_bars)
+    prices = 100.0 * (1.0 + returns).cumprod()
+    price = prices.iloc[:, 0]
+    signal = (price > price.rolling(50, min_periods=1).mean()).astype(float)
+
+    long_df = synthetic_ohlcv(1, n_bars)
+    csv_path = workdir / f"{tier}_1d.csv"
+    long_df.to_csv(csv_path, index=False)
+
+    def csv_load():
+        df = pd.read_csv(csv_path)
+        df["datetime"] = pd.to_datetime(df["datetime"])
+        return df
+
+    benches = {
+        "run_vectorized_backtest": lambda: run_vectorized_backtest(price, signal, cost_bps=1.0),
+        "run_csv_backtest": lambda: run_csv_backtest(csv_path, cost_bps=1.0),
+        "csv_load": csv_load,
+        "ewma_covariance": lambda: ewma_covariance(returns),
+        "mean_variance_optimize": lambda: mean_variance_optimize(returns),
+        "factor_mean_variance": lambda: mean_variance_optimize(returns, cov=factor_covariance(returns)),
+        "max_drawdown": lambda: max_drawdown(price),
+        "compute_metrics": lambda: compute_metrics(returns),
+        "bootstrap_metrics": lambda: bootstrap_metrics(returns.iloc[:, 0], n_paths=1_000, seed=0),
+    }
+    results = {}
+    for name, func in benches.items():
+        res = _time(func, repeat)
+        res.update({"n_tickers": n_tickers, "n_bars": n_bars})
+        results[f"{tier}/{name}"] = res
+        print(f"{tier:7s} {name:25s} median {res['median'] * 1e3:10.3f} ms")
+    return results
+
+
+def run(tiers, repeat: int) -> dict:
+    logging.disable(logging.INFO)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for tier in tiers:
+            results.update(run_tier(tier, repeat, Path(tmp)))
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    """Print a comparison table; return False if any benchmark regressed beyond ``threshold``."""
+    ok = True
+    for name, cur in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:35s} (new)")
+            continue
+        ratio = cur["median"] / base["median"] if base["median"] > 0 else float("inf")
+        flag = ""
+        if ratio > 1.0 + threshold:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{name:35s} {base['median'] * 1e3:10.3f} ms -> {cur['median'] * 1e3:10.3f} ms  x{ratio:5.2f}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Run benchmarks and write a JSON result file")
+    p_run.add_argument("--tiers", nargs="+", choices=list(TIERS), default=["small", "medium"])
+    p_run.add_argument("--repeat", type=int, default=5)
+    p_run.add_argument("--output", type=Path, default=root / "benchmarks" / "baseline.json")
+    p_run.add_argument("--compare", type=Path, help="Baseline JSON to compare against after running")
+    p_run.add_argument("--threshold", type=float, default=0.25)
+
+    p_cmp = sub.add_parser("compare", help="Compare two JSON result files")
+    p_cmp.add_argument("baseline", type=Path)
+    p_cmp.add_argument("current", type=Path)
+    p_cmp.add_argument("--threshold", type=float, default=0.25)
+
+    args = parser.parse_args()
+    if args.command == "run":
+        report = run(args.tiers, args.repeat)
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.output}")
+        if args.compare is None:
+            return
+        baseline, current = json.loads(args.compare.read_text()), report
+    else:
+        baseline, current = json.loads(args.baseline.read_text()), json.loads(args.current.read_text())
+
+    if not compare(baseline, current, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,20 @@ src_path = str(root / "src")
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
-from backtesting.backtest_runner import run_csv_backtest
+from backtesting.backtest_runner import run_csv_backtest, run_directory_backtest
 
 """The testing file is in the data/processed directory"""
 def main():
     # Pick one of your processed CSVs (resolve relative to GatorAI/ root)
     data_dir = Path(__file__).resolve().parents[1] / "data"
-    csv_path = data_dir / "processed" / "SPY_1d.csv"
+    csv_path = Path(sys.argv[1]) if len(sys.argv) > 1 else data_dir / "processed" / "SPY_1d.csv"
+
+    # A directory or glob runs every CSV in parallel
+    if csv_path.is_dir() or any(ch in str(csv_path) for ch in "*?["):
+        results = run_directory_backtest(csv_path, price_col="adj_close", cost_bps=1.0)
+        print("=== Backtest Results ===")
+        print(results.to_string())
+        return
 
     # If the expected CSV is missing, provide a clear message and exit
     if not csv_path.exists():
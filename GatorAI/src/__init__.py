@@ -5,4 +5,5 @@ __all__ = [
 	"backtesting",
 	"optimization",
 	"dashboard",
+	"instrumentation",
 ]
@@ -1,19 +1,27 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
+try:
+	from ..instrumentation import instrument
+except ImportError:  # src/ itself is on sys.path, so the subpackages are top-level
+	from instrumentation import instrument
+
+from .metrics import compute_metrics
+
 
 @dataclass
 class BacktestResult:
 	returns: pd.Series
 	equity_curve: pd.Series
-	stats: Dict[str, float]
+	stats: Dict[str, Any]
 
 
+@instrument(rows=lambda res, *args, **kwargs: len(res.returns))
 def run_vectorized_backtest(
 	prices: pd.Series,
 	signal: pd.Series,
@@ -27,36 +35,161 @@ def run_vectorized_backtest(
 	cost = (pos.diff().abs().fillna(0.0)) * (cost_bps / 10000.0)
 	net = gross - cost
 	equity = (1.0 + net).cumprod()
-	# Annualization settings (assumes daily data by default)
-	periods_per_year = 252.0
+	# Annualization assumes daily data; every stat comes from one kernel call
+	stats = compute_metrics(net, equity=equity, positions=pos, periods_per_year=252.0)
+	return BacktestResult(returns=net, equity_curve=equity, stats=stats)
+
+
+@dataclass
+class BatchBacktestResult:
+	"""Column-wise output of :func:`run_batched_backtest`.
+
+	Arrays keep the layout of the input signals: ``(time, assets)`` for a single
+	signal matrix, ``(strategies, time, assets)`` for a stack of them. Stats
+	drop the time axis.
+	"""
+	returns: np.ndarray
+	equity_curve: np.ndarray
+	stats: Dict[str, np.ndarray]
+	index: Optional[pd.Index] = None
+	columns: Optional[pd.Index] = None
+
+	def stats_frame(self) -> pd.DataFrame:
+		"""Stats as a DataFrame, one row per asset (and strategy, for stacks)."""
+		flat = {k: np.asarray(v).reshape(-1) for k, v in self.stats.items()}
+		columns = self.columns if self.columns is not None else pd.RangeIndex(self.returns.shape[-1])
+		if self.returns.ndim == 2:
+			return pd.DataFrame(flat, index=columns)
+		index = pd.MultiIndex.from_product(
+			[range(self.returns.shape[0]), columns], names=["strategy", "asset"]
+		)
+		return pd.DataFrame(flat, index=index)
+
+	def to_results(self) -> List[BacktestResult]:
+		"""Build one :class:`BacktestResult` per column (flattened over strategies)."""
+		n_time, n_assets = self.returns.shape[-2:]
+		index = self.index if self.index is not None else pd.RangeIndex(n_time)
+		net = self.returns.reshape(-1, n_time, n_assets)
+		equity = self.equity_curve.reshape(-1, n_time, n_assets)
+		stats = {k: np.asarray(v).reshape(-1) for k, v in self.stats.items()}
+		results = []
+		for s in range(net.shape[0]):
+			for j in range(n_assets):
+				k = s * n_assets + j
+				results.append(BacktestResult(
+					returns=pd.Series(net[s, :, j], index=index),
+					equity_curve=pd.Series(equity[s, :, j], index=index),
+					stats={name: float(values[k]) for name, values in stats.items()},
+				))
+		return results
+
+
+def _simulate_batch(
+	asset_returns: np.ndarray,
+	signals: np.ndarray,
+	cost_bps: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	# Time runs along axis -2; ``asset_returns`` broadcasts against ``signals``.
+	pos = np.zeros_like(signals)
+	pos[..., 1:, :] = signals[..., :-1, :]
+	net = pos * asset_returns
+	if cost_bps:
+		turnover = np.abs(np.diff(pos, axis=-2, prepend=0.0))
+		net -= turnover * (cost_bps / 10000.0)
+	equity = np.cumprod(1.0 + net, axis=-2)
+	return net, equity, pos
+
+
+@instrument(rows=lambda res, *args, **kwargs: res.returns.size)
+def run_batched_backtest(
+	prices: Union[pd.DataFrame, np.ndarray],
+	signals: Union[pd.DataFrame, np.ndarray],
+	cost_bps: float = 0.0,
+	periods_per_year: float = 252.0,
+	returns: Optional[Union[pd.DataFrame, np.ndarray]] = None,
+) -> BatchBacktestResult:
+	"""Backtest every column of a (time x assets) price matrix in one NumPy pass.
 
-	# Use number of return observations (after alignment) as the period count
-	n_periods = int(net.dropna().shape[0])
+	Uses the same model as :func:`run_vectorized_backtest` (signal shifted one
+	bar, flat ``cost_bps`` on position changes), but without per-column pandas
+	alignment. Inputs must already share one time index; missing prices give a
+	zero return and missing signals a flat position.
 
-	# CAGR: (final_equity) ** (periods_per_year / n_periods) - 1
-	if n_periods <= 1 or equity.empty:
-		cagr = 0.0
+	Args:
+		prices: Price matrix of shape (time, assets)
+		signals: Signal matrix of shape (time, assets), or a stack of them with
+			shape (strategies, time, assets) evaluated against the same prices
+		cost_bps: Transaction costs in basis points (default: 0.0)
+		periods_per_year: Annualization factor (default: 252 for daily bars)
+		returns: Precomputed simple asset returns with the shape of ``prices``
+			(e.g. ``ReturnsPanel.simple``); used instead of dividing prices
+
+	Returns:
+		BatchBacktestResult with per-column returns, equity and stats. Call
+		``to_results()`` to get per-asset ``BacktestResult`` objects.
+
+	Raises:
+		ValueError: If shapes of prices and signals do not match
+	"""
+	index = prices.index if isinstance(prices, pd.DataFrame) else None
+	columns = prices.columns if isinstance(prices, pd.DataFrame) else None
+	if isinstance(signals, pd.DataFrame):
+		if index is not None:
+			signals = signals.reindex(index=index, columns=columns)
+		signals = signals.to_numpy(dtype=np.float64)
+	px = np.asarray(prices, dtype=np.float64)
+	sig = np.nan_to_num(np.asarray(signals, dtype=np.float64), nan=0.0)
+
+	if px.ndim != 2:
+		raise ValueError(f"prices must be 2-D (time x assets), got shape {px.shape}")
+	if sig.ndim not in (2, 3) or sig.shape[-2:] != px.shape:
+		raise ValueError(f"signals shape {sig.shape} does not match prices shape {px.shape}")
+
+	if returns is not None:
+		asset_returns = np.array(returns, dtype=np.float64)
+		if asset_returns.shape != px.shape:
+			raise ValueError(f"returns shape {asset_returns.shape} does not match prices shape {px.shape}")
 	else:
-		try:
-			cagr = float(equity.iloc[-1] ** (periods_per_year / float(n_periods)) - 1.0)
-		except Exception:
-			cagr = 0.0
-
-	# Volatility: annualized std of net returns
-	try:
-		vol = float(net.std() * np.sqrt(periods_per_year)) if n_periods > 1 else 0.0
-	except Exception:
-		vol = 0.0
-
-	# Sharpe: annualized mean / annualized std = (mean * periods_per_year) / (std * sqrt(periods_per_year))
-	try:
-		std = net.std()
-		if std is None or std == 0 or np.isnan(std) or n_periods <= 1:
-			sharpe = 0.0
-		else:
-			sharpe = float((net.mean() * periods_per_year) / (std * np.sqrt(periods_per_year)))
-	except Exception:
-		sharpe = 0.0
-
-	stats = {"cagr": cagr, "vol": vol, "sharpe": sharpe}
+		asset_returns = np.zeros_like(px)
+		with np.errstate(invalid="ignore", divide="ignore"):
+			asset_returns[1:] = px[1:] / px[:-1] - 1.0
+	asset_returns[~np.isfinite(asset_returns)] = 0.0
+
+	net, equity, pos = _simulate_batch(asset_returns, sig, cost_bps)
+	stats = compute_metrics(net, equity=equity, positions=pos, periods_per_year=periods_per_year, axis=-2)
+	return BatchBacktestResult(
+		returns=net,
+		equity_curve=equity,
+		stats=stats,
+		index=index,
+		columns=columns,
+	)
+
+
+def run_portfolio_backtest(
+	prices: pd.DataFrame,
+	weights: pd.DataFrame,
+	cost_bps: float = 0.0,
+	periods_per_year: float = 252.0,
+) -> BacktestResult:
+	"""Backtest a portfolio from a (time x assets) target weight matrix.
+
+	Weights set at bar ``t`` are held from ``t + 1``, as in the single-asset
+	engine, and costs are charged on the absolute change of every weight. The
+	portfolio return is the sum of the per-asset returns of the batched engine.
+
+	Args:
+		prices: Price matrix of shape (time, assets)
+		weights: Target weights with the same index and columns (missing = 0)
+		cost_bps: Transaction costs in basis points per unit of turnover
+		periods_per_year: Annualization factor (default: 252 for daily bars)
+
+	Returns:
+		BacktestResult of the combined portfolio
+	"""
+	batch = run_batched_backtest(prices, weights, cost_bps=cost_bps, periods_per_year=periods_per_year)
+	net = pd.Series(batch.returns.sum(axis=-1), index=prices.index)
+	equity = (1.0 + net).cumprod()
+	stats = compute_metrics(net, equity=equity, periods_per_year=periods_per_year)
+	stats["turnover"] = float(batch.stats["turnover"].sum())
 	return BacktestResult(returns=net, equity_curve=equity, stats=stats)
@@ -1,30 +1,49 @@
 from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
 from pathlib import Path
-from typing import Dict, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import math
+import os
 import pandas as pd
 import logging
+try:
+    from ..data.clean_data import drop_missing
+    from ..data.memmap_panel import PricePanel, open_price_panel
+    from ..data.store import read_table
+    from ..instrumentation import instrument
+except ImportError:  # src/ itself is on sys.path, so the subpackages are top-level
+    from data.clean_data import drop_missing
+    from data.memmap_panel import PricePanel, open_price_panel
+    from data.store import read_table
+    from instrumentation import instrument
 from .backtest_engine import run_vectorized_backtest
-from .metrics import max_drawdown
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+@instrument(rows=lambda stats, *args, **kwargs: stats["n_obs"])
 def run_csv_backtest(
         file_path: Union[str, Path],
         price_col: str = 'adj_close',
         date_col: str = 'datetime',
         cost_bps: float = 0.0,
-) -> Dict[str, float]:
+) -> Dict[str, Any]:
     """Run a buy-and-hold backtest on price data from a CSV file.
+
+    Columnar store files (``.parquet``/``.feather`` parts or a ``data.store``
+    partition directory) are read directly, loading only the price column;
+    their ``datetime`` column is used as ``date_col``.
     
     Args:
-        file_path: Path to CSV file containing price data
+        file_path: Path to CSV file (or columnar store file/partition) containing price data
         price_col: Name of the price column (default: 'adj_close')
         date_col: Name of the date column (default: 'datetime')
         cost_bps: Transaction costs in basis points (default: 0.0)
         
     Returns:
-        Dictionary containing backtest statistics
+        Dictionary containing backtest statistics; ``max_drawdown_start`` and
+        ``max_drawdown_end`` are timestamps, the rest are numbers
         
     Raises:
         ValueError: If required columns are missing or data is invalid
@@ -36,13 +55,13 @@ def run_csv_backtest(
         raise FileNotFoundError(f"CSV file not found: {fp}")
     
     try:
-        df = pd.read_csv(fp)
+        if fp.is_dir() or fp.suffix in (".parquet", ".feather"):
+            df = read_table(fp, columns=[price_col]).rename(columns={"datetime": date_col})
+        else:
+            df = pd.read_csv(fp)
     except Exception as e:
         raise ValueError(f"Error reading CSV file {fp}: {e}")
     
-    # Clean the data - remove any malformed rows
-    df = df.dropna()
-    
     # Validate required columns
     if date_col not in df.columns:
         raise ValueError(f"Date column '{date_col}' not found in {fp}. Available columns: {list(df.columns)}")
@@ -50,6 +69,9 @@ def run_csv_backtest(
     if price_col not in df.columns:
         raise ValueError(f"Price column '{price_col}' not found in {fp}. Available columns: {list(df.columns)}")
     
+    # Clean the data - remove rows missing the date or price (other columns may be sparse)
+    df = drop_missing(df, subset=[date_col, price_col])
+    
     # Convert date column to datetime and sort
     try:
         df[date_col] = pd.to_datetime(df[date_col])
@@ -68,37 +90,179 @@ def run_csv_backtest(
     except Exception as e:
         raise ValueError(f"Error processing price column '{price_col}': {e}")
     
+    logger.info(f"Running backtest on {len(prices)} observations from {prices.index[0]} to {prices.index[-1]}")
+    
+    stats = _buy_and_hold_stats(prices, cost_bps)
+    
+    logger.info(f"Backtest completed: {stats['total_return']:.2%} total return, {stats['sharpe']:.2f} Sharpe ratio")
+    
+    return stats
+
+
+def _buy_and_hold_stats(prices: pd.Series, cost_bps: float) -> Dict[str, Any]:
+    """Run a buy-and-hold backtest on a price series and collect summary statistics."""
     # Create buy-and-hold signal (always 100% invested)
     signal = pd.Series(1.0, index=prices.index)
     
-    logger.info(f"Running backtest on {len(prices)} observations from {prices.index[0]} to {prices.index[-1]}")
-    
     # Run the backtest
     res = run_vectorized_backtest(prices=prices, signal=signal, cost_bps=cost_bps)
     
-    # Extract statistics
+    # Extract statistics (max drawdown is measured on the equity curve, not raw prices)
     stats = dict(res.stats)
     
-    # Calculate max drawdown on equity curve (not raw prices)
-    try:
-        stats["max_drawdown"] = max_drawdown(res.equity_curve)
-    except Exception as e:
-        logger.error(f"Error calculating max drawdown: {e}")
-        stats["max_drawdown"] = 0.0
-    
     # Add additional metrics
     stats["final_equity"] = float(res.equity_curve.iloc[-1]) if not res.equity_curve.empty else 1.0
     stats["n_obs"] = int(res.returns.shape[0])
     stats["total_return"] = float(stats["final_equity"] - 1.0)
-    
-    logger.info(f"Backtest completed: {stats['total_return']:.2%} total return, {stats['sharpe']:.2f} Sharpe ratio")
-    
     return stats
 
-"""The main testing run file is in scripts"""
 
+def _run_one_backtest(task: Tuple[str, Dict[str, Any]]) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    """Worker entry point: never raises, so one bad file cannot abort a run."""
+    path, kwargs = task
+    try:
+        return path, run_csv_backtest(path, **kwargs), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def _resolve_csv_files(source: Union[str, Path, Iterable[Union[str, Path]]], pattern: str) -> List[Path]:
+    if isinstance(source, (str, Path)):
+        source_path = Path(source)
+        if source_path.is_dir():
+            return sorted(source_path.glob(pattern))
+        return sorted(Path(p) for p in glob(str(source)))
+    return [Path(p) for p in source]
+
+
+def run_directory_backtest(
+        source: Union[str, Path, Iterable[Union[str, Path]]],
+        pattern: str = '*.csv',
+        max_workers: Optional[int] = None,
+        chunksize: Optional[int] = None,
+        **backtest_kwargs: Any,
+) -> pd.DataFrame:
+    """Run ``run_csv_backtest`` over many files on a process pool.
 
+    Files are submitted in chunks (``Executor.map`` with ``chunksize``) so each
+    worker round-trip carries several backtests and workers stay busy on large
+    universes.
 
+    Args:
+        source: Directory (e.g. data/processed), glob string, or iterable of file paths
+        pattern: Glob pattern used when ``source`` is a directory (default: '*.csv')
+        max_workers: Number of worker processes (default: os.cpu_count()); 1 runs in-process
+        chunksize: Files per task (default: about four chunks per worker)
+        **backtest_kwargs: Passed through to ``run_csv_backtest`` (price_col, date_col, cost_bps)
+
+    Returns:
+        DataFrame indexed by file path with one column per statistic (the
+        drawdown start/end columns hold timestamps) and an ``error`` column
+        that is set for files whose backtest failed
+
+    Raises:
+        FileNotFoundError: If no files match ``source``
+    """
+    files = _resolve_csv_files(source, pattern)
+    if not files:
+        raise FileNotFoundError(f"No CSV files found for {source}")
+
+    workers = max_workers or os.cpu_count() or 1
+    workers = min(workers, len(files))
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(files) / (workers * 4)))
+
+    tasks = [(str(fp), backtest_kwargs) for fp in files]
+    logger.info(f"Running {len(tasks)} backtests on {workers} worker(s), chunksize={chunksize}")
+
+    if workers == 1:
+        outcomes = list(map(_run_one_backtest, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(_run_one_backtest, tasks, chunksize=chunksize))
+
+    rows = []
+    failures = 0
+    for path, stats, error in outcomes:
+        row: Dict[str, Any] = {"file": path}
+        if stats is not None:
+            row.update(stats)
+        else:
+            failures += 1
+            logger.warning(f"Backtest failed for {path}: {error}")
+        row["error"] = error
+        rows.append(row)
+
+    if failures:
+        logger.warning(f"{failures} of {len(tasks)} backtests failed")
+
+    return pd.DataFrame(rows).set_index("file")
+
+
+def _run_panel_chunk(task: Tuple[PricePanel, List[str], str, float]) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+    """Worker entry point for panel backtests; the panel arrives as a path and is re-mapped."""
+    panel, tickers, field, cost_bps = task
+    out = []
+    for ticker in tickers:
+        try:
+            prices = panel.series(ticker, field).dropna()
+            if prices.empty:
+                raise ValueError("No valid price data found")
+            out.append((ticker, _buy_and_hold_stats(prices, cost_bps), None))
+        except Exception as e:
+            out.append((ticker, None, f"{type(e).__name__}: {e}"))
+    return out
+
+
+def run_panel_backtest(
+        panel: Union[str, Path, PricePanel],
+        field: str = 'adj_close',
+        tickers: Optional[Iterable[str]] = None,
+        cost_bps: float = 0.0,
+        max_workers: Optional[int] = None,
+        chunksize: Optional[int] = None,
+) -> pd.DataFrame:
+    """Run buy-and-hold backtests for every ticker of a memory-mapped price panel.
+
+    Workers receive the panel path and ticker names only, and slice the same
+    page-cached ``np.memmap``, so memory does not grow with the worker count.
+
+    Args:
+        panel: Panel directory built by ``data.memmap_panel.build_price_panel`` or an opened panel
+        field: Price field to backtest (default: 'adj_close')
+        tickers: Subset of tickers (default: all tickers in the panel)
+        cost_bps: Transaction costs in basis points (default: 0.0)
+        max_workers: Number of worker processes (default: os.cpu_count()); 1 runs in-process
+        chunksize: Tickers per task (default: about four tasks per worker)
+
+    Returns:
+        DataFrame indexed by ticker with one column per statistic (the drawdown
+        start/end columns hold timestamps) and an ``error`` column
+    """
+    if not isinstance(panel, PricePanel):
+        panel = open_price_panel(panel)
+    names = list(tickers) if tickers is not None else list(panel.tickers)
+    if not names:
+        raise ValueError("No tickers to backtest")
 
+    workers = min(max_workers or os.cpu_count() or 1, len(names))
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(names) / (workers * 4)))
+    tasks = [(panel, names[i:i + chunksize], field, cost_bps) for i in range(0, len(names), chunksize)]
 
+    if workers == 1:
+        chunks = list(map(_run_panel_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_run_panel_chunk, tasks))
 
+    rows = []
+    for ticker, stats, error in (item for chunk in chunks for item in chunk):
+        row: Dict[str, Any] = {"ticker": ticker}
+        if stats is not None:
+            row.update(stats)
+        else:
+            logger.warning(f"Backtest failed for {ticker}: {error}")
+        row["error"] = error
+        rows.append(row)
+    return pd.DataFrame(rows).set_index("ticker")
@@ -0,0 +1,146 @@
+"""Shape-preserving downsampling of long series for plotting.
+
+A chart is only so many pixels wide, so pushing millions of minute-bar points
+to a renderer only costs time. ``lttb_indices`` (Largest-Triangle-Three-
+Buckets) keeps the points that best preserve the visual shape;
+``minmax_indices`` keeps each bucket's extremes, so spikes and drawdown
+troughs survive exactly. :class:`MultiResolutionSeries` pre-aggregates a
+series into min/max levels once, so a zoomed view only reads the detail of
+the visible range.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_POINTS = 2000
+
+
+def lttb_indices(y: np.ndarray, n_out: int, x: Optional[np.ndarray] = None) -> np.ndarray:
+	"""Positions of the ``n_out`` points selected by Largest-Triangle-Three-Buckets.
+
+	The first and last points are always kept; every other bucket contributes
+	the point forming the largest triangle with the previously selected point
+	and the next bucket's average. Cost is O(n) with a loop over buckets.
+	"""
+	y = np.asarray(y, dtype=np.float64)
+	n = len(y)
+	if n_out >= n or n_out < 3:
+		return np.arange(n)
+	x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+	every = (n - 2) / (n_out - 2)
+	edges = (np.arange(n_out - 1) * every).astype(np.int64) + 1
+	edges[-1] = n - 1
+	out = np.empty(n_out, dtype=np.int64)
+	out[0], out[-1] = 0, n - 1
+	a = 0
+	for i in range(n_out - 2):
+		lo, hi = edges[i], edges[i + 1]
+		next_hi = edges[i + 2] if i + 2 < len(edges) else n
+		avg_x = x[hi:next_hi].mean()
+		avg_y = y[hi:next_hi].mean()
+		area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+		a = lo + int(np.argmax(area)) if hi > lo else lo
+		out[i + 1] = a
+	return out
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+	"""Sorted positions of each bucket's minimum and maximum (about ``n_out`` points).
+
+	``y`` must not contain NaN (forward-fill it first).
+	"""
+	y = np.asarray(y, dtype=np.float64)
+	n = len(y)
+	if n <= n_out:
+		return np.arange(n)
+	n_buckets = max(n_out // 2, 1)
+	size = -(-n // n_buckets)
+	n_buckets = -(-n // size)
+	# Pad the last bucket with its own final value so padding never wins
+	padded = np.empty(n_buckets * size)
+	padded[:n] = y
+	padded[n:] = y[-1]
+	buckets = padded.reshape(n_buckets, size)
+	starts = np.arange(n_buckets) * size
+	lo = np.minimum(buckets.argmin(axis=1) + starts, n - 1)
+	hi = np.minimum(buckets.argmax(axis=1) + starts, n - 1)
+	# Buckets are ordered, so interleaving each bucket's sorted pair gives sorted output
+	pairs = np.sort(np.column_stack([lo, hi]), axis=1).ravel()
+	out = np.concatenate([[0], pairs, [n - 1]])
+	return out[np.concatenate([[True], np.diff(out) > 0])]
+
+
+def downsample(
+	data: Union[pd.Series, pd.DataFrame],
+	max_points: Optional[int] = DEFAULT_MAX_POINTS,
+	method: str = "minmax",
+) -> Union[pd.Series, pd.DataFrame]:
+	"""Reduce a Series or DataFrame to about ``max_points`` rows for plotting.
+
+	For a DataFrame, the rows selected for any column are kept for all columns,
+	so the result can grow up to ``max_points`` times the number of columns.
+
+	Args:
+		data: Series or DataFrame in plotting order
+		max_points: Target number of points (None: no downsampling)
+		method: "minmax" (keeps extremes) or "lttb" (keeps visual shape)
+
+	Returns:
+		The selected rows of ``data``
+
+	Raises:
+		ValueError: If the method is unknown
+	"""
+	if method not in ("minmax", "lttb"):
+		raise ValueError(f"Unknown downsampling method '{method}'. Choose 'minmax' or 'lttb'")
+	if max_points is None or len(data) <= max_points:
+		return data
+	select = minmax_indices if method == "minmax" else lttb_indices
+	frame = data.to_frame() if isinstance(data, pd.Series) else data
+	rows = [select(frame[c].ffill().bfill().to_numpy(dtype=np.float64), max_points) for c in frame.columns]
+	keep = np.unique(np.concatenate(rows)) if rows else np.arange(0)
+	return data.iloc[keep]
+
+
+class MultiResolutionSeries:
+	"""Min/max pyramid of a long series for zoomable charts.
+
+	Level ``k`` holds the extremes of buckets of ``factor ** k`` bars (level 0
+	is the raw series). :meth:`view` picks the finest level whose points in the
+	requested range fit in ``max_points``, so zooming in returns more detail
+	while every view stays about the same size.
+	"""
+
+	def __init__(self, series: pd.Series, factor: int = 4, min_points: int = DEFAULT_MAX_POINTS):
+		if factor < 2:
+			raise ValueError("factor must be >= 2")
+		self.series = series
+		self.factor = factor
+		values = series.ffill().bfill().to_numpy(dtype=np.float64)
+		self.levels: List[np.ndarray] = [np.arange(len(values))]
+		bucket = factor
+		while len(self.levels[-1]) > min_points and bucket < len(values):
+			n_out = 2 * -(-len(values) // bucket)
+			self.levels.append(minmax_indices(values, n_out))
+			bucket *= factor
+
+	def _range(self, start, end) -> Tuple[int, int]:
+		index = self.series.index
+		lo = 0 if start is None else int(index.searchsorted(start, side="left"))
+		hi = len(index) if end is None else int(index.searchsorted(end, side="right"))
+		return lo, hi
+
+	def view(self, start=None, end=None, max_points: int = DEFAULT_MAX_POINTS) -> pd.Series:
+		"""Points of the series between ``start`` and ``end`` (index labels, inclusive)."""
+		lo, hi = self._range(start, end)
+		for positions in self.levels:
+			a, b = np.searchsorted(positions, [lo, hi])
+			if b - a <= max_points:
+				return self.series.iloc[positions[a:b]]
+		positions = self.levels[-1]
+		a, b = np.searchsorted(positions, [lo, hi])
+		return downsample(self.series.iloc[positions[a:b]], max_points)
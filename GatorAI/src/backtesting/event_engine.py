@@ -0,0 +1,213 @@
+"""Event-driven backtest with order/fill simulation and an array-backed trade log.
+
+Target positions (in units) are decided on each bar's close. Every change in
+target becomes a market order filled at the next bar's open (or close when no
+open is given), moved against the trader by ``slippage_bps`` and charged a
+per-unit and a proportional commission. Fills, cash and positions are
+computed with NumPy over all bars at once; the only Python loop runs over the
+fills, to track average cost and realized P&L, so replaying a million minute
+bars costs little more than the number of trades.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+	from ..instrumentation import instrument
+except ImportError:  # src/ itself is on sys.path, so the subpackages are top-level
+	from instrumentation import instrument
+
+from .metrics import compute_metrics
+
+TRADE_DTYPE = np.dtype([
+	("bar", np.int64),
+	("time", "datetime64[ns]"),
+	("quantity", np.float64),
+	("price", np.float64),
+	("commission", np.float64),
+	("slippage", np.float64),
+	("position", np.float64),
+	("realized_pnl", np.float64),
+])
+
+
+class TradeLog:
+	"""Growable structured array of fills (capacity doubles when full)."""
+
+	def __init__(self, capacity: int = 1024):
+		self._data = np.zeros(max(int(capacity), 1), dtype=TRADE_DTYPE)
+		self._size = 0
+
+	def __len__(self) -> int:
+		return self._size
+
+	def _reserve(self, n: int) -> None:
+		if self._size + n > len(self._data):
+			capacity = len(self._data)
+			while capacity < self._size + n:
+				capacity *= 2
+			grown = np.zeros(capacity, dtype=TRADE_DTYPE)
+			grown[:self._size] = self._data[:self._size]
+			self._data = grown
+
+	def append(self, bar, time, quantity, price, commission, slippage, position, realized_pnl) -> None:
+		self._reserve(1)
+		self._data[self._size] = (bar, time, quantity, price, commission, slippage, position, realized_pnl)
+		self._size += 1
+
+	def extend(self, records: np.ndarray) -> None:
+		"""Append a structured array with (a subset of) the ``TRADE_DTYPE`` fields."""
+		n = len(records)
+		self._reserve(n)
+		block = self._data[self._size:self._size + n]
+		for name in records.dtype.names:
+			block[name] = records[name]
+		self._size += n
+
+	@property
+	def records(self) -> np.ndarray:
+		"""View of the filled part of the log."""
+		return self._data[:self._size]
+
+	def to_frame(self) -> pd.DataFrame:
+		frame = pd.DataFrame(self.records)
+		frame.insert(2, "side", np.where(frame["quantity"] > 0, "BUY", "SELL"))
+		return frame
+
+
+@dataclass
+class EventBacktestResult:
+	returns: pd.Series
+	equity_curve: pd.Series
+	positions: pd.Series
+	cash: pd.Series
+	trades: TradeLog
+	stats: Dict[str, Any]
+
+
+def _realized_pnl(quantity: np.ndarray, price: np.ndarray) -> np.ndarray:
+	# Average-cost accounting; loops over fills only.
+	pnl = np.zeros(len(quantity))
+	pos = 0.0
+	avg = 0.0
+	for i in range(len(quantity)):
+		q = quantity[i]
+		p = price[i]
+		if pos == 0.0 or (pos > 0.0) == (q > 0.0):
+			avg = (avg * pos + p * q) / (pos + q)
+			pos += q
+			continue
+		closed = min(abs(q), abs(pos))
+		pnl[i] = closed * (p - avg) * (1.0 if pos > 0.0 else -1.0)
+		new_pos = pos + q
+		if new_pos == 0.0:
+			avg = 0.0
+		elif (new_pos > 0.0) != (pos > 0.0):
+			avg = p  # flipped: the remainder opens at the fill price
+		pos = new_pos
+	return pnl
+
+
+@instrument(rows=lambda res, *args, **kwargs: len(res.returns))
+def run_event_backtest(
+	prices: Union[pd.Series, pd.DataFrame],
+	signal: pd.Series,
+	quantity: float = 1.0,
+	initial_cash: float = 100_000.0,
+	slippage_bps: float = 0.0,
+	commission_bps: float = 0.0,
+	commission_per_unit: float = 0.0,
+	max_position: Optional[float] = None,
+	periods_per_year: float = 252.0,
+) -> EventBacktestResult:
+	"""Replay bars with next-bar market fills, slippage, commissions and a position limit.
+
+	Args:
+		prices: Close prices, or a frame with ``close`` and optional ``open`` columns
+		signal: Target position per bar in units of ``quantity`` (e.g. 1 long, 0 flat, -1 short)
+		quantity: Units held per unit of signal
+		initial_cash: Starting cash
+		slippage_bps: Adverse price move applied to every fill, in basis points
+		commission_bps: Commission as a fraction of traded notional, in basis points
+		commission_per_unit: Fixed commission per unit traded
+		max_position: Absolute cap on the held position in units (None: no cap)
+		periods_per_year: Annualization factor (default: 252 for daily bars)
+
+	Returns:
+		EventBacktestResult with per-bar returns, equity, positions and cash, the
+		trade log, and ``compute_metrics`` stats plus trade totals
+
+	Raises:
+		ValueError: If no ``close`` prices are given
+	"""
+	frame = prices.to_frame("close") if isinstance(prices, pd.Series) else prices
+	if "close" not in frame.columns:
+		raise ValueError("prices must be a Series or a DataFrame with a 'close' column")
+	frame = frame.join(signal.rename("signal"), how="inner").dropna(subset=["close"])
+	close = frame["close"].to_numpy(dtype=np.float64)
+	fill_ref = frame["open"].to_numpy(dtype=np.float64) if "open" in frame.columns else close
+	n_bars = len(close)
+
+	target = np.nan_to_num(frame["signal"].to_numpy(dtype=np.float64), nan=0.0) * quantity
+	if max_position is not None:
+		target = np.clip(target, -max_position, max_position)
+
+	# An order placed on bar t's close fills at bar t + 1; orders on the last bar never fill.
+	orders = np.diff(target, prepend=0.0)
+	fill_bars = np.flatnonzero(orders[:-1]) + 1
+	fill_qty = orders[fill_bars - 1]
+	ref_price = fill_ref[fill_bars]
+	fill_price = ref_price * (1.0 + np.sign(fill_qty) * slippage_bps / 10000.0)
+	commission = np.abs(fill_qty) * (commission_per_unit + fill_price * commission_bps / 10000.0)
+	slippage = np.abs(fill_qty) * np.abs(fill_price - ref_price)
+
+	traded = np.zeros(n_bars)
+	spent = np.zeros(n_bars)
+	traded[fill_bars] = fill_qty
+	spent[fill_bars] = fill_qty * fill_price + commission
+	position = np.cumsum(traded)
+	cash = initial_cash - np.cumsum(spent)
+	equity_values = cash + position * close
+
+	index = frame.index
+	trades = TradeLog(capacity=len(fill_bars))
+	records = np.zeros(len(fill_bars), dtype=TRADE_DTYPE)
+	records["bar"] = fill_bars
+	if isinstance(index, pd.DatetimeIndex):
+		times = index[fill_bars]
+		times = times.tz_convert(None) if times.tz is not None else times
+		records["time"] = times.to_numpy(dtype="datetime64[ns]")
+	records["quantity"] = fill_qty
+	records["price"] = fill_price
+	records["commission"] = commission
+	records["slippage"] = slippage
+	records["position"] = position[fill_bars]
+	records["realized_pnl"] = _realized_pnl(fill_qty, fill_price)
+	trades.extend(records)
+
+	equity = pd.Series(equity_values / initial_cash, index=index)
+	net = equity.pct_change()
+	if n_bars:
+		net.iloc[0] = equity.iloc[0] - 1.0
+	with np.errstate(invalid="ignore", divide="ignore"):
+		exposure = np.nan_to_num(position * close / equity_values)
+	stats = compute_metrics(net, equity=equity, positions=exposure, periods_per_year=periods_per_year)
+	stats.update({
+		"n_trades": int(len(trades)),
+		"total_commission": float(commission.sum()),
+		"total_slippage": float(slippage.sum()),
+		"realized_pnl": float(records["realized_pnl"].sum()),
+		"final_equity": float(equity_values[-1]) if n_bars else float(initial_cash),
+	})
+	return EventBacktestResult(
+		returns=net,
+		equity_curve=equity,
+		positions=pd.Series(position, index=index),
+		cash=pd.Series(cash, index=index),
+		trades=trades,
+		stats=stats,
+	)
@@ -0,0 +1,347 @@
+"""Vectorized technical indicators over (time x ticker) panels, with an LRU cache.
+
+Every indicator accepts a 1-D series or a 2-D panel with time along axis 0
+(NumPy arrays, Series or DataFrames; pandas in gives pandas out) and runs in
+O(n) per column: rolling moments from cumulative sums restarted every block
+of rows around the block's mean (so precision does not degrade with the
+length or price level of the series), exponential averages from a
+first-order IIR filter. Leading NaNs (tickers listed later on a union
+calendar) are skipped per column; rolling windows that contain a NaN are NaN,
+and exponential averages carry their last value over NaNs.
+
+:class:`IndicatorCache` memoizes results under ``(ticker, indicator, params,
+data_version)`` keys with least-recently-used eviction, so sweeps and
+dashboard reruns that reuse a window compute it once.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+ArrayLike = Union[np.ndarray, pd.Series, pd.DataFrame]
+# Rolling sums restart every this many windows (see ``_rolling_moments``)
+_MOMENT_BLOCK = 16
+
+
+def _as_2d(x: ArrayLike) -> np.ndarray:
+	a = np.asarray(x, dtype=np.float64)
+	return a.reshape(-1, 1) if a.ndim == 1 else a
+
+
+def _like(out: np.ndarray, x: ArrayLike) -> ArrayLike:
+	"""Give ``out`` (2-D) the type and shape of the input ``x``."""
+	if isinstance(x, pd.DataFrame):
+		return pd.DataFrame(out, index=x.index, columns=x.columns)
+	if isinstance(x, pd.Series):
+		return pd.Series(out[:, 0], index=x.index, name=x.name)
+	return out[:, 0] if np.ndim(x) == 1 else out
+
+
+def _first_valid(a: np.ndarray) -> np.ndarray:
+	valid = ~np.isnan(a)
+	return np.where(valid.any(axis=0), valid.argmax(axis=0), len(a))
+
+
+def _rolling_moments(a: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+	"""Rolling mean and population variance; NaN where the window is not full of values.
+
+	A single cumulative sum over the series (and E[x^2] - E[x]^2) loses
+	precision as the sums grow. Instead the rows are cut into blocks of
+	``_MOMENT_BLOCK`` windows; each block, extended by the ``window - 1`` rows
+	before it, is shifted by its own mean and summed separately, so rounding
+	error depends only on the block length and the spread within it.
+	"""
+	if window < 1:
+		raise ValueError(f"window must be >= 1, got {window}")
+	n, n_cols = a.shape
+	mean = np.full(a.shape, np.nan)
+	var = np.full(a.shape, np.nan)
+	if window > n:
+		return mean, var
+	block = _MOMENT_BLOCK * window
+	n_blocks = -(-n // block)
+	rows = np.arange(n_blocks)[:, None] * block - (window - 1) + np.arange(block + window - 1)
+	inside = (rows >= 0) & (rows < n)
+	seg = np.where(inside[..., None], a[np.clip(rows, 0, n - 1)], np.nan)  # (blocks, rows, columns)
+	valid = ~np.isnan(seg)
+	ref = np.where(valid, seg, 0.0).sum(axis=1) / np.maximum(valid.sum(axis=1), 1)
+	dev = np.where(valid, seg - ref[:, None, :], 0.0)
+	zero = np.zeros((n_blocks, 1, n_cols))
+	c1 = np.concatenate([zero, np.cumsum(dev, axis=1)], axis=1)
+	c2 = np.concatenate([zero, np.cumsum(dev * dev, axis=1)], axis=1)
+	k = np.concatenate([zero, np.cumsum(valid, axis=1)], axis=1)
+	# Entry j of a block is the window ending at row block_start + j
+	full = (k[:, window:] - k[:, :-window]) == window
+	m1 = (c1[:, window:] - c1[:, :-window]) / window
+	m2 = (c2[:, window:] - c2[:, :-window]) / window
+	mean = np.where(full, ref[:, None, :] + m1, np.nan).reshape(-1, n_cols)[:n]
+	var = np.where(full, np.maximum(m2 - m1 * m1, 0.0), np.nan).reshape(-1, n_cols)[:n]
+	return mean, var
+
+
+def _sma(a: np.ndarray, window: int) -> np.ndarray:
+	return _rolling_moments(a, window)[0]
+
+
+def _ema(a: np.ndarray, alpha: float) -> np.ndarray:
+	# Recursive EMA seeded with each column's first observation (pandas ``adjust=False``).
+	# Later NaNs are skipped by the recursion and carry the last value forward
+	# (pandas ``ignore_na=True``).
+	out = np.full(a.shape, np.nan)
+	valid = ~np.isnan(a)
+	first = _first_valid(a)
+	gaps = (~valid & (np.arange(len(a))[:, None] > first)).any(axis=0)
+	for start in np.unique(first[~gaps]):
+		if start >= len(a):
+			continue
+		cols = (first == start) & ~gaps
+		seg = a[start:, cols]
+		zi = (1.0 - alpha) * seg[:1]
+		out[start:, cols] = lfilter([alpha], [1.0, alpha - 1.0], seg, axis=0, zi=zi)[0]
+	for col in np.flatnonzero(gaps):
+		seg = a[valid[:, col], col]
+		filtered = lfilter([alpha], [1.0, alpha - 1.0], seg, zi=(1.0 - alpha) * seg[:1])[0]
+		last = np.cumsum(valid[:, col]) - 1  # latest observation at or before each row
+		out[:, col] = np.where(last >= 0, filtered[np.maximum(last, 0)], np.nan)
+	return out
+
+
+def sma(x: ArrayLike, window: int) -> ArrayLike:
+	"""Simple moving average over ``window`` bars (NaN until the window is full)."""
+	return _like(_sma(_as_2d(x), int(window)), x)
+
+
+def rolling_std(x: ArrayLike, window: int) -> ArrayLike:
+	"""Rolling population standard deviation (ddof=0), as used for Bollinger bands."""
+	return _like(np.sqrt(_rolling_moments(_as_2d(x), int(window))[1]), x)
+
+
+def ema(x: ArrayLike, span: Optional[float] = None, alpha: Optional[float] = None) -> ArrayLike:
+	"""Exponential moving average with ``alpha = 2 / (span + 1)`` unless ``alpha`` is given."""
+	if alpha is None:
+		if span is None:
+			raise ValueError("Pass either span or alpha")
+		if span < 1:
+			raise ValueError(f"span must be >= 1, got {span}")
+		alpha = 2.0 / (float(span) + 1.0)
+	if not 0 < alpha <= 1:
+		raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+	return _like(_ema(_as_2d(x), float(alpha)), x)
+
+
+def rsi(x: ArrayLike, window: int = 14) -> ArrayLike:
+	"""Wilder RSI: gains and losses smoothed with ``alpha = 1 / window``."""
+	window = int(window)
+	if window < 1:
+		raise ValueError(f"window must be >= 1, got {window}")
+	a = _as_2d(x)
+	out = np.full(a.shape, np.nan)
+	if len(a) > 1:
+		delta = np.diff(a, axis=0)
+		avg_gain = _ema(np.maximum(delta, 0.0), 1.0 / window)
+		avg_loss = _ema(np.maximum(-delta, 0.0), 1.0 / window)
+		with np.errstate(divide="ignore", invalid="ignore"):
+			value = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+		out[1:] = np.where(np.isnan(avg_gain), np.nan, value)
+		# Warm-up: the first ``window`` bars after each column's first price
+		warm = np.arange(len(a))[:, None] < _first_valid(a) + window
+		out[warm] = np.nan
+	return _like(out, x)
+
+
+def macd(
+	x: ArrayLike,
+	fast: int = 12,
+	slow: int = 26,
+	signal: int = 9,
+) -> Tuple[ArrayLike, ArrayLike, ArrayLike]:
+	"""MACD line (fast EMA - slow EMA), its signal-line EMA and the histogram."""
+	a = _as_2d(x)
+	line = _ema(a, 2.0 / (int(fast) + 1)) - _ema(a, 2.0 / (int(slow) + 1))
+	signal_line = _ema(line, 2.0 / (int(signal) + 1))
+	return _like(line, x), _like(signal_line, x), _like(line - signal_line, x)
+
+
+def bollinger(x: ArrayLike, window: int = 20, num_std: float = 2.0) -> Tuple[ArrayLike, ArrayLike, ArrayLike]:
+	"""Bollinger bands: (middle SMA, upper band, lower band)."""
+	mid, var = _rolling_moments(_as_2d(x), int(window))
+	width = num_std * np.sqrt(var)
+	return _like(mid, x), _like(mid + width, x), _like(mid - width, x)
+
+
+INDICATORS: Dict[str, Callable[..., Any]] = {
+	"sma": sma,
+	"ema": ema,
+	"std": rolling_std,
+	"rsi": rsi,
+	"macd": macd,
+	"bollinger": bollinger,
+}
+
+
+def data_version(values: ArrayLike) -> str:
+	"""Content hash of a price array, usable as the ``data_version`` of a cache key."""
+	a = np.ascontiguousarray(np.asarray(values, dtype=np.float64))
+	digest = hashlib.blake2b(a.view(np.uint8), digest_size=16)
+	digest.update(str(a.shape).encode())
+	return digest.hexdigest()
+
+
+def _nbytes(value: Any) -> int:
+	if isinstance(value, tuple):
+		return sum(_nbytes(v) for v in value)
+	return int(getattr(value, "nbytes", 0))
+
+
+class IndicatorCache:
+	"""Thread-safe LRU cache of indicator results.
+
+	Entries are evicted least recently used first once there are more than
+	``max_entries`` of them or their arrays exceed ``max_bytes`` in total.
+	"""
+
+	def __init__(self, max_entries: int = 512, max_bytes: Optional[int] = 512 * 2**20):
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+		self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+		self._nbytes = 0
+		self._lock = threading.Lock()
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def __contains__(self, key: Hashable) -> bool:
+		return key in self._entries
+
+	def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+		"""Return ``(found, value)`` for ``key``, counting a hit or a miss."""
+		with self._lock:
+			if key in self._entries:
+				self.hits += 1
+				self._entries.move_to_end(key)
+				return True, self._entries[key]
+			self.misses += 1
+			return False, None
+
+	def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+		"""Return the cached value for ``key``, computing and storing it on a miss."""
+		found, value = self.lookup(key)
+		if not found:
+			value = compute()
+			self.put(key, value)
+		return value
+
+	def put(self, key: Hashable, value: Any) -> None:
+		with self._lock:
+			if key in self._entries:
+				self._nbytes -= _nbytes(self._entries.pop(key))
+			self._entries[key] = value
+			self._nbytes += _nbytes(value)
+			while len(self._entries) > 1 and (
+				len(self._entries) > self.max_entries
+				or (self.max_bytes is not None and self._nbytes > self.max_bytes)
+			):
+				_, evicted = self._entries.popitem(last=False)
+				self._nbytes -= _nbytes(evicted)
+
+	def scope(self, ticker: Hashable, version: Hashable) -> "CacheScope":
+		"""View that prefixes ``(indicator, *params)`` keys with a ticker and data version."""
+		return CacheScope(self, ticker, version)
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+			self._nbytes = 0
+			self.hits = 0
+			self.misses = 0
+
+	def info(self) -> Dict[str, int]:
+		return {"entries": len(self._entries), "nbytes": self._nbytes, "hits": self.hits, "misses": self.misses}
+
+
+class CacheScope:
+	"""An :class:`IndicatorCache` bound to one ticker and data version."""
+
+	def __init__(self, cache: IndicatorCache, ticker: Hashable, version: Hashable):
+		self.cache = cache
+		self.ticker = ticker
+		self.version = version
+
+	def get_or_compute(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+		indicator, *params = key
+		return self.cache.get_or_compute((self.ticker, indicator, tuple(params), self.version), compute)
+
+
+# Process-wide cache shared by the dashboards and sweeps.
+INDICATOR_CACHE = IndicatorCache()
+
+
+def cached_indicator(
+	name: str,
+	prices: Union[pd.Series, pd.DataFrame],
+	*params,
+	cache: Optional[IndicatorCache] = None,
+	versions: Optional[Dict[Hashable, Hashable]] = None,
+) -> Any:
+	"""Compute an indicator over a Series or (time x ticker) frame through the cache.
+
+	Each ticker column is cached separately; columns that miss are computed
+	together in one vectorized call.
+
+	Args:
+		name: Indicator name (see ``INDICATORS``)
+		prices: Price Series (its name is the ticker) or wide frame of tickers
+		*params: Indicator parameters, e.g. the window
+		cache: Cache to use (default: ``INDICATOR_CACHE``)
+		versions: Data version per ticker (default: a content hash of each column)
+
+	Returns:
+		Same as calling ``INDICATORS[name](prices, *params)``
+
+	Raises:
+		ValueError: If the indicator is unknown
+	"""
+	if name not in INDICATORS:
+		raise ValueError(f"Unknown indicator '{name}'. Choose from {list(INDICATORS)}")
+	func = INDICATORS[name]
+	cache = INDICATOR_CACHE if cache is None else cache
+	frame = prices.to_frame() if isinstance(prices, pd.Series) else prices
+	keys = {}
+	for ticker in frame.columns:
+		version = versions[ticker] if versions is not None and ticker in versions else data_version(frame[ticker])
+		keys[ticker] = (ticker, name, tuple(params), version)
+
+	values, missing = {}, []
+	for ticker in frame.columns:
+		found, value = cache.lookup(keys[ticker])
+		if found:
+			values[ticker] = value
+		else:
+			missing.append(ticker)
+	if missing:
+		computed = func(frame[missing], *params)
+		for i, ticker in enumerate(missing):
+			if isinstance(computed, tuple):
+				value = tuple(part.iloc[:, i].to_numpy() for part in computed)
+			else:
+				value = computed.iloc[:, i].to_numpy()
+			cache.put(keys[ticker], value)
+			values[ticker] = value
+	values = {t: values[t] for t in frame.columns}
+
+	def assemble(pick: Callable[[Any], np.ndarray]) -> ArrayLike:
+		out = pd.DataFrame({t: pick(v) for t, v in values.items()}, index=frame.index, columns=frame.columns)
+		return out.iloc[:, 0].rename(prices.name) if isinstance(prices, pd.Series) else out
+
+	first = next(iter(values.values()), None)
+	if isinstance(first, tuple):
+		return tuple(assemble(lambda v, k=k: v[k]) for k in range(len(first)))
+	return assemble(lambda v: v)
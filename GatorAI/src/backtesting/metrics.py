@@ -1,15 +1,27 @@
 from __future__ import annotations
 
+from typing import Any, Dict, Optional, Union
+
 import numpy as np
 import pandas as pd
 
+ArrayLike = Union[np.ndarray, pd.Series, pd.DataFrame]
+
+
+def drawdown_series(equity: pd.Series) -> pd.Series:
+	"""Drawdown from the running peak of an equity curve (0 at new highs, negative below)."""
+	values = np.asarray(equity, dtype=np.float64)
+	if values.size == 0:
+		return pd.Series(values, index=equity.index, dtype=np.float64)
+	peak = np.maximum.accumulate(values)
+	return pd.Series(values / peak - 1.0, index=equity.index, name=equity.name)
+
 
 def max_drawdown(equity: pd.Series) -> float:
 	if equity.empty:
 		return 0.0
-	roll_max = equity.cummax()
-	drawdown = equity / roll_max - 1.0
-	return float(drawdown.min())
+	values = np.asarray(equity, dtype=np.float64)
+	return float(np.min(values / np.maximum.accumulate(values) - 1.0))
 
 
 def annualized_sharpe(returns: pd.Series, periods_per_year: float = 252.0) -> float:
@@ -26,3 +38,136 @@ def annualized_sharpe(returns: pd.Series, periods_per_year: float = 252.0) -> fl
 	if std is None or std == 0 or np.isnan(std):
 		return 0.0
 	return float((mean * periods_per_year) / (std * np.sqrt(periods_per_year)))
+
+
+def _metrics_kernel(
+	r: np.ndarray,
+	equity: np.ndarray,
+	pos: Optional[np.ndarray],
+	periods_per_year: float,
+) -> Dict[str, np.ndarray]:
+	# r, equity and pos are (time, columns); every stat is one reduction over axis 0.
+	n_obs, n_cols = r.shape
+	cols = np.arange(n_cols)
+	zeros = np.zeros(n_cols)
+	sqrt_ppy = np.sqrt(periods_per_year)
+
+	if n_obs <= 1:
+		stats = {k: zeros.copy() for k in (
+			"cagr", "vol", "sharpe", "sortino", "max_drawdown", "calmar", "hit_rate",
+		)}
+		stats.update({k: np.zeros(n_cols, dtype=np.int64) for k in (
+			"max_drawdown_duration", "max_drawdown_start", "max_drawdown_end",
+		)})
+		if pos is not None:
+			stats["turnover"] = zeros.copy()
+		return stats
+
+	with np.errstate(invalid="ignore", divide="ignore"):
+		cagr = equity[-1] ** (periods_per_year / float(n_obs)) - 1.0
+		mean = r.mean(axis=0)
+		std = r.std(axis=0, ddof=1)
+		downside = np.sqrt(np.mean(np.minimum(r, 0.0) ** 2, axis=0))
+		sharpe = np.where((std > 0) & ~np.isnan(std), mean * periods_per_year / (std * sqrt_ppy), 0.0)
+		sortino = np.where(downside > 0, mean * periods_per_year / (downside * sqrt_ppy), 0.0)
+
+		peak = np.maximum.accumulate(equity, axis=0)
+		drawdown = equity / peak - 1.0
+	trough = drawdown.argmin(axis=0)
+	max_dd = drawdown[trough, cols]
+
+	# Peak: first bar at or before the trough where the running high was set.
+	steps = np.arange(n_obs)[:, None]
+	peak_value = peak[trough, cols]
+	start = np.where((steps <= trough) & (equity >= peak_value), steps, n_obs).min(axis=0)
+	# End: first bar after the trough back at the old high, or the last bar if never recovered.
+	recovered = (steps > trough) & (equity >= peak_value)
+	end = np.where(recovered.any(axis=0), recovered.argmax(axis=0), n_obs - 1)
+	in_drawdown = max_dd < 0
+	start = np.where(in_drawdown, start, 0)
+	end = np.where(in_drawdown, end, 0)
+
+	nonzero = np.count_nonzero(r, axis=0)
+	stats = {
+		"cagr": cagr,
+		"vol": std * sqrt_ppy,
+		"sharpe": sharpe,
+		"sortino": sortino,
+		"max_drawdown": max_dd,
+		"max_drawdown_duration": end - start,
+		"max_drawdown_start": start,
+		"max_drawdown_end": end,
+		"calmar": np.where(in_drawdown, cagr / np.where(in_drawdown, -max_dd, 1.0), 0.0),
+		"hit_rate": np.where(nonzero > 0, np.count_nonzero(r > 0, axis=0) / np.maximum(nonzero, 1), 0.0),
+	}
+	if pos is not None:
+		changes = np.abs(np.diff(pos, axis=0, prepend=0.0))
+		stats["turnover"] = changes.mean(axis=0) * periods_per_year
+	return stats
+
+
+def compute_metrics(
+	returns: ArrayLike,
+	equity: Optional[ArrayLike] = None,
+	positions: Optional[ArrayLike] = None,
+	periods_per_year: float = 252.0,
+	axis: int = 0,
+) -> Union[Dict[str, Any], pd.DataFrame]:
+	"""Performance statistics for one or many return streams in a single call.
+
+	Every column is reduced independently with vectorized NumPy passes (no
+	pandas rolling objects or intermediate Series), so a (time x strategies)
+	matrix of thousands of columns costs about as much as one long series.
+	Returns must not contain NaN.
+
+	Stats: cagr, vol, sharpe, sortino (downside deviation against 0), max_drawdown
+	with its start (peak), end (recovery, or last bar) and duration in bars,
+	calmar (cagr / |max_drawdown|), hit_rate (positive among non-zero returns)
+	and, when positions are given, annualized turnover.
+
+	Args:
+		returns: Period returns; 1-D, or N-D with time along ``axis``
+		equity: Equity curve matching ``returns`` (default: cumulative product of 1 + returns)
+		positions: Held positions matching ``returns``, for turnover
+		periods_per_year: Annualization factor (default: 252 for daily bars)
+		axis: Time axis of N-D inputs (default: 0)
+
+	Returns:
+		For a Series or 1-D array, a dict of scalars (drawdown start/end are index
+		labels for a Series, integer positions otherwise). For a DataFrame, a
+		DataFrame with one row per column. For other arrays, a dict of arrays with
+		the time axis removed.
+	"""
+	index = returns.index if isinstance(returns, (pd.Series, pd.DataFrame)) else None
+	r = np.asarray(returns, dtype=np.float64)
+	one_d = r.ndim == 1
+	if one_d:
+		r = r[:, None]
+		axis = 0
+
+	def as_2d(values: ArrayLike) -> np.ndarray:
+		a = np.asarray(values, dtype=np.float64)
+		if one_d:
+			a = a.reshape(-1, 1)
+		a = np.broadcast_to(a, r.shape) if a.shape != r.shape else a
+		return np.moveaxis(a, axis, 0).reshape(a.shape[axis], -1)
+
+	out_shape = tuple(s for i, s in enumerate(r.shape) if i != axis % r.ndim)
+	r2 = np.moveaxis(r, axis, 0).reshape(r.shape[axis], -1)
+	eq2 = as_2d(equity) if equity is not None else np.cumprod(1.0 + r2, axis=0)
+	pos2 = as_2d(positions) if positions is not None else None
+
+	stats = _metrics_kernel(r2, eq2, pos2, periods_per_year)
+	if isinstance(returns, pd.DataFrame):
+		frame = pd.DataFrame(stats, index=returns.columns)
+		if len(index):
+			for key in ("max_drawdown_start", "max_drawdown_end"):
+				frame[key] = index[frame[key].to_numpy()]
+		return frame
+	if one_d:
+		result = {k: v[0].item() for k, v in stats.items()}
+		if index is not None and len(index):
+			for key in ("max_drawdown_start", "max_drawdown_end"):
+				result[key] = index[result[key]]
+		return result
+	return {k: v.reshape(out_shape) for k, v in stats.items()}
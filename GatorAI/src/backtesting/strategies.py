@@ -0,0 +1,139 @@
+"""Batched position builders for the dashboard strategy families.
+
+Each builder takes one price array of length T and a sequence of parameter
+tuples and returns a (T x n_params) long/flat position matrix. Indicators are
+computed once per distinct window and shared across parameter sets (and
+across calls) through an optional :class:`~backtesting.indicators.IndicatorCache`.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, Hashable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .indicators import CacheScope, IndicatorCache, data_version, ema, rolling_std, rsi, sma
+
+FAMILY_PARAMS: Dict[str, Tuple[str, ...]] = {
+	"ma_crossover": ("fast", "slow"),
+	"rsi": ("window", "lower", "upper"),
+	"macd": ("fast", "slow", "signal"),
+	"bollinger": ("window", "num_std"),
+}
+
+
+def _latch(entries: np.ndarray, exits: np.ndarray) -> np.ndarray:
+	"""Hold a position from each entry until the next exit, column-wise."""
+	state = np.full(entries.shape, np.nan)
+	state[exits] = 0.0
+	state[entries] = 1.0
+	has_event = ~np.isnan(state)
+	rows = np.where(has_event, np.arange(state.shape[0])[:, None], 0)
+	np.maximum.accumulate(rows, axis=0, out=rows)
+	filled = np.take_along_axis(state, rows, axis=0)
+	return np.nan_to_num(filled, nan=0.0)
+
+
+Cache = Union[dict, CacheScope]
+
+
+def _cached(cache: Optional[Cache], key: tuple, compute: Callable[[], np.ndarray]) -> np.ndarray:
+	if cache is None:
+		return compute()
+	if isinstance(cache, CacheScope):
+		return cache.get_or_compute(key, compute)
+	if key not in cache:
+		cache[key] = compute()
+	return cache[key]
+
+
+def ma_crossover_positions(prices: np.ndarray, params: Sequence[Tuple], cache: Optional[Cache] = None) -> np.ndarray:
+	"""Long while the ``fast`` SMA is above the ``slow`` SMA."""
+	out = np.zeros((len(prices), len(params)))
+	for j, (fast, slow) in enumerate(params):
+		fast_ma = _cached(cache, ("sma", int(fast)), lambda: sma(prices, int(fast)))
+		slow_ma = _cached(cache, ("sma", int(slow)), lambda: sma(prices, int(slow)))
+		with np.errstate(invalid="ignore"):
+			out[:, j] = fast_ma > slow_ma
+	return out
+
+
+def rsi_positions(prices: np.ndarray, params: Sequence[Tuple], cache: Optional[Cache] = None) -> np.ndarray:
+	"""Mean reversion: enter when RSI drops below ``lower``, exit above ``upper``."""
+	entries = np.zeros((len(prices), len(params)), dtype=bool)
+	exits = np.zeros_like(entries)
+	for j, (window, lower, upper) in enumerate(params):
+		rsi_values = _cached(cache, ("rsi", int(window)), lambda: rsi(prices, int(window)))
+		with np.errstate(invalid="ignore"):
+			entries[:, j] = rsi_values < lower
+			exits[:, j] = rsi_values > upper
+	return _latch(entries, exits)
+
+
+def macd_positions(prices: np.ndarray, params: Sequence[Tuple], cache: Optional[Cache] = None) -> np.ndarray:
+	"""Long while the MACD line is above its signal line."""
+	out = np.zeros((len(prices), len(params)))
+	for j, (fast, slow, signal) in enumerate(params):
+		fast_ema = _cached(cache, ("ema", int(fast)), lambda: ema(prices, span=int(fast)))
+		slow_ema = _cached(cache, ("ema", int(slow)), lambda: ema(prices, span=int(slow)))
+		macd = fast_ema - slow_ema
+		signal_line = ema(macd, span=int(signal))
+		out[:, j] = macd > signal_line
+		# No signal until the slow EMA has seen a full window.
+		out[: int(slow) - 1, j] = 0.0
+	return out
+
+
+def bollinger_positions(prices: np.ndarray, params: Sequence[Tuple], cache: Optional[Cache] = None) -> np.ndarray:
+	"""Mean reversion: enter below the lower band, exit at the middle band."""
+	entries = np.zeros((len(prices), len(params)), dtype=bool)
+	exits = np.zeros_like(entries)
+	for j, (window, num_std) in enumerate(params):
+		mid = _cached(cache, ("sma", int(window)), lambda: sma(prices, int(window)))
+		std = _cached(cache, ("std", int(window)), lambda: rolling_std(prices, int(window)))
+		with np.errstate(invalid="ignore"):
+			entries[:, j] = prices < mid - num_std * std
+			exits[:, j] = prices > mid
+	return _latch(entries, exits)
+
+
+POSITION_BUILDERS: Dict[str, Callable[..., np.ndarray]] = {
+	"ma_crossover": ma_crossover_positions,
+	"rsi": rsi_positions,
+	"macd": macd_positions,
+	"bollinger": bollinger_positions,
+}
+
+
+def valid_params(family: str, params: np.ndarray) -> np.ndarray:
+	"""Boolean mask of parameter rows that make sense for ``family``."""
+	if family == "ma_crossover":
+		return params[:, 0] < params[:, 1]
+	if family == "rsi":
+		return (params[:, 1] < params[:, 2]) & (params[:, 0] >= 2)
+	if family == "macd":
+		return params[:, 0] < params[:, 1]
+	if family == "bollinger":
+		return (params[:, 0] >= 2) & (params[:, 1] > 0)
+	raise ValueError(f"Unknown strategy family '{family}'. Choose from {list(FAMILY_PARAMS)}")
+
+
+def family_positions(
+	family: str,
+	prices: np.ndarray,
+	params: Sequence[Tuple],
+	cache: Optional[Union[dict, IndicatorCache]] = None,
+	ticker: Hashable = None,
+	version: Optional[Hashable] = None,
+) -> np.ndarray:
+	"""Build the (T x n_params) position matrix for one strategy family.
+
+	With an :class:`IndicatorCache`, indicators are keyed by ``ticker`` and
+	``version`` (default: a content hash of ``prices``), so later calls on the
+	same data reuse them.
+	"""
+	if family not in POSITION_BUILDERS:
+		raise ValueError(f"Unknown strategy family '{family}'. Choose from {list(FAMILY_PARAMS)}")
+	prices = np.asarray(prices, dtype=np.float64)
+	if isinstance(cache, IndicatorCache):
+		cache = cache.scope(ticker, data_version(prices) if version is None else version)
+	return POSITION_BUILDERS[family](prices, params, cache)
@@ -0,0 +1,271 @@
+"""Streaming backtest over price chunks that need not fit in memory together.
+
+:class:`StreamingBacktest` applies the model of ``run_vectorized_backtest``
+(signal shifted one bar, ``cost_bps`` on position changes) one chunk at a
+time. The last price and signal, the equity level, mergeable return moments
+and the running drawdown are carried across chunk boundaries, so the final
+stats equal those of the vectorized engine on the concatenated data, up to
+floating-point summation order in the mean and variance. Memory is bounded by
+the chunk size unless the per-bar series are kept.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+	from ..instrumentation import instrument
+except ImportError:  # src/ itself is on sys.path, so the subpackages are top-level
+	from instrumentation import instrument
+
+from .backtest_engine import BacktestResult
+
+Chunk = Union[pd.Series, Tuple[pd.Series, pd.Series]]
+
+
+def iter_price_chunks(
+	path: Union[str, Path],
+	price_col: str = "adj_close",
+	date_col: str = "datetime",
+	chunksize: int = 100_000,
+) -> Iterator[pd.Series]:
+	"""Yield a date-sorted price file as consecutive Series of at most ``chunksize`` rows.
+
+	Reads processed CSVs with ``pd.read_csv(chunksize=...)`` and columnar store
+	files (or partition directories, part by part) by Parquet row batches.
+	Only the date and price columns are loaded; rows missing either are dropped.
+
+	Args:
+		path: CSV, ``.parquet``/``.feather`` file, or ``data.store`` partition directory
+		price_col: Name of the price column (default: 'adj_close')
+		date_col: Name of the date column (default: 'datetime')
+		chunksize: Maximum rows per chunk
+
+	Yields:
+		Price Series indexed by datetime
+	"""
+	fp = Path(path)
+	if not fp.exists():
+		raise FileNotFoundError(f"Price file not found: {fp}")
+
+	def to_series(frame: pd.DataFrame) -> pd.Series:
+		frame = frame.dropna(subset=[date_col, price_col])
+		index = pd.DatetimeIndex(pd.to_datetime(frame[date_col]), name=date_col)
+		return pd.Series(frame[price_col].to_numpy(dtype=np.float64), index=index, name=price_col)
+
+	if fp.is_dir() or fp.suffix in (".parquet", ".feather"):
+		parts = sorted(p for p in fp.glob("part-*") if p.suffix in (".parquet", ".feather")) if fp.is_dir() else [fp]
+		for part in parts:
+			if part.suffix == ".parquet":
+				import pyarrow.parquet as pq
+
+				for batch in pq.ParquetFile(part).iter_batches(batch_size=chunksize, columns=[date_col, price_col]):
+					yield to_series(batch.to_pandas())
+			else:
+				frame = pd.read_feather(part, columns=[date_col, price_col])
+				for start in range(0, len(frame), chunksize):
+					yield to_series(frame.iloc[start:start + chunksize])
+		return
+
+	for frame in pd.read_csv(fp, usecols=[date_col, price_col], chunksize=chunksize):
+		yield to_series(frame)
+
+
+class StreamingBacktest:
+	"""Incremental single-asset backtest; feed chunks with :meth:`update`, then read :meth:`stats`."""
+
+	def __init__(self, cost_bps: float = 0.0, periods_per_year: float = 252.0):
+		self.cost_bps = cost_bps
+		self.periods_per_year = periods_per_year
+		self.last_price: Optional[float] = None
+		self.last_signal = 0.0
+		self.last_pos = 0.0
+		self.equity = 1.0
+		# Return moments (Chan et al. merge of per-chunk mean and M2)
+		self.n = 0
+		self.mean = 0.0
+		self.m2 = 0.0
+		self.downside_sq = 0.0
+		self.n_positive = 0
+		self.n_nonzero = 0
+		self.turnover = 0.0
+		# Drawdown state: running peak, deepest drawdown and its recovery
+		self.peak = -np.inf
+		self.peak_label: Any = None
+		self.max_drawdown = 0.0
+		self.dd_start: Any = None
+		self.dd_peak = np.inf
+		self.dd_end: Any = None
+		self.recovered = True
+		self.first_label: Any = None
+		self.last_label: Any = None
+		self._pos_start = 0
+		self._pos_end = 0
+		self._peak_pos = 0
+
+	def update(self, prices: pd.Series, signal: Optional[pd.Series] = None) -> Tuple[pd.Series, pd.Series]:
+		"""Consume one chunk and return its (net returns, equity) Series.
+
+		Args:
+			prices: Next chunk of prices, in time order after the previous chunk
+			signal: Signal for the same bars (default: always 1.0, buy and hold)
+		"""
+		if signal is None:
+			signal = pd.Series(1.0, index=prices.index)
+		aligned = pd.concat([prices, signal], axis=1).dropna()
+		px = aligned.iloc[:, 0].to_numpy(dtype=np.float64)
+		sig = aligned.iloc[:, 1].to_numpy(dtype=np.float64)
+		index = aligned.index
+		n = len(px)
+		if n == 0:
+			empty = pd.Series([], index=index, dtype=np.float64)
+			return empty, empty.copy()
+
+		prev_px = np.concatenate([[px[0] if self.last_price is None else self.last_price], px[:-1]])
+		ret = px / prev_px - 1.0
+		pos = np.concatenate([[self.last_signal], sig[:-1]])
+		prev_pos = np.concatenate([[self.last_pos], pos[:-1]])
+		changes = np.abs(pos - prev_pos)
+		net = pos * ret - changes * (self.cost_bps / 10000.0)
+		equity = np.cumprod(np.concatenate([[self.equity], 1.0 + net]))[1:]
+
+		self._update_moments(net)
+		self.turnover += changes.sum()
+		self._update_drawdown(equity, index)
+
+		self.last_price = px[-1]
+		self.last_signal = sig[-1]
+		self.last_pos = pos[-1]
+		if self.first_label is None:
+			self.first_label = index[0]
+		self.equity = equity[-1]
+		self.last_label = index[-1]
+		return pd.Series(net, index=index), pd.Series(equity, index=index)
+
+	def _update_moments(self, net: np.ndarray) -> None:
+		n_b = len(net)
+		mean_b = net.mean()
+		m2_b = ((net - mean_b) ** 2).sum()
+		n = self.n + n_b
+		delta = mean_b - self.mean
+		self.mean += delta * n_b / n
+		self.m2 += m2_b + delta * delta * self.n * n_b / n
+		self.n = n
+		self.downside_sq += (np.minimum(net, 0.0) ** 2).sum()
+		self.n_positive += int(np.count_nonzero(net > 0))
+		self.n_nonzero += int(np.count_nonzero(net))
+
+	def _update_drawdown(self, equity: np.ndarray, index: pd.Index) -> None:
+		offset = self.n - len(equity)
+		steps = np.arange(len(equity))
+		prior = np.maximum.accumulate(np.concatenate([[self.peak], equity[:-1]]))
+		new_high = equity > prior
+		peak = np.maximum(prior, equity)
+		# Position of the bar that set the running peak (first bar reaching it)
+		peak_at = np.maximum.accumulate(np.where(new_high, steps, -1))
+		drawdown = equity / peak - 1.0
+
+		trough = int(drawdown.argmin())
+		search_from = 0
+		if drawdown[trough] < self.max_drawdown:
+			self.max_drawdown = float(drawdown[trough])
+			self.dd_peak = peak[trough]
+			if peak_at[trough] >= 0:
+				self._pos_start = offset + int(peak_at[trough])
+				self.dd_start = index[peak_at[trough]]
+			else:
+				self._pos_start = self._peak_pos
+				self.dd_start = self.peak_label
+			self.recovered = False
+			search_from = trough + 1
+		if not self.recovered:
+			hits = np.flatnonzero(equity[search_from:] >= self.dd_peak)
+			if len(hits):
+				self.recovered = True
+				self._pos_end = offset + search_from + int(hits[0])
+				self.dd_end = index[search_from + hits[0]]
+
+		if new_high.any():
+			last = int(np.flatnonzero(new_high)[-1])
+			self._peak_pos = offset + last
+			self.peak_label = index[last]
+		self.peak = peak[-1]
+
+	def stats(self) -> Dict[str, Any]:
+		"""Stats of everything consumed so far, with the keys of ``compute_metrics``."""
+		ppy = self.periods_per_year
+		keys = ("cagr", "vol", "sharpe", "sortino", "max_drawdown", "calmar", "hit_rate", "turnover")
+		if self.n <= 1:
+			out: Dict[str, Any] = {k: 0.0 for k in keys}
+			out.update({"max_drawdown_duration": 0, "max_drawdown_start": self.first_label, "max_drawdown_end": self.first_label})
+			return out
+
+		cagr = float(self.equity ** (ppy / float(self.n)) - 1.0)
+		std = np.sqrt(self.m2 / (self.n - 1))
+		downside = np.sqrt(self.downside_sq / self.n)
+		in_drawdown = self.max_drawdown < 0
+		if in_drawdown:
+			end_pos = self._pos_end if self.recovered else self.n - 1
+			end = self.dd_end if self.recovered else self.last_label
+			start_pos, start = self._pos_start, self.dd_start
+		else:
+			start_pos = end_pos = 0
+			start = end = self.first_label
+		return {
+			"cagr": cagr,
+			"vol": float(std * np.sqrt(ppy)),
+			"sharpe": float(self.mean * ppy / (std * np.sqrt(ppy))) if std > 0 else 0.0,
+			"sortino": float(self.mean * ppy / (downside * np.sqrt(ppy))) if downside > 0 else 0.0,
+			"max_drawdown": self.max_drawdown,
+			"max_drawdown_duration": int(end_pos - start_pos),
+			"max_drawdown_start": start,
+			"max_drawdown_end": end,
+			"calmar": cagr / -self.max_drawdown if in_drawdown else 0.0,
+			"hit_rate": self.n_positive / self.n_nonzero if self.n_nonzero else 0.0,
+			"turnover": float(self.turnover / self.n * ppy),
+		}
+
+
+@instrument(rows=lambda res, *args, **kwargs: res.stats["n_obs"])
+def run_streaming_backtest(
+	chunks: Iterable[Chunk],
+	cost_bps: float = 0.0,
+	periods_per_year: float = 252.0,
+	keep_series: bool = False,
+) -> BacktestResult:
+	"""Backtest a stream of price chunks with constant memory.
+
+	Args:
+		chunks: Iterable of price Series (buy and hold) or ``(prices, signal)``
+			tuples, in time order, e.g. from :func:`iter_price_chunks`
+		cost_bps: Transaction costs in basis points (default: 0.0)
+		periods_per_year: Annualization factor (default: 252 for daily bars)
+		keep_series: Keep the per-bar returns and equity curve (memory then grows
+			with the history; by default they are empty)
+
+	Returns:
+		BacktestResult whose stats match ``run_vectorized_backtest`` on the
+		concatenated data, plus ``final_equity``, ``total_return`` and ``n_obs``
+	"""
+	bt = StreamingBacktest(cost_bps=cost_bps, periods_per_year=periods_per_year)
+	returns, equity = [], []
+	for chunk in chunks:
+		prices, signal = chunk if isinstance(chunk, tuple) else (chunk, None)
+		net, eq = bt.update(prices, signal)
+		if keep_series:
+			returns.append(net)
+			equity.append(eq)
+
+	stats = bt.stats()
+	stats["final_equity"] = float(bt.equity)
+	stats["total_return"] = float(bt.equity - 1.0)
+	stats["n_obs"] = int(bt.n)
+	if returns:
+		net_series, equity_series = pd.concat(returns), pd.concat(equity)
+	else:
+		net_series, equity_series = pd.Series(dtype=np.float64), pd.Series(dtype=np.float64)
+	return BacktestResult(returns=net_series, equity_curve=equity_series, stats=stats)
+
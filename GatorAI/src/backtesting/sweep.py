@@ -0,0 +1,212 @@
+"""Parameter sweeps over one strategy family with shared precomputed returns."""
+from __future__ import annotations
+
+import itertools
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .backtest_engine import _simulate_batch
+from .bootstrap import BOOTSTRAP_STATS, bootstrap_metrics
+from .indicators import IndicatorCache, data_version
+from .metrics import compute_metrics
+from .strategies import FAMILY_PARAMS, family_positions, valid_params
+
+logger = logging.getLogger(__name__)
+
+# Stats kept per parameter set (drawdown start/end positions are dropped)
+SWEEP_STATS = (
+	"cagr", "vol", "sharpe", "sortino", "max_drawdown", "max_drawdown_duration",
+	"calmar", "hit_rate", "turnover",
+)
+
+
+def parameter_grid(family: str, ranges: Dict[str, Sequence[float]]) -> pd.DataFrame:
+	"""Cartesian product of parameter values, with invalid combinations removed.
+
+	Args:
+		family: Strategy family name (see ``strategies.FAMILY_PARAMS``)
+		ranges: Mapping of parameter name to the values to try
+
+	Returns:
+		DataFrame with one column per parameter and one row per combination
+
+	Raises:
+		ValueError: If a parameter of the family has no range
+	"""
+	if family not in FAMILY_PARAMS:
+		raise ValueError(f"Unknown strategy family '{family}'. Choose from {list(FAMILY_PARAMS)}")
+	names = FAMILY_PARAMS[family]
+	missing = [n for n in names if n not in ranges]
+	if missing:
+		raise ValueError(f"Missing parameter ranges for {family}: {missing}")
+	values = [np.unique(np.asarray(ranges[n], dtype=float)) for n in names]
+	combos = np.array(list(itertools.product(*values)), dtype=float).reshape(-1, len(names))
+	combos = combos[valid_params(family, combos)]
+	return pd.DataFrame(combos, columns=list(names))
+
+
+def _coarse_survivors(
+	positions: np.ndarray,
+	axis_lengths: np.ndarray,
+	coarse_scores: pd.Series,
+	stride: int,
+	quantile: float,
+) -> np.ndarray:
+	"""Mask of grid rows whose nearest coarse point was not dominated.
+
+	``positions`` holds each grid row's index along every parameter axis and
+	``coarse_scores`` is indexed by the row number of the coarse points.
+	"""
+	last_coarse = ((axis_lengths - 1) // stride) * stride
+	nearest = np.minimum(np.rint(positions / stride).astype(int) * stride, last_coarse)
+	threshold = np.nanquantile(coarse_scores.to_numpy(), quantile)
+	below = coarse_scores.index[~(coarse_scores.to_numpy() >= threshold)]
+	dominated = {tuple(positions[i]) for i in below}
+	return np.array([tuple(row) not in dominated for row in nearest], dtype=bool)
+
+
+def run_parameter_sweep(
+	prices: Union[pd.Series, np.ndarray],
+	family: str,
+	ranges: Dict[str, Sequence[float]],
+	method: str = "grid",
+	n_iter: int = 100,
+	seed: Optional[int] = None,
+	cost_bps: float = 0.0,
+	metric: str = "sharpe",
+	batch_size: int = 512,
+	prune_quantile: Optional[float] = None,
+	prune_stride: int = 2,
+	periods_per_year: float = 252.0,
+	output_path: Optional[Union[str, Path]] = None,
+	cache: Optional[IndicatorCache] = None,
+	n_bootstrap: int = 0,
+	confidence: float = 0.95,
+) -> pd.DataFrame:
+	"""Evaluate many parameter sets of one strategy family on a single price series.
+
+	Price returns are computed once and every batch of parameter sets is run as
+	one (time x batch) position matrix through the batched engine.
+
+	With ``prune_quantile`` set (grid search only), a coarse grid taking every
+	``prune_stride``-th value along each parameter axis is evaluated first; fine
+	grid points whose nearest coarse point scores below that quantile of
+	``metric`` are skipped.
+
+	With ``n_bootstrap`` set, every row gets stationary block bootstrap
+	confidence intervals (see ``bootstrap.bootstrap_metrics``). All rows are
+	resampled with the same bar indices (one seed is fixed per sweep and shared
+	by every batch, even with ``seed=None``), so their intervals are comparable.
+
+	Args:
+		prices: Price series for one instrument
+		family: Strategy family ("ma_crossover", "rsi", "macd", "bollinger")
+		ranges: Mapping of parameter name to the values to try
+		method: "grid" for the full grid, "random" for ``n_iter`` samples of it
+		n_iter: Number of random samples (random search only)
+		seed: Seed for random search and the bootstrap
+		cost_bps: Transaction costs in basis points (default: 0.0)
+		metric: Stat used for ranking and pruning (default: "sharpe")
+		batch_size: Parameter sets evaluated per NumPy batch
+		prune_quantile: Drop regions whose coarse score is below this quantile
+		prune_stride: Step along each axis for the coarse grid
+		periods_per_year: Annualization factor (default: 252)
+		output_path: Optional CSV or Parquet path for the ranked table
+		cache: Indicator cache to reuse across sweeps, e.g. ``indicators.INDICATOR_CACHE``
+			(default: a cache private to this call)
+		n_bootstrap: Bootstrap paths per row (default: 0, no intervals)
+		confidence: Confidence level of the bootstrap intervals
+
+	Returns:
+		Ranked DataFrame with one row per evaluated parameter set: the parameter
+		columns (int32 where whole-numbered) followed by the ``SWEEP_STATS`` and
+		total_return (float32), plus ``<stat>_lower``/``<stat>_upper`` columns
+		for the ``BOOTSTRAP_STATS`` when bootstrapping
+
+	Raises:
+		ValueError: If the family, method or metric is unknown
+	"""
+	if method not in ("grid", "random"):
+		raise ValueError(f"Unknown search method '{method}'. Choose 'grid' or 'random'")
+
+	px = np.asarray(pd.Series(prices).dropna(), dtype=np.float64)
+	asset_returns = np.zeros((len(px), 1))
+	asset_returns[1:, 0] = px[1:] / px[:-1] - 1.0
+
+	grid = parameter_grid(family, ranges)
+	if method == "random" and n_iter < len(grid):
+		rng = np.random.default_rng(seed)
+		grid = grid.iloc[np.sort(rng.choice(len(grid), size=n_iter, replace=False))].reset_index(drop=True)
+
+	if cache is None:
+		cache = IndicatorCache()
+	ticker = getattr(prices, "name", None)
+	version = data_version(px)
+	bootstrap_seed = np.random.SeedSequence(seed).entropy
+
+	def evaluate(params: pd.DataFrame) -> pd.DataFrame:
+		frames = []
+		for start in range(0, len(params), batch_size):
+			chunk = params.iloc[start:start + batch_size]
+			positions = family_positions(
+				family, px, list(chunk.itertuples(index=False, name=None)), cache, ticker=ticker, version=version
+			)
+			net, equity, held = _simulate_batch(asset_returns, positions, cost_bps)
+			stats = compute_metrics(net, equity=equity, positions=held, periods_per_year=periods_per_year)
+			stats = {k: v for k, v in stats.items() if k in SWEEP_STATS}
+			stats["total_return"] = equity[-1] - 1.0 if len(equity) else np.zeros(len(chunk))
+			if n_bootstrap and len(net) > 1:
+				ci = bootstrap_metrics(
+					pd.DataFrame(net, columns=chunk.index), n_bootstrap, periods_per_year=periods_per_year, seed=bootstrap_seed
+				).intervals(confidence)
+				for name in BOOTSTRAP_STATS:
+					bounds = ci.xs(name, level="stat")
+					stats[f"{name}_lower"] = bounds["lower"].to_numpy()
+					stats[f"{name}_upper"] = bounds["upper"].to_numpy()
+			frames.append(pd.DataFrame(stats, index=chunk.index))
+		if not frames:
+			return pd.DataFrame(columns=list(SWEEP_STATS) + ["total_return"])
+		return pd.concat(frames)
+
+	if prune_quantile is not None and method == "grid" and len(grid):
+		axes = [np.unique(grid[name].to_numpy()) for name in grid.columns]
+		axis_positions = np.column_stack(
+			[np.searchsorted(axis, grid[name].to_numpy()) for axis, name in zip(axes, grid.columns)]
+		)
+		is_coarse = (axis_positions % prune_stride == 0).all(axis=1)
+		coarse_stats = evaluate(grid[is_coarse])
+		if metric not in coarse_stats.columns:
+			raise ValueError(f"Unknown metric '{metric}'. Choose from {list(coarse_stats.columns)}")
+		axis_lengths = np.array([len(axis) for axis in axes])
+		keep = _coarse_survivors(axis_positions, axis_lengths, coarse_stats[metric], prune_stride, prune_quantile)
+		fine = grid[~is_coarse & keep]
+		logger.info(
+			f"Pruned {int((~is_coarse & ~keep).sum())} of {len(grid)} parameter sets after coarse pass"
+		)
+		stats = pd.concat([coarse_stats, evaluate(fine)])
+	else:
+		stats = evaluate(grid)
+
+	if metric not in stats.columns:
+		raise ValueError(f"Unknown metric '{metric}'. Choose from {list(stats.columns)}")
+
+	params = grid.loc[stats.index]
+	for name in params.columns:
+		if np.all(np.mod(params[name].to_numpy(), 1.0) == 0):
+			params[name] = params[name].astype(np.int32)
+	results = params.join(stats.astype(np.float32))
+	results = results.sort_values(metric, ascending=False, kind="stable").reset_index(drop=True)
+
+	if output_path is not None:
+		out = Path(output_path)
+		if out.suffix == ".parquet":
+			results.to_parquet(out, index=False)
+		else:
+			results.to_csv(out, index=False)
+		logger.info(f"Saved {len(results)} sweep results to {out}")
+
+	return results
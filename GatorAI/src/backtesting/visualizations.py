@@ -1,20 +1,24 @@
 from __future__ import annotations
 
+from typing import Optional
+
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from .downsample import DEFAULT_MAX_POINTS, downsample
+from .metrics import drawdown_series
+
 
-def plot_equity(equity: pd.Series) -> plt.Axes:
-	ax = equity.plot(title="Equity Curve")
+def plot_equity(equity: pd.Series, max_points: Optional[int] = DEFAULT_MAX_POINTS) -> plt.Axes:
+	ax = downsample(equity, max_points, method="lttb").plot(title="Equity Curve")
 	ax.set_xlabel("Date")
 	ax.set_ylabel("Equity")
 	return ax
 
 
-def plot_drawdown(equity: pd.Series) -> plt.Axes:
-	roll_max = equity.cummax()
-	drawdown = equity / roll_max - 1.0
-	ax = drawdown.plot(title="Drawdown")
+def plot_drawdown(equity: pd.Series, max_points: Optional[int] = DEFAULT_MAX_POINTS) -> plt.Axes:
+	# Min/max buckets keep the deepest point of every drawdown visible.
+	ax = downsample(drawdown_series(equity), max_points, method="minmax").plot(title="Drawdown")
 	ax.set_xlabel("Date")
 	ax.set_ylabel("Drawdown")
 	return ax
@@ -1,17 +1,31 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 
+# Make the packages under GatorAI/src importable when launched with `streamlit run`.
+src_path = str(Path(__file__).resolve().parents[1])
+if src_path not in sys.path:
+	sys.path.insert(0, src_path)
+
+from dashboard import services
+
 st.set_page_config(page_title="GatorAI Dashboard", layout="wide")
 
 st.title("GatorAI Dashboard Prototype")
 
 st.markdown("Load data, run a simple backtest, and visualize results.")
 
-uploaded = st.file_uploader("Upload returns CSV (wide format)", type=["csv"])
+uploaded = st.file_uploader("Upload returns CSV (wide format)", type=["csv", "parquet", "feather"])
 
 if uploaded is not None:
-	ret = pd.read_csv(uploaded, index_col=0, parse_dates=True)
+	data = uploaded.getvalue()
+	digest = services.file_digest(data)
+	ret = services.load_returns(digest, uploaded.name, data)
 	st.write("Preview:", ret.head())
-	st.line_chart(ret.cumsum())
+	st.line_chart(services.for_chart(services.cumulative_returns(digest, ret)))
 else:
 	st.info("Upload a CSV of returns to preview cumulative returns.")
+
+services.render_cache_panel()
@@ -0,0 +1,352 @@
+"""Cached data and backtest layer shared by the Streamlit dashboards.
+
+Streamlit reruns the whole script on every widget change. Everything
+expensive goes through the functions below, which are memoized with
+``st.cache_data`` on the uploaded file's SHA-256 digest and the call
+parameters. Raw bytes and frames are passed as underscore arguments so they
+are never hashed. Every cache is bounded by ``MAX_ENTRIES``/``TTL_SECONDS``
+(indicators by the LRU ``INDICATOR_CACHE``), cleared together by
+:func:`clear_caches`, and counted per function for :func:`render_cache_panel`.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import io
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from backtesting.backtest_engine import run_batched_backtest
+from backtesting.downsample import MultiResolutionSeries, downsample
+from backtesting.event_engine import run_event_backtest
+from backtesting.indicators import INDICATOR_CACHE, cached_indicator
+from backtesting.strategies import FAMILY_PARAMS, family_positions
+from backtesting.sweep import run_parameter_sweep
+from data.returns_panel import build_returns_panel
+
+MAX_ENTRIES = 32
+TTL_SECONDS = 3600
+# Points sent to a chart; roughly the pixel width of a wide layout
+MAX_CHART_POINTS = 2000
+
+# Dashboard strategy labels -> strategies.py families
+STRATEGY_FAMILIES = {
+	"Moving Average": "ma_crossover",
+	"RSI": "rsi",
+	"MACD": "macd",
+	"Bollinger Bands": "bollinger",
+}
+
+# Bars per year for the dashboard timeframes (6.5-hour sessions, 252 days)
+PERIODS_PER_YEAR = {
+	"1m": 252 * 390,
+	"5m": 252 * 78,
+	"15m": 252 * 26,
+	"1h": 252 * 7,
+	"4h": 252 * 2,
+	"1d": 252,
+}
+
+# Strategy parameters that are lookback windows in bars, so must be at least 1
+WINDOW_PARAMS = frozenset({"fast", "slow", "signal", "window"})
+
+_COUNTS: Dict[str, Dict[str, int]] = {}
+_CACHED: Dict[str, Any] = {}
+_LOCK = threading.Lock()
+
+
+def _bump(name: str, field: str) -> None:
+	with _LOCK:
+		counts = _COUNTS.setdefault(name, {"calls": 0, "misses": 0})
+		counts[field] += 1
+
+
+def _cached(func: Optional[Callable] = None, *, resource: bool = False) -> Callable:
+	"""``st.cache_data`` (or ``st.cache_resource``) with the shared bounds plus call/miss counting."""
+	if func is None:
+		return functools.partial(_cached, resource=resource)
+	name = func.__name__
+
+	@functools.wraps(func)
+	def compute(*args, **kwargs):
+		_bump(name, "misses")  # only runs when Streamlit has no cached value
+		return func(*args, **kwargs)
+
+	cache = st.cache_resource if resource else st.cache_data
+	cached = cache(max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, show_spinner=False)(compute)
+
+	@functools.wraps(func)
+	def wrapper(*args, **kwargs):
+		_bump(name, "calls")
+		return cached(*args, **kwargs)
+
+	wrapper.clear = cached.clear
+	_CACHED[name] = cached
+	return wrapper
+
+
+def file_digest(data: bytes) -> str:
+	"""SHA-256 of an upload, used as the cache key instead of the bytes themselves."""
+	return hashlib.sha256(data).hexdigest()
+
+
+def _read_bytes(name: str, data: bytes) -> pd.DataFrame:
+	buf = io.BytesIO(data)
+	if name.endswith(".parquet"):
+		return pd.read_parquet(buf)
+	if name.endswith(".feather"):
+		return pd.read_feather(buf)
+	return pd.read_csv(buf)
+
+
+@_cached
+def load_returns(digest: str, name: str, _data: bytes) -> pd.DataFrame:
+	"""Wide returns table (date index) from an uploaded CSV, Parquet or Feather file.
+
+	Long OHLCV uploads (with a ``ticker`` column, e.g. ``fetch_ohlc`` output)
+	are turned into simple returns through the on-disk returns panel cache.
+	"""
+	frame = _read_bytes(name, _data)
+	if "ticker" in frame.columns:
+		prices = load_prices(digest, name, _data)
+		price_col = "adj_close" if "adj_close" in prices.columns else "close"
+		return build_returns_panel(prices, price_col=price_col).returns_frame()
+	if name.endswith(".parquet"):
+		return frame
+	frame = frame.set_index(frame.columns[0])
+	if not name.endswith(".feather"):
+		frame.index = pd.to_datetime(frame.index)
+	return frame
+
+
+@_cached
+def cumulative_returns(digest: str, _returns: pd.DataFrame) -> pd.DataFrame:
+	return _returns.cumsum()
+
+
+@_cached
+def load_prices(digest: str, name: str, _data: bytes) -> pd.DataFrame:
+	"""Long OHLCV frame (``ticker``, ``datetime``, prices, volume) from an upload.
+
+	Accepts ``fetch_ohlc`` output, single-ticker processed files without a
+	``ticker`` column (named after the file) and store parts.
+	"""
+	frame = _read_bytes(name, _data)
+	frame.columns = [str(c).strip().lower().replace(" ", "_") for c in frame.columns]
+	if "datetime" not in frame.columns:
+		date_col = "date" if "date" in frame.columns else frame.columns[0]
+		frame = frame.rename(columns={date_col: "datetime"})
+	if "ticker" not in frame.columns:
+		frame.insert(0, "ticker", name.rsplit(".", 1)[0].split("_")[0].upper())
+	if "close" not in frame.columns and "adj_close" in frame.columns:
+		frame["close"] = frame["adj_close"]
+	frame["datetime"] = pd.to_datetime(frame["datetime"], utc=True)
+	return frame.sort_values(["ticker", "datetime"], kind="stable").reset_index(drop=True)
+
+
+@_cached
+def sample_prices(n_bars: int = 500, seed: int = 42) -> pd.DataFrame:
+	"""Synthetic daily OHLCV for one ticker, in the ``load_prices`` layout."""
+	rng = np.random.default_rng(seed)
+	close = 100.0 * np.cumprod(1.0 + rng.normal(0.0004, 0.012, n_bars))
+	open_ = np.concatenate([[close[0]], close[:-1]]) * (1.0 + rng.normal(0.0, 0.002, n_bars))
+	spread = np.abs(rng.normal(0.0, 0.006, n_bars)) * close
+	return pd.DataFrame({
+		"ticker": "SAMPLE",
+		"datetime": pd.date_range(end=pd.Timestamp.today(tz="UTC").normalize(), periods=n_bars, freq="B"),
+		"open": open_,
+		"high": np.maximum(open_, close) + spread,
+		"low": np.minimum(open_, close) - spread,
+		"close": close,
+		"adj_close": close,
+		"volume": rng.integers(100_000, 1_000_000, n_bars),
+	})
+
+
+@_cached
+def ticker_bars(digest: str, ticker: str, _prices: pd.DataFrame) -> pd.DataFrame:
+	"""One ticker's bars indexed by datetime."""
+	bars = _prices[_prices["ticker"] == ticker].drop(columns="ticker").set_index("datetime")
+	return bars[~bars.index.duplicated(keep="last")]
+
+
+@_cached(resource=True)
+def price_pyramid(digest: str, ticker: str, _close: pd.Series) -> MultiResolutionSeries:
+	"""Min/max pyramid of one ticker's closes, shared (not copied) across reruns."""
+	return MultiResolutionSeries(_close.rename("Price"))
+
+
+def for_chart(data, max_points: int = MAX_CHART_POINTS, method: str = "minmax"):
+	"""Downsample a Series or DataFrame before handing it to ``st.line_chart``/``st.area_chart``."""
+	return downsample(data, max_points, method=method)
+
+
+def indicator(digest: str, ticker: str, name: str, params: Tuple, _close: pd.Series) -> Any:
+	"""Indicator for one ticker through the shared LRU ``INDICATOR_CACHE``."""
+	return cached_indicator(name, _close.rename(ticker), *params, versions={ticker: digest})
+
+
+def strategy_params(family: str, param1: float, param2: float) -> Tuple:
+	"""Map the sidebar's two generic inputs onto a family's parameters.
+
+	For RSI, ``param2`` is the lower band and the upper band mirrors it at
+	``100 - param2``.
+
+	Raises:
+		ValueError: If the family is unknown, a window is below 1 or the RSI
+			bands would cross
+	"""
+	windows = (param1, param2) if family in ("ma_crossover", "macd") else (param1,)
+	if any(int(w) < 1 for w in windows):
+		raise ValueError(f"Windows must be at least 1 bar (got {', '.join(str(w) for w in windows)})")
+	if family == "ma_crossover":
+		return (int(param1), int(param2))
+	if family == "rsi":
+		if not 0 < param2 < 50:
+			raise ValueError(f"RSI lower band must be between 0 and 50 (got {param2}), so it stays below 100 - lower")
+		return (int(param1), float(param2), float(100 - param2))
+	if family == "macd":
+		return (int(param1), int(param2), 9)
+	if family == "bollinger":
+		return (int(param1), 2.0)
+	raise ValueError(f"Unknown strategy family '{family}'. Choose from {list(FAMILY_PARAMS)}")
+
+
+@_cached
+def run_backtest(
+	digest: str,
+	ticker: str,
+	family: str,
+	params: Tuple,
+	cost_bps: float,
+	periods_per_year: float,
+	_bars: pd.DataFrame,
+) -> Dict[str, Any]:
+	"""Backtest one parameter set: equity and stats plus the event engine's trade list."""
+	close = _bars["close"].astype(float)
+	positions = family_positions(family, close.to_numpy(), [params], INDICATOR_CACHE, ticker=ticker, version=digest)
+	signal = pd.Series(positions[:, 0], index=close.index)
+	batch = run_batched_backtest(close.to_frame(ticker), signal.to_frame(ticker), cost_bps, periods_per_year)
+	result = batch.to_results()[0]
+	result.stats["total_return"] = float(result.equity_curve.iloc[-1] - 1.0) if len(close) else 0.0
+
+	initial_cash = 100_000.0
+	units = np.floor(initial_cash / close.iloc[0]) if len(close) else 0.0
+	events = run_event_backtest(
+		_bars[[c for c in ("open", "close") if c in _bars.columns]].astype(float),
+		signal,
+		quantity=units,
+		initial_cash=initial_cash,
+		commission_bps=cost_bps,
+		periods_per_year=periods_per_year,
+	)
+	return {
+		"equity": result.equity_curve,
+		"returns": result.returns,
+		"signal": signal,
+		"stats": result.stats,
+		"trades": events.trades.to_frame(),
+	}
+
+
+@_cached
+def run_sweep(
+	digest: str,
+	ticker: str,
+	family: str,
+	ranges: Tuple[Tuple[str, Tuple[float, ...]], ...],
+	method: str,
+	n_iter: int,
+	metric: str,
+	cost_bps: float,
+	periods_per_year: float,
+	_close: pd.Series,
+) -> pd.DataFrame:
+	"""Ranked parameter sweep; ``ranges`` is a tuple of (name, values) pairs so it hashes."""
+	return run_parameter_sweep(
+		_close.rename(ticker),
+		family,
+		{name: list(values) for name, values in ranges},
+		method=method,
+		n_iter=n_iter,
+		seed=0,
+		cost_bps=cost_bps,
+		metric=metric,
+		periods_per_year=periods_per_year,
+		cache=INDICATOR_CACHE,
+	)
+
+
+def parse_range(text: str, max_values: int = 10, minimum: Optional[float] = None) -> Tuple[float, ...]:
+	"""Parse ``"lo-hi"`` (or a comma list) into at most ``max_values`` evenly spaced values.
+
+	Raises:
+		ValueError: If the text is not a number, range or list, or a value is below ``minimum``
+	"""
+	text = text.strip()
+	if "," in text:
+		values = tuple(float(v) for v in text.split(",") if v.strip())
+	else:
+		lo, _, hi = text.partition("-")
+		lo, hi = float(lo), float(hi or lo)
+		if lo.is_integer() and hi.is_integer():
+			step = max(1, int(np.ceil((hi - lo + 1) / max_values)))
+			values = tuple(float(v) for v in range(int(lo), int(hi) + 1, step))
+		else:
+			values = tuple(np.round(np.linspace(lo, hi, max_values), 6))
+	if minimum is not None and any(v < minimum for v in values):
+		raise ValueError(f"Values must be at least {minimum:g} (got {text})")
+	return values
+
+
+def trade_outcomes(trades: pd.DataFrame, tolerance: float = 1e-9) -> pd.Series:
+	"""Count closing trades by outcome (Wins, Losses, Breakeven)."""
+	closing = trades[trades["realized_pnl"] != 0.0] if len(trades) else trades
+	pnl = closing["realized_pnl"] if len(closing) else pd.Series(dtype=float)
+	return pd.Series({
+		"Wins": int((pnl > tolerance).sum()),
+		"Losses": int((pnl < -tolerance).sum()),
+		"Breakeven": int((pnl.abs() <= tolerance).sum()),
+	})
+
+
+def cache_stats() -> pd.DataFrame:
+	"""Calls, hits and misses per cached function, plus the indicator cache."""
+	with _LOCK:
+		rows = {name: dict(counts) for name, counts in _COUNTS.items()}
+	for counts in rows.values():
+		counts["hits"] = counts["calls"] - counts["misses"]
+	info = INDICATOR_CACHE.info()
+	rows["indicators"] = {"calls": info["hits"] + info["misses"], "misses": info["misses"], "hits": info["hits"]}
+	return pd.DataFrame.from_dict(rows, orient="index", columns=["calls", "hits", "misses"])
+
+
+def clear_caches() -> None:
+	"""Drop every cached result and reset the counters."""
+	for cached in _CACHED.values():
+		cached.clear()
+	INDICATOR_CACHE.clear()
+	with _LOCK:
+		_COUNTS.clear()
+
+
+def on_new_data(event: Any) -> None:
+	"""``IngestionService`` subscriber: drop cached results once new bars are stored."""
+	clear_caches()
+
+
+def render_cache_panel(container: Optional[Any] = None) -> None:
+	"""Show cache hit/miss counts and a clear button (default: in the sidebar)."""
+	container = container or st.sidebar
+	stats = cache_stats()
+	with container.expander("Cache", expanded=False):
+		hits, calls = int(stats["hits"].sum()), int(stats["calls"].sum())
+		st.metric("Cache hits", f"{hits} / {calls}")
+		st.dataframe(stats, use_container_width=True)
+		if st.button("Clear cache", key="clear_dashboard_cache"):
+			clear_caches()
+			st.rerun()
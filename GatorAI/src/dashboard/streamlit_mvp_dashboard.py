@@ -1,7 +1,15 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+
+# Make the packages under GatorAI/src importable when launched with `streamlit run`.
+src_path = str(Path(__file__).resolve().parents[1])
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from dashboard import services
 
 # Page configuration
 st.set_page_config(
@@ -26,14 +34,30 @@ data_source = st.sidebar.selectbox(
     ["Upload CSV", "Sample Data", "Live Feed (Coming Soon)"]
 )
 
-# File uploader (placeholder)
+# File uploader; parsed data is cached on the file's hash, not re-read on every rerun
+prices = None
+digest = None
 if data_source == "Upload CSV":
-    uploaded_file = st.sidebar.file_uploader("Upload your CSV file", type=['csv'])
+    uploaded_file = st.sidebar.file_uploader("Upload your CSV file", type=['csv', 'parquet', 'feather'])
     if uploaded_file is not None:
-        st.session_state.data_loaded = True
-        st.sidebar.success("✅ File uploaded successfully!")
+        raw = uploaded_file.getvalue()
+        digest = services.file_digest(raw)
+        try:
+            prices = services.load_prices(digest, uploaded_file.name, raw)
+            st.sidebar.success("✅ File uploaded successfully!")
+        except Exception as e:
+            st.sidebar.error(f"Could not read {uploaded_file.name}: {e}")
 elif data_source == "Sample Data":
-    st.session_state.data_loaded = True
+    digest = "sample-500-42"
+    prices = services.sample_prices(500, 42)
+st.session_state.data_loaded = prices is not None
+
+bars = None
+ticker = None
+if prices is not None:
+    tickers = list(pd.unique(prices["ticker"]))
+    ticker = st.sidebar.selectbox("Ticker", tickers) if len(tickers) > 1 else tickers[0]
+    bars = services.ticker_bars(digest, ticker, prices)
 
 # Strategy Selection
 st.sidebar.markdown("---")
@@ -54,6 +78,9 @@ st.sidebar.markdown("---")
 st.sidebar.subheader("Strategy Parameters")
 param1 = st.sidebar.number_input("Parameter 1", value=14, min_value=1, max_value=200)
 param2 = st.sidebar.number_input("Parameter 2", value=28, min_value=1, max_value=200)
+cost_bps = st.sidebar.number_input("Transaction Cost (bps)", value=1.0, min_value=0.0, max_value=100.0)
+family = services.STRATEGY_FAMILIES.get(strategy_type)
+periods_per_year = services.PERIODS_PER_YEAR[timeframe]
 
 # Action buttons
 st.sidebar.markdown("---")
@@ -63,6 +90,25 @@ with col1:
 with col2:
     optimize = st.button("🔧 Optimize", use_container_width=True)
 
+# The backtest runs when "Run Backtest" is pressed; its settings are remembered so later
+# reruns redisplay the cached result instead of backtesting again on every widget change.
+if run_backtest and bars is not None and family is not None:
+    try:
+        params = services.strategy_params(family, param1, param2)
+        st.session_state.backtest_args = (digest, ticker, family, params, cost_bps, periods_per_year)
+    except ValueError as e:
+        st.sidebar.error(f"Invalid strategy parameters: {e}")
+
+backtest = None
+backtest_args = st.session_state.get("backtest_args")
+if backtest_args is not None and bars is not None and backtest_args[:2] == (digest, ticker):
+    try:
+        backtest = services.run_backtest(*backtest_args, bars)
+    except Exception as e:
+        st.sidebar.error(f"Backtest failed: {e}")
+
+services.render_cache_panel()
+
 # Main Dashboard Area
 st.title("📊 Trading Dashboard MVP")
 st.markdown("*Minimum Viable Product - Skeleton Version*")
@@ -76,7 +122,7 @@ with col2:
 with col3:
     st.metric("Timeframe", timeframe, "")
 with col4:
-    st.metric("Status", "Idle", "")
+    st.metric("Status", "Backtested" if backtest is not None else "Idle", "")
 
 st.markdown("---")
 
@@ -90,101 +136,150 @@ with tab1:
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        st.markdown("##### Price Chart (Placeholder)")
-        # Placeholder chart data
-        chart_data = pd.DataFrame(
-            np.random.randn(100, 1) * 10 + 100,
-            columns=['Price']
-        )
-        st.line_chart(chart_data)
+        st.markdown("##### Price Chart")
+        if bars is not None:
+            # Zooming reads only the visible range from a pre-aggregated min/max pyramid
+            view_range = (None, None)
+            if len(bars) > 1:
+                first, last = bars.index[0].tz_convert(None), bars.index[-1].tz_convert(None)
+                view_range = st.slider(
+                    "Zoom", min_value=first.to_pydatetime(), max_value=last.to_pydatetime(),
+                    value=(first.to_pydatetime(), last.to_pydatetime()),
+                )
+                view_range = tuple(pd.Timestamp(v, tz="UTC") for v in view_range)
+            pyramid = services.price_pyramid(digest, ticker, bars["close"].astype(float))
+            chart_data = pyramid.view(*view_range, max_points=services.MAX_CHART_POINTS).to_frame()
+            if family in ("ma_crossover", "bollinger"):
+                window = int(param1)
+                sma = services.indicator(digest, ticker, "sma", (window,), bars["close"].astype(float))
+                chart_data[f"SMA {window}"] = sma.reindex(chart_data.index)
+            st.line_chart(chart_data)
+        else:
+            st.info("Load data to see the price chart.")
     
     with col2:
         st.markdown("##### Key Metrics")
-        st.info("📌 **Latest Price:** $XXX.XX")
-        st.info("📊 **Volume:** X,XXX,XXX")
-        st.info("📈 **Change (24h):** +X.XX%")
-        st.info("🎯 **Signal:** PENDING")
+        if bars is not None and len(bars) > 1:
+            last, prev = bars["close"].iloc[-1], bars["close"].iloc[-2]
+            signal = "LONG" if backtest is not None and backtest["signal"].iloc[-1] > 0 else "FLAT"
+            st.info(f"📌 **Latest Price:** ${last:,.2f}")
+            if "volume" in bars.columns:
+                st.info(f"📊 **Volume:** {bars['volume'].iloc[-1]:,.0f}")
+            st.info(f"📈 **Change (last bar):** {last / prev - 1.0:+.2%}")
+            st.info(f"🎯 **Signal:** {signal if backtest is not None else 'PENDING'}")
+        else:
+            st.info("📌 **Latest Price:** $XXX.XX")
+            st.info("🎯 **Signal:** PENDING")
 
 # Tab 2: Backtest Results
 with tab2:
     st.subheader("Backtest Results")
     
-    if run_backtest:
-        st.success("✅ Backtest initiated! (This is a placeholder)")
-    
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Total Return", "TBD", "TBD%")
-    with col2:
-        st.metric("Sharpe Ratio", "TBD", "")
-    with col3:
-        st.metric("Max Drawdown", "TBD", "TBD%")
-    
-    st.markdown("---")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("##### Equity Curve (Placeholder)")
-        equity_data = pd.DataFrame(
-            np.random.randn(100, 1).cumsum() + 100,
-            columns=['Equity']
-        )
-        st.area_chart(equity_data)
-    
-    with col2:
-        st.markdown("##### Trade Distribution (Placeholder)")
-        trade_data = pd.DataFrame({
-            'Wins': [np.random.randint(40, 60)],
-            'Losses': [np.random.randint(20, 40)],
-            'Breakeven': [np.random.randint(5, 15)]
-        })
-        st.bar_chart(trade_data.T)
-    
-    st.markdown("---")
-    st.markdown("##### Recent Trades (Placeholder)")
-    placeholder_trades = pd.DataFrame({
-        'Date': pd.date_range(end=datetime.now(), periods=5, freq='D'),
-        'Type': ['BUY', 'SELL', 'BUY', 'SELL', 'BUY'],
-        'Price': np.random.uniform(95, 105, 5).round(2),
-        'Quantity': np.random.randint(10, 100, 5),
-        'P&L': np.random.uniform(-50, 150, 5).round(2)
-    })
-    st.dataframe(placeholder_trades, use_container_width=True)
+    if backtest is None:
+        if strategy_type == "Custom":
+            st.info("Custom strategies are not available yet; pick one of the built-in strategies.")
+        elif bars is None:
+            st.warning("⚠️ Load data to run a backtest.")
+        else:
+            st.info("Set the strategy parameters and press ▶️ Run Backtest.")
+    else:
+        if run_backtest:
+            st.success("✅ Backtest complete")
+        _, _, shown_family, shown_params = backtest_args[:4]
+        st.caption(f"{shown_family} {shown_params}; press ▶️ Run Backtest again after changing the settings.")
+        stats = backtest["stats"]
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Return", f"{stats['total_return']:.2%}", f"CAGR {stats['cagr']:.2%}")
+        with col2:
+            st.metric("Sharpe Ratio", f"{stats['sharpe']:.2f}", f"Sortino {stats['sortino']:.2f}")
+        with col3:
+            st.metric("Max Drawdown", f"{stats['max_drawdown']:.2%}", f"{int(stats['max_drawdown_duration'])} bars")
+        
+        st.markdown("---")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("##### Equity Curve")
+            st.area_chart(services.for_chart(backtest["equity"].rename("Equity"), method="lttb"))
+        
+        with col2:
+            st.markdown("##### Trade Distribution")
+            st.bar_chart(services.trade_outcomes(backtest["trades"]).rename("Trades"))
+        
+        st.markdown("---")
+        st.markdown("##### Recent Trades")
+        trades = backtest["trades"].tail(5).iloc[::-1]
+        st.dataframe(pd.DataFrame({
+            'Date': trades["time"],
+            'Type': trades["side"],
+            'Price': trades["price"].round(2),
+            'Quantity': trades["quantity"].abs(),
+            'P&L': trades["realized_pnl"].round(2)
+        }), use_container_width=True)
 
 # Tab 3: Optimizer
 with tab3:
     st.subheader("Strategy Optimizer")
     
-    if optimize:
-        st.success("✅ Optimization initiated! (This is a placeholder)")
-    
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("##### Parameter Ranges")
-        st.text_input("Parameter 1 Range", value="10-50")
-        st.text_input("Parameter 2 Range", value="20-60")
-        st.text_input("Parameter 3 Range", value="5-15")
+        range_texts = [
+            st.text_input("Parameter 1 Range", value="10-50"),
+            st.text_input("Parameter 2 Range", value="20-60"),
+            st.text_input("Parameter 3 Range", value="5-15"),
+        ]
         
     with col2:
         st.markdown("##### Optimization Settings")
-        st.selectbox("Optimization Method", ["Grid Search", "Random Search", "Genetic Algorithm"])
-        st.number_input("Max Iterations", value=100, min_value=10, max_value=1000)
-        st.selectbox("Target Metric", ["Sharpe Ratio", "Total Return", "Win Rate"])
+        method = st.selectbox("Optimization Method", ["Grid Search", "Random Search", "Genetic Algorithm"])
+        max_iter = st.number_input("Max Iterations", value=100, min_value=10, max_value=1000)
+        target = st.selectbox("Target Metric", ["Sharpe Ratio", "Total Return", "Win Rate"])
     
     st.markdown("---")
-    st.markdown("##### Optimization Results (Placeholder)")
+    st.markdown("##### Optimization Results")
+    
+    # The sweep runs when "Optimize" is pressed; its settings are remembered so later
+    # reruns redisplay the cached result instead of sweeping again on every widget change.
+    if optimize:
+        if bars is None or family is None:
+            st.warning("⚠️ Load data and pick a built-in strategy to optimize.")
+        elif method == "Genetic Algorithm":
+            st.info("Genetic search is not available yet; use Grid or Random Search.")
+        else:
+            try:
+                names = services.FAMILY_PARAMS[family]
+                ranges = tuple(
+                    (name, services.parse_range(text, minimum=1 if name in services.WINDOW_PARAMS else None))
+                    for name, text in zip(names, range_texts)
+                )
+                st.session_state.sweep_args = (
+                    digest, ticker, family, ranges,
+                    "random" if method == "Random Search" else "grid",
+                    int(max_iter),
+                    {"Sharpe Ratio": "sharpe", "Total Return": "total_return", "Win Rate": "hit_rate"}[target],
+                    cost_bps, periods_per_year,
+                )
+            except ValueError as e:
+                st.error(f"Invalid parameter ranges: {e}")
     
-    optimization_results = pd.DataFrame({
-        'Param1': np.random.randint(10, 50, 10),
-        'Param2': np.random.randint(20, 60, 10),
-        'Param3': np.random.randint(5, 15, 10),
-        'Sharpe': np.random.uniform(0.5, 2.5, 10).round(2),
-        'Return': np.random.uniform(-10, 30, 10).round(2),
-        'Win Rate': np.random.uniform(40, 70, 10).round(1)
-    })
-    st.dataframe(optimization_results, use_container_width=True)
+    sweep_args = st.session_state.get("sweep_args")
+    if sweep_args is not None and bars is not None and sweep_args[:2] == (digest, ticker):
+        try:
+            results = services.run_sweep(*sweep_args, bars["close"].astype(float))
+        except Exception as e:
+            st.error(f"Optimization failed: {e}")
+        else:
+            if results.empty:
+                st.warning("No valid parameter combinations in these ranges.")
+            else:
+                st.dataframe(results.head(10), use_container_width=True)
+    else:
+        st.info("Set the ranges and press 🔧 Optimize.")
 
 # Tab 4: Data Preview
 with tab4:
@@ -193,18 +288,10 @@ with tab4:
     if st.session_state.data_loaded:
         st.success("✅ Data loaded successfully")
         
-        # Generate sample OHLCV data
-        sample_data = pd.DataFrame({
-            'Date': pd.date_range(end=datetime.now(), periods=20, freq='1H'),
-            'Open': np.random.uniform(95, 105, 20).round(2),
-            'High': np.random.uniform(100, 110, 20).round(2),
-            'Low': np.random.uniform(90, 100, 20).round(2),
-            'Close': np.random.uniform(95, 105, 20).round(2),
-            'Volume': np.random.randint(10000, 100000, 20)
-        })
+        sample_data = bars.reset_index().rename(columns=str.title)
         
         st.markdown("##### Raw Data Sample")
-        st.dataframe(sample_data, use_container_width=True)
+        st.dataframe(sample_data.tail(20), use_container_width=True)
         
         col1, col2 = st.columns(2)
         with col1:
@@ -214,7 +301,7 @@ with tab4:
         with col2:
             st.markdown("##### Data Info")
             st.info(f"📊 **Rows:** {len(sample_data)}")
-            st.info(f"📅 **Date Range:** {sample_data['Date'].min()} to {sample_data['Date'].max()}")
+            st.info(f"📅 **Date Range:** {sample_data['Datetime'].min()} to {sample_data['Datetime'].max()}")
             st.info(f"💾 **Memory Usage:** ~{sample_data.memory_usage(deep=True).sum() / 1024:.2f} KB")
     else:
         st.warning("⚠️ No data loaded. Please select a data source from the sidebar.")
@@ -225,7 +312,7 @@ st.markdown("---")
 st.markdown(
     """
     <div style='text-align: center; color: #666; padding: 20px;'>
-        <p>🚧 <strong>MVP Version</strong> - This is a skeleton dashboard with placeholder functionality</p>
+        <p>🚧 <strong>MVP Version</strong> - Backtests, trades and sweeps are live; cached on file hash and parameters</p>
         <p>Future modules will be integrated: Backtesting Engine • Strategy Optimizer • Live Trading • Risk Management</p>
     </div>
     """,
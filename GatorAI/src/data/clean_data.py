@@ -1,9 +1,29 @@
+"""Cleaning of long-format OHLCV frames.
+
+:func:`clean_ohlcv` runs over a whole multi-ticker long frame at once: one
+stable sort by (ticker, datetime), then column-wise NumPy passes that forward
+fill within each ticker, enforce dtypes and flag suspicious bars. Each column
+is gathered once and the result frame is built once, with no intermediate
+per-ticker frames or copies.
+"""
 from __future__ import annotations
 
+from typing import Iterable, Optional
+
+import numpy as np
 import pandas as pd
 
+from .store import PRICE_COLUMNS
+
+LONG_COLUMNS = ["ticker", "datetime", *PRICE_COLUMNS, "volume"]
+FLAG_COLUMNS = ["filled", "bad_ohlc", "outlier"]
+
 
 def standardize_ohlc_columns(df: pd.DataFrame) -> pd.DataFrame:
+	"""Rename raw download columns (yfinance style) to the long-format schema."""
+	if isinstance(df.columns, pd.MultiIndex):
+		# yfinance returns (field, ticker) columns even for a single ticker
+		df = df.droplevel(list(range(1, df.columns.nlevels)), axis=1)
 	cols = {
 		"Open": "open",
 		"High": "high",
@@ -11,9 +31,177 @@ def standardize_ohlc_columns(df: pd.DataFrame) -> pd.DataFrame:
 		"Close": "close",
 		"Adj Close": "adj_close",
 		"Volume": "volume",
+		"Date": "datetime",
+		"Datetime": "datetime",
 	}
 	return df.rename(columns=cols)
 
 
-def drop_missing(df: pd.DataFrame) -> pd.DataFrame:
-	return df.dropna().copy()
+def drop_missing(df: pd.DataFrame, subset: Optional[Iterable[str]] = None) -> pd.DataFrame:
+	"""Drop rows with missing values (in ``subset`` only, if given)."""
+	return df.dropna(subset=None if subset is None else list(subset))
+
+
+def _group_starts(codes: np.ndarray) -> np.ndarray:
+	starts = np.ones(len(codes), dtype=bool)
+	starts[1:] = codes[1:] != codes[:-1]
+	return starts
+
+
+def _sort_order(codes: np.ndarray, ns: np.ndarray) -> np.ndarray:
+	"""Stable (ticker, time) order: sort by time, then radix-sort the small ticker codes."""
+	by_time = np.argsort(ns, kind="stable")
+	ranked = codes[by_time]
+	if len(ranked) and ranked.max() < 2**16:
+		ranked = ranked.astype(np.uint16)
+	return by_time[np.argsort(ranked, kind="stable")]
+
+
+def _ffill(values: np.ndarray, starts: np.ndarray, limit: Optional[int]) -> np.ndarray:
+	"""Forward-fill NaNs without crossing group (ticker) boundaries."""
+	positions = np.arange(len(values))
+	source = np.maximum.accumulate(np.where(~np.isnan(values) | starts, positions, 0))
+	if limit is not None:
+		source = np.where(positions - source <= limit, source, positions)
+	return values[source]
+
+
+def _outliers(close: np.ndarray, starts: np.ndarray, codes: np.ndarray, threshold: float) -> np.ndarray:
+	"""Bars whose log return is more than ``threshold`` scaled MADs from their ticker's median."""
+	with np.errstate(divide="ignore", invalid="ignore"):
+		ret = np.log(close[1:] / close[:-1])
+	ret = np.concatenate([[np.nan], ret])
+	ret[starts] = np.nan
+	by_ticker = pd.Series(ret).groupby(codes)
+	median = by_ticker.transform("median").to_numpy()
+	deviation = np.abs(ret - median)
+	mad = pd.Series(deviation).groupby(codes).transform("median").to_numpy() * 1.4826
+	with np.errstate(divide="ignore", invalid="ignore"):
+		score = np.where(mad > 0, deviation / mad, 0.0)
+	return np.nan_to_num(score, nan=0.0) > threshold
+
+
+def clean_ohlcv(
+	df: pd.DataFrame,
+	float_dtype: str = "float64",
+	fill: Optional[str] = "ffill",
+	fill_limit: Optional[int] = None,
+	keep: str = "last",
+	outlier_threshold: Optional[float] = 10.0,
+	drop_invalid: bool = False,
+) -> pd.DataFrame:
+	"""Clean a long OHLCV frame of one or many tickers in a single vectorized pass.
+
+	Rows are sorted by (ticker, datetime); rows missing either are dropped, as
+	are duplicate timestamps per ticker. Missing prices are forward-filled within each ticker (filled
+	bars get zero volume); rows still missing a price are dropped. Three flag
+	columns are added:
+
+	- ``filled``: the close was missing and has been forward-filled
+	- ``bad_ohlc``: non-positive prices, negative volume, or high/low not
+	  bracketing open and close
+	- ``outlier``: the close-to-close log return is more than
+	  ``outlier_threshold`` scaled MADs from the ticker's median return
+
+	Args:
+		df: Long frame with ``datetime`` (or a datetime index) and OHLCV columns;
+			raw yfinance column names are standardized first. Without a
+			``ticker`` column it is treated as a single ticker.
+		float_dtype: "float64" or "float32" for price columns
+		fill: "ffill" to forward-fill missing prices, or None to drop those rows
+		fill_limit: Maximum consecutive bars to fill (default: unlimited)
+		keep: Which duplicate timestamp to keep, "first" or "last"
+		outlier_threshold: Outlier cut-off in MADs (None: no outlier flags)
+		drop_invalid: Drop ``bad_ohlc`` rows instead of only flagging them
+
+	Returns:
+		Frame with columns [ticker, datetime, open, high, low, close, adj_close,
+		volume] (those present), any other input columns, and the flag columns;
+		``datetime`` is datetime64[ns, UTC] and ``volume`` int64.
+
+	Raises:
+		ValueError: If an option is unknown or there is no datetime column
+	"""
+	if float_dtype not in ("float32", "float64"):
+		raise ValueError("float_dtype must be 'float32' or 'float64'")
+	if fill not in ("ffill", None):
+		raise ValueError(f"Unknown fill policy '{fill}'. Choose 'ffill' or None")
+	if keep not in ("first", "last"):
+		raise ValueError("keep must be 'first' or 'last'")
+
+	df = standardize_ohlc_columns(df)
+	if "datetime" in df.columns:
+		times = pd.DatetimeIndex(pd.to_datetime(df["datetime"], utc=True))
+	elif isinstance(df.index, pd.DatetimeIndex):
+		times = df.index.tz_localize("UTC") if df.index.tz is None else df.index.tz_convert("UTC")
+	else:
+		raise ValueError(f"No 'datetime' column or index found. Available columns: {list(df.columns)}")
+
+	has_ticker = "ticker" in df.columns
+	codes, labels = pd.factorize(df["ticker"], sort=True) if has_ticker else (np.zeros(len(df), dtype=np.int64), None)
+	ns = times.asi8
+	# Rows without a timestamp or ticker (factorize code -1) belong to no series
+	rows = np.flatnonzero(~times.isna() & (codes >= 0))
+	order = rows[_sort_order(codes[rows], ns[rows])]
+	codes, ns = codes[order], ns[order]
+
+	# Duplicate timestamps are adjacent after the sort
+	same = (codes[1:] == codes[:-1]) & (ns[1:] == ns[:-1])
+	unique = np.ones(len(order), dtype=bool)
+	if keep == "last":
+		unique[:-1] = ~same
+	else:
+		unique[1:] = ~same
+	order, codes, ns = order[unique], codes[unique], ns[unique]
+	starts = _group_starts(codes)
+
+	prices = {c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=np.float64)[order] for c in PRICE_COLUMNS if c in df.columns}
+	volume = pd.to_numeric(df["volume"], errors="coerce").to_numpy(dtype=np.float64)[order] if "volume" in df.columns else None
+	key = "close" if "close" in prices else next(iter(prices), None)
+	missing = np.isnan(prices[key]) if key else np.zeros(len(order), dtype=bool)
+	if fill == "ffill":
+		prices = {c: _ffill(v, starts, fill_limit) for c, v in prices.items()}
+	filled = missing & ~np.isnan(prices[key]) if key else missing
+	if volume is not None:
+		volume = np.where(filled | np.isnan(volume), 0.0, volume)
+
+	bad = np.zeros(len(order), dtype=bool)
+	with np.errstate(invalid="ignore"):
+		for v in prices.values():
+			bad |= v <= 0
+		if "high" in prices and "low" in prices:
+			high, low = prices["high"], prices["low"]
+			bad |= low > high
+			for c in ("open", "close"):
+				if c in prices:
+					bad |= (prices[c] > high) | (prices[c] < low)
+		if volume is not None:
+			bad |= volume < 0
+	outlier = (
+		_outliers(prices[key], starts, codes, outlier_threshold)
+		if key and outlier_threshold is not None
+		else np.zeros(len(order), dtype=bool)
+	)
+
+	rows = np.ones(len(order), dtype=bool)
+	for v in prices.values():
+		rows &= ~np.isnan(v)
+	if drop_invalid:
+		rows &= ~bad
+	order = order[rows]
+
+	columns = {}
+	if has_ticker:
+		columns["ticker"] = labels.take(codes[rows])
+	columns["datetime"] = times.take(order)
+	for c, v in prices.items():
+		columns[c] = v[rows].astype(float_dtype, copy=False)
+	if volume is not None:
+		columns["volume"] = np.rint(volume[rows]).astype(np.int64)
+	for c in df.columns:
+		if c not in columns and c not in FLAG_COLUMNS:
+			columns[c] = df[c].to_numpy()[order]
+	columns["filled"] = filled[rows]
+	columns["bad_ohlc"] = bad[rows]
+	columns["outlier"] = outlier[rows]
+	return pd.DataFrame(columns)
@@ -1,6 +1,13 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Iterable, Optional, List
+from typing import Callable, Iterable, Optional, List
+import functools
+import io
+import os
+import random
+import sys
+import threading
 import time
 import logging
 
@@ -10,6 +17,19 @@ from tqdm import tqdm
 
 from pathlib import Path
 
+try:
+    from .clean_data import standardize_ohlc_columns
+    from .store import STORE_DIR, has_ticker, read_tail, write_ohlc
+except ImportError:  # executed directly as a script: make GatorAI/src importable
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from data.clean_data import standardize_ohlc_columns
+    from data.store import STORE_DIR, has_ticker, read_tail, write_ohlc
+
+try:
+    from ..instrumentation import instrument, result_len
+except ImportError:  # src/ itself is on sys.path, so the subpackages are top-level
+    from instrumentation import instrument, result_len
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -51,14 +71,24 @@ def validate_tickers(tickers: Iterable[str]) -> List[str]:
     return valid_tickers
 
 
-def retry_on_failure(max_retries: int = 3, delay: float = 1.0):
+def retry_on_failure(
+    max_retries: int = 3,
+    delay: float = 1.0,
+    backoff: float = 1.0,
+    max_delay: float = 60.0,
+    jitter: float = 0.0,
+):
     """Decorator to retry function on failure.
     
     Args:
         max_retries: Maximum number of retry attempts
-        delay: Delay between retries in seconds
+        delay: Delay before the first retry in seconds
+        backoff: Multiplier applied to the delay after each failed attempt
+        max_delay: Upper bound on the delay between attempts in seconds
+        jitter: Random extra delay as a fraction of the current delay (0.5 = up to +50%)
     """
     def decorator(func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
             for attempt in range(max_retries):
                 try:
@@ -67,16 +97,49 @@ def retry_on_failure(max_retries: int = 3, delay: float = 1.0):
                     if attempt == max_retries - 1:
                         logger.error(f"Final attempt failed for {func.__name__}: {e}")
                         raise e
-                    logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {e}. Retrying in {delay}s...")
-                    time.sleep(delay)
+                    wait = min(delay * backoff ** attempt, max_delay)
+                    wait += random.uniform(0.0, jitter * wait)
+                    logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {e}. Retrying in {wait:.2f}s...")
+                    time.sleep(wait)
             return None
         return wrapper
     return decorator
 
 
-@retry_on_failure(max_retries=3, delay=1.0)
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter shared by all download workers.
+
+    Args:
+        rate: Tokens added per second (sustained requests per second)
+        capacity: Maximum burst size (default: one second worth of tokens)
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until ``tokens`` are available, then consume them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+@instrument(rows=result_len)
 def _download_ticker_data(ticker: str, start: str, end: str, interval: str) -> pd.DataFrame:
-    """Download data for a single ticker with retry logic."""
+    """Download data for a single ticker (one attempt; ``fetch_ohlc`` adds retries)."""
     try:
         df = yf.download(ticker, start=start, end=end, interval=interval, auto_adjust=False, progress=False)
         if df.empty:
@@ -88,25 +151,148 @@ def _download_ticker_data(ticker: str, start: str, end: str, interval: str) -> p
         raise e
 
 
+def _make_fetcher(
+    download_fn: Callable[[str, str, str, str], pd.DataFrame],
+    limiter: Optional[TokenBucket],
+    max_retries: int,
+    retry_delay: float,
+) -> Callable[[str, str, str, str], pd.DataFrame]:
+    """Wrap a download function with rate limiting and exponential backoff."""
+    def limited(ticker: str, start: str, end: str, interval: str) -> pd.DataFrame:
+        if limiter is not None:
+            limiter.acquire()
+        return download_fn(ticker, start, end, interval)
+
+    limited.__name__ = getattr(download_fn, "__name__", "download")
+    return retry_on_failure(max_retries=max_retries, delay=retry_delay, backoff=2.0, jitter=0.5)(limited)
+
+
+def _format_ticker_frame(df: pd.DataFrame, ticker: str, decimal_places: int) -> pd.DataFrame:
+    """Rename raw download columns to the long-format schema and round prices."""
+    df = standardize_ohlc_columns(df.reset_index())
+    
+    df["ticker"] = ticker
+    
+    # Round numerical columns
+    numeric_cols = ["open", "high", "low", "close", "adj_close"]
+    df[numeric_cols] = df[numeric_cols].round(decimal_places)
+    return df
+
+
+def _read_csv_tail(path: Path, n_rows: int) -> pd.DataFrame:
+    """Read the header and the last ``n_rows`` rows of a CSV without parsing the rest."""
+    with open(path, "rb") as fh:
+        header = fh.readline()
+        fh.seek(0, os.SEEK_END)
+        end = fh.tell()
+        block = 64 * 1024
+        pos = end
+        data = b""
+        while pos > len(header) and data.count(b"\n") <= n_rows + 1:
+            step = min(block, pos - len(header))
+            pos -= step
+            fh.seek(pos)
+            data = fh.read(step) + data
+    lines = data.splitlines()[-n_rows:]
+    return pd.read_csv(io.BytesIO(header + b"\n".join(lines) + b"\n"))
+
+
+def _write_csv_atomic(df: pd.DataFrame, path: Path) -> None:
+    """Write a CSV through a temporary file so readers never see a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def _append_csv(df: pd.DataFrame, path: Path) -> None:
+    """Append rows to a CSV in place, touching only the new bytes.
+
+    The rows are formatted before the file is opened; if the write fails, the
+    file is truncated back to its original size, so it never keeps a partial row.
+    """
+    data = df.to_csv(index=False, header=False, lineterminator="\n").encode()
+    with open(path, "r+b") as fh:
+        size = fh.seek(0, os.SEEK_END)
+        if size and (fh.seek(size - 1), fh.read(1))[1] != b"\n":
+            data = b"\n" + data
+        try:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        except BaseException:
+            fh.truncate(size)
+            raise
+
+
+def _overlap_matches(stored: pd.DataFrame, fresh: pd.DataFrame, decimal_places: int) -> bool:
+    """True if ``adj_close`` agrees on every timestamp present in both frames."""
+    left = pd.Series(stored["adj_close"].to_numpy(), index=pd.to_datetime(stored["datetime"], utc=True))
+    right = pd.Series(fresh["adj_close"].to_numpy(), index=pd.to_datetime(fresh["datetime"], utc=True))
+    common = left.index.intersection(right.index)
+    if common.empty:
+        return False
+    tolerance = 0.5 * 10 ** (-decimal_places) + 1e-9
+    diff = (left.loc[common].astype(float) - right.loc[common].astype(float)).abs()
+    return bool((diff <= tolerance).all())
+
+
+@instrument(rows=result_len)
 def fetch_ohlc(
     tickers: Iterable[str],
     start: Optional[str] = None,
     end: Optional[str] = None,
     interval: str = "1d",
     decimal_places: int = 2,
+    max_workers: int = 1,
+    rate_limit: Optional[float] = None,
+    max_retries: int = 3,
+    retry_delay: float = 1.0,
+    download_fn: Optional[Callable[[str, str, str, str], pd.DataFrame]] = None,
+    output_dir: Optional[Path] = None,
+    incremental: bool = False,
+    overlap: int = 5,
+    store_format: str = "csv",
+    float_dtype: str = "float64",
 ) -> pd.DataFrame:
     """Fetch OHLCV data for tickers and save individual CSVs under data/processed.
 
+    With ``max_workers > 1`` tickers are downloaded on a thread pool; at most
+    ``max_workers`` requests are in flight and every attempt (including
+    retries) takes a token from a shared bucket refilled at ``rate_limit``
+    requests per second. Failed attempts back off exponentially with jitter.
+
+    With ``incremental=True`` an existing CSV is extended instead of rewritten:
+    only bars from the last ``overlap`` stored rows onwards are downloaded, and
+    the new ones are appended in place, so the work is proportional to the new
+    bars (a failed append is truncated away). If ``adj_close`` on the overlap no
+    longer matches (a split or dividend adjustment), the full history from
+    ``start`` is downloaded and the file is replaced.
+
     Args:
         tickers: Iterable of ticker symbols to fetch
         start: Start date in YYYY-MM-DD format (default: 2005-01-01)
         end: End date in YYYY-MM-DD format (default: current UTC date)
         interval: Data interval (1d, 1h, 5m, etc.)
         decimal_places: Number of decimal places for rounding (default: 2)
+        max_workers: Number of concurrent downloads (default: 1, sequential)
+        rate_limit: Maximum requests per second across all workers (default: unlimited)
+        max_retries: Attempts per ticker before giving up (default: 3)
+        retry_delay: Delay before the first retry in seconds; doubles per attempt (default: 1.0)
+        download_fn: Replacement for the yfinance download with the signature
+            ``(ticker, start, end, interval) -> DataFrame``, e.g. a local stand-in for offline tests
+        output_dir: Directory for the per-ticker files (default: data/processed for CSV,
+            data/store for the columnar formats)
+        incremental: Only fetch bars newer than the stored file (default: False)
+        overlap: Stored rows re-downloaded to detect adjustments (default: 5)
+        store_format: "csv", or "parquet"/"feather" to write the partitioned columnar
+            store in ``data.store`` instead of CSVs (default: "csv")
+        float_dtype: Price dtype for the columnar store, "float64" or "float32"
 
     Returns:
         Long-format DataFrame with columns:
         [ticker, datetime, open, high, low, close, adj_close, volume]
+        In incremental mode only the rows added by this call are returned
+        (the full history for tickers that were re-downloaded).
         
     Raises:
         ValueError: If no valid tickers provided or no data fetched
@@ -118,7 +304,17 @@ def fetch_ohlc(
         logger.error(f"Ticker validation failed: {e}")
         raise e
     
-    ensure_processed_directory()
+    if store_format not in ("csv", "parquet", "feather"):
+        raise ValueError(f"Unsupported store format '{store_format}'")
+
+    if output_dir is None and store_format != "csv":
+        output_dir = STORE_DIR
+    elif output_dir is None:
+        ensure_processed_directory()
+        output_dir = PROCESSED_DIR
+    else:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
 
     # Set default dates
     if start is None:
@@ -128,53 +324,99 @@ def fetch_ohlc(
 
     logger.info(f"Fetching data for {len(valid_tickers)} tickers from {start} to {end}")
     
-    frames = []
+    limiter = TokenBucket(rate_limit) if rate_limit else None
+    fetch = _make_fetcher(download_fn or _download_ticker_data, limiter, max_retries, retry_delay)
+
+    def download(ticker: str, from_date: str) -> Optional[pd.DataFrame]:
+        df = fetch(ticker, from_date, end, interval)
+        if df is None or df.empty:
+            return None
+        return _format_ticker_frame(df, ticker, decimal_places)
+
+    def stored_tail(ticker: str, output_path: Path) -> Optional[pd.DataFrame]:
+        n_rows = max(overlap, 1)
+        if store_format == "csv":
+            return _read_csv_tail(output_path, n_rows) if output_path.exists() else None
+        if not has_ticker(ticker, interval, output_dir):
+            return None
+        return read_tail(ticker, interval, n_rows, root=output_dir, columns=["adj_close"])
+
+    def save(df: pd.DataFrame, ticker: str, output_path: Path, append: bool) -> None:
+        if store_format == "csv":
+            if append:
+                _append_csv(df, output_path)
+            else:
+                _write_csv_atomic(df, output_path)
+        else:
+            write_ohlc(df, ticker, interval, root=output_dir, fmt=store_format,
+                       float_dtype=float_dtype, append=append)
+
+    def process(ticker: str) -> Optional[pd.DataFrame]:
+        output_path = output_dir / f"{ticker}_{interval}.csv"
+        stored = stored_tail(ticker, output_path) if incremental else None
+        if stored is not None and not stored.empty:
+            last_ts = pd.to_datetime(stored["datetime"], utc=True).max()
+            from_date = pd.to_datetime(stored["datetime"].iloc[0], utc=True).strftime("%Y-%m-%d")
+            fresh = download(ticker, from_date)
+            if fresh is None:
+                # Nothing new published yet; the stored data is still current
+                return pd.DataFrame(columns=["ticker", "datetime"])
+            if _overlap_matches(stored, fresh, decimal_places):
+                new_rows = fresh[pd.to_datetime(fresh["datetime"], utc=True) > last_ts]
+                if not new_rows.empty:
+                    save(new_rows, ticker, output_path, append=True)
+                logger.info(f"Appended {len(new_rows)} new rows for {ticker}")
+                return new_rows
+            logger.info(f"Adjustment detected for {ticker}; re-downloading full history")
+
+        df = download(ticker, start)
+        if df is None:
+            return None
+        
+        # Save individual file
+        save(df, ticker, output_path, append=False)
+        logger.info(f"Saved data for {ticker} to {output_dir}")
+        return df
+
+    results = {}
     failed_tickers = []
     
-    # Process tickers with progress bar
-    for ticker in tqdm(valid_tickers, desc="Fetching data"):
-        try:
-            df = _download_ticker_data(ticker, start, end, interval)
-            if df.empty:
-                failed_tickers.append(ticker)
-                continue
-                
-            # Clean and format data
-            df = df.rename(
-                columns={
-                    "Open": "open",
-                    "High": "high", 
-                    "Low": "low",
-                    "Close": "close",
-                    "Adj Close": "adj_close",
-                    "Volume": "volume",
-                }
-            ).reset_index().rename(columns={"Date": "datetime"})
-            
-            df["ticker"] = ticker
-            
-            # Round numerical columns
-            numeric_cols = ["open", "high", "low", "close", "adj_close"]
-            df[numeric_cols] = df[numeric_cols].round(decimal_places)
-            
-            # Save individual CSV
-            output_path = PROCESSED_DIR / f"{ticker}_{interval}.csv"
-            df.to_csv(output_path, index=False)
-            logger.info(f"Saved data for {ticker} to {output_path}")
-            
-            frames.append(df)
-            
-        except Exception as e:
-            logger.error(f"Failed to process {ticker}: {e}")
+    if max_workers <= 1:
+        # Process tickers with progress bar
+        for ticker in tqdm(valid_tickers, desc="Fetching data"):
+            try:
+                results[ticker] = process(ticker)
+            except Exception as e:
+                logger.error(f"Failed to process {ticker}: {e}")
+                results[ticker] = None
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(process, ticker): ticker for ticker in valid_tickers}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Fetching data"):
+                ticker = futures[future]
+                try:
+                    results[ticker] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to process {ticker}: {e}")
+                    results[ticker] = None
+
+    # Keep the input ticker order regardless of completion order
+    frames = []
+    for ticker in valid_tickers:
+        if results.get(ticker) is None:
             failed_tickers.append(ticker)
-            continue
+        elif not results[ticker].empty:
+            frames.append(results[ticker])
 
     # Report results
     if failed_tickers:
         logger.warning(f"Failed to fetch data for: {', '.join(failed_tickers)}")
     
     if not frames:
-        logger.error("No data was fetched for any ticker.")
+        if failed_tickers:
+            logger.error("No data was fetched for any ticker.")
+        else:
+            logger.info("All tickers are up to date; no new rows fetched.")
         return pd.DataFrame(columns=["ticker", "datetime", "open", "high", "low", "close", "adj_close", "volume"])
 
     # Combine all data
@@ -0,0 +1,498 @@
+"""Pluggable data sources and an asyncio service that keeps the store current.
+
+A :class:`DataSource` returns the bars of one ticker in the long format of
+``fetch_ohlc``. :class:`IngestionService` pulls many tickers concurrently
+(at most ``max_concurrency`` in flight), appends the new bars to the columnar
+store of ``data.store`` and publishes a :class:`NewDataEvent` per updated
+ticker to its subscribers, e.g. the dashboard's cache invalidation
+(``dashboard.services.on_new_data``). ``run`` repeats this on a fixed
+schedule until ``stop`` is called.
+
+Sources:
+
+- :class:`YFinanceSource`: ``yfinance.download`` with the rate limiting and
+  retries of ``fetch_ohlc``, run on worker threads
+- :class:`LocalFileSource`: per-ticker CSV or Parquet files, e.g. the CSVs
+  ``fetch_ohlc`` writes under ``data/processed``
+- :class:`SyntheticSource`: deterministic random-walk bars, optionally with
+  simulated latency, for offline runs and load tests
+
+Example::
+
+	service = IngestionService(SyntheticSource(latency=0.05), tickers, max_concurrency=32)
+	service.subscribe(lambda event: print(event.ticker, event.rows))
+	asyncio.run(service.run(every=60.0))
+"""
+from __future__ import annotations
+
+import abc
+import argparse
+import asyncio
+import inspect
+import logging
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+	from .clean_data import standardize_ohlc_columns
+	from .fetch_data import (
+		PROCESSED_DIR,
+		TokenBucket,
+		_download_ticker_data,
+		_format_ticker_frame,
+		_make_fetcher,
+		_overlap_matches,
+		validate_tickers,
+	)
+	from .store import STORE_DIR, has_ticker, read_tail, write_ohlc
+except ImportError:  # executed directly as a script: make GatorAI/src importable
+	import sys
+
+	sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+	from data.clean_data import standardize_ohlc_columns
+	from data.fetch_data import (
+		PROCESSED_DIR,
+		TokenBucket,
+		_download_ticker_data,
+		_format_ticker_frame,
+		_make_fetcher,
+		_overlap_matches,
+		validate_tickers,
+	)
+	from data.store import STORE_DIR, has_ticker, read_tail, write_ohlc
+
+try:
+	from ..instrumentation import span
+except ImportError:  # src/ itself is on sys.path, so the subpackages are top-level
+	from instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+LONG_COLUMNS = ["ticker", "datetime", "open", "high", "low", "close", "adj_close", "volume"]
+# Bar spacing of SyntheticSource per interval (weekends are dropped); each divides a week
+INTERVAL_STEP = {
+	"1m": pd.Timedelta(minutes=1),
+	"5m": pd.Timedelta(minutes=5),
+	"15m": pd.Timedelta(minutes=15),
+	"1h": pd.Timedelta(hours=1),
+	"4h": pd.Timedelta(hours=4),
+	"1d": pd.Timedelta(days=1),
+}
+WEEK = pd.Timedelta(days=7)
+
+Subscriber = Callable[["NewDataEvent"], Any]
+
+
+@dataclass(frozen=True)
+class NewDataEvent:
+	"""Bars of one ticker that were just written to the store.
+
+	``replaced`` is True when the stored history was rewritten (first load, or
+	an adjustment detected on the overlap) rather than appended to.
+	"""
+	ticker: str
+	interval: str
+	start: pd.Timestamp
+	end: pd.Timestamp
+	rows: int
+	replaced: bool
+	root: Path
+
+
+class DataSource(abc.ABC):
+	"""Interface of a bar source used by :class:`IngestionService`."""
+
+	@abc.abstractmethod
+	async def fetch(self, ticker: str, start: Optional[str], end: Optional[str], interval: str) -> pd.DataFrame:
+		"""Bars of ``ticker`` from ``start`` to ``end`` (None: now).
+
+		Returns:
+			Long-format frame with columns [ticker, datetime, open, high, low,
+			close, adj_close, volume]; empty if there are no bars
+		"""
+
+
+class YFinanceSource(DataSource):
+	"""Yahoo Finance bars, downloaded on worker threads.
+
+	Args:
+		rate_limit: Maximum requests per second across all tickers (default: unlimited)
+		max_retries: Attempts per ticker before giving up
+		retry_delay: Delay before the first retry in seconds; doubles per attempt
+		decimal_places: Rounding of prices, as in ``fetch_ohlc``
+	"""
+
+	def __init__(
+		self,
+		rate_limit: Optional[float] = None,
+		max_retries: int = 3,
+		retry_delay: float = 1.0,
+		decimal_places: int = 2,
+	):
+		limiter = TokenBucket(rate_limit) if rate_limit else None
+		self._fetch = _make_fetcher(_download_ticker_data, limiter, max_retries, retry_delay)
+		self.decimal_places = decimal_places
+
+	async def fetch(self, ticker: str, start: Optional[str], end: Optional[str], interval: str) -> pd.DataFrame:
+		df = await asyncio.to_thread(self._fetch, ticker, start, end, interval)
+		if df is None or df.empty:
+			return pd.DataFrame(columns=LONG_COLUMNS)
+		return _format_ticker_frame(df, ticker, self.decimal_places)[LONG_COLUMNS]
+
+
+class LocalFileSource(DataSource):
+	"""Bars read from per-ticker files.
+
+	Args:
+		directory: Directory of the files (default: data/processed)
+		pattern: File name of a ticker, formatted with ``ticker`` and ``interval``;
+			a ``.parquet`` suffix is read as Parquet, anything else as CSV
+		latency: Simulated delay per request in seconds
+	"""
+
+	def __init__(
+		self,
+		directory: Union[str, Path] = PROCESSED_DIR,
+		pattern: str = "{ticker}_{interval}.csv",
+		latency: float = 0.0,
+	):
+		self.directory = Path(directory)
+		self.pattern = pattern
+		self.latency = latency
+
+	def _read(self, ticker: str, start: Optional[str], end: Optional[str], interval: str) -> pd.DataFrame:
+		path = self.directory / self.pattern.format(ticker=ticker, interval=interval)
+		if not path.exists():
+			logger.warning(f"No file for {ticker} at {path}")
+			return pd.DataFrame(columns=LONG_COLUMNS)
+		df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+		df = standardize_ohlc_columns(df)
+		df["ticker"] = ticker
+		stamps = pd.to_datetime(df["datetime"], utc=True)
+		keep = np.ones(len(df), dtype=bool)
+		if start is not None:
+			keep &= (stamps >= pd.Timestamp(start, tz="UTC")).to_numpy()
+		if end is not None:
+			keep &= (stamps < pd.Timestamp(end, tz="UTC") + pd.Timedelta(days=1)).to_numpy()
+		return df.loc[keep, [c for c in LONG_COLUMNS if c in df.columns]].reset_index(drop=True)
+
+	async def fetch(self, ticker: str, start: Optional[str], end: Optional[str], interval: str) -> pd.DataFrame:
+		if self.latency:
+			await asyncio.sleep(self.latency)
+		return await asyncio.to_thread(self._read, ticker, start, end, interval)
+
+
+class SyntheticSource(DataSource):
+	"""Deterministic random-walk bars, for offline runs and load tests.
+
+	Each ticker's path starts at 100 on ``origin`` and is seeded by ``seed`` and
+	the ticker name, so the same bar always has the same prices and repeated
+	requests overlap consistently. Bars run up to ``end``, or the current time,
+	so a scheduled service sees new bars appear as time passes.
+
+	Only the requested range is generated: the path is cut into blocks of
+	``block`` bars whose total log returns come from one stream (a longer path
+	extends a shorter one draw for draw), and the bars inside a block are drawn
+	from a generator of their own and bridged to sum to the block total. The
+	bars are still i.i.d. normal log returns, but a request far from ``origin``
+	only costs one draw per earlier block.
+
+	Args:
+		seed: Base seed
+		origin: First bar of every path
+		mu: Mean log return per bar
+		sigma: Standard deviation of log returns per bar
+		latency: Simulated delay per request in seconds
+		block: Bars per block
+	"""
+
+	def __init__(
+		self,
+		seed: int = 42,
+		origin: str = "2020-01-01",
+		mu: float = 0.0005,
+		sigma: float = 0.01,
+		latency: float = 0.0,
+		block: int = 1024,
+	):
+		if block < 1:
+			raise ValueError("block must be >= 1")
+		self.seed = seed
+		self.origin = pd.Timestamp(origin, tz="UTC")
+		self.mu = mu
+		self.sigma = sigma
+		self.latency = latency
+		self.block = block
+
+	def _positions(self, start: Optional[str], end: Optional[str], interval: str) -> tuple:
+		# Bar k sits at origin + k * step; weekday bars are numbered by counting whole weeks
+		step = INTERVAL_STEP[interval]
+		per_week = WEEK // step
+		at = lambda k: self.origin + pd.to_timedelta(k * (step // pd.Timedelta(microseconds=1)), unit="us")
+		weekday = at(np.arange(per_week)).dayofweek < 5
+		before = np.concatenate([[0], np.cumsum(weekday)])
+		stop = pd.Timestamp.now(tz="UTC") if end is None else pd.Timestamp(end, tz="UTC")
+		first = 0 if start is None else max(-((self.origin - pd.Timestamp(start, tz="UTC")) // step), 0)
+		last = (stop - self.origin) // step
+		k = np.arange(first, last + 1, dtype=np.int64)
+		k = k[weekday[k % per_week]]
+		ordinal = (first // per_week) * before[-1] + before[first % per_week]
+		return at(k), ordinal
+
+	def bars(self, ticker: str, start: Optional[str], end: Optional[str], interval: str) -> pd.DataFrame:
+		"""The bars ``fetch`` returns, computed synchronously."""
+		if interval not in INTERVAL_STEP:
+			raise ValueError(f"Unsupported interval '{interval}'. Choose from {list(INTERVAL_STEP)}")
+		index, first = self._positions(start, end, interval)
+		n = len(index)
+		if n == 0:
+			return pd.DataFrame(columns=LONG_COLUMNS)
+		key = zlib.crc32(ticker.encode())
+		b0, b1 = first // self.block, (first + n - 1) // self.block
+		totals = np.random.default_rng([self.seed, key, 0]).normal(
+			self.mu * self.block, self.sigma * np.sqrt(self.block), b1 + 1
+		)
+		steps, spreads, volumes = [], [], []
+		for b in range(b0, b1 + 1):
+			rng = np.random.default_rng([self.seed, key, 1, b])
+			z = rng.standard_normal(self.block)
+			steps.append(self.sigma * (z - z.mean()) + totals[b] / self.block)
+			spreads.append(rng.standard_normal(self.block))
+			volumes.append(rng.integers(100_000, 1_000_000, self.block))
+		log_close = np.log(100.0) + totals[:b0].sum() + np.cumsum(np.concatenate(steps))
+		log_open = np.concatenate([[log_close[0] - steps[0][0]], log_close[:-1]])
+		offset = slice(first - b0 * self.block, first - b0 * self.block + n)
+		close, open_ = np.exp(log_close[offset]), np.exp(log_open[offset])
+		spread = np.abs(0.005 * np.concatenate(spreads)[offset]) * close
+		return pd.DataFrame({
+			"ticker": ticker,
+			"datetime": index,
+			"open": open_,
+			"high": np.maximum(open_, close) + spread,
+			"low": np.minimum(open_, close) - spread,
+			"close": close,
+			"adj_close": close,
+			"volume": np.concatenate(volumes)[offset],
+		})
+
+	async def fetch(self, ticker: str, start: Optional[str], end: Optional[str], interval: str) -> pd.DataFrame:
+		if self.latency:
+			await asyncio.sleep(self.latency)
+		return await asyncio.to_thread(self.bars, ticker, start, end, interval)
+
+
+class IngestionService:
+	"""Concurrent, incremental ingestion of many tickers into the columnar store.
+
+	Every run requests, per ticker, the bars from the last ``overlap`` stored
+	rows onwards and appends the new ones; if ``adj_close`` no longer matches
+	on the overlap (a split or dividend adjustment) or nothing is stored yet,
+	the full history from ``start`` is written instead, as in
+	``fetch_ohlc(incremental=True)``.
+
+	Args:
+		source: Where bars come from
+		tickers: Tickers ingested by ``run_once``/``run``
+		interval: Bar interval (1d, 1h, 5m, etc.)
+		root: Store root directory (default: data/store)
+		fmt: Store format, "parquet" or "feather"
+		float_dtype: Price dtype in the store, "float64" or "float32"
+		max_concurrency: Maximum tickers being fetched or written at once
+		start: First date of a full download
+		overlap: Stored rows re-requested to detect adjustments
+		decimal_places: Precision to which the overlap must match
+	"""
+
+	def __init__(
+		self,
+		source: DataSource,
+		tickers: Iterable[str],
+		interval: str = "1d",
+		root: Optional[Union[str, Path]] = None,
+		fmt: str = "parquet",
+		float_dtype: str = "float64",
+		max_concurrency: int = 8,
+		start: str = "2005-01-01",
+		overlap: int = 5,
+		decimal_places: int = 2,
+	):
+		if max_concurrency < 1:
+			raise ValueError("max_concurrency must be >= 1")
+		self.source = source
+		self.tickers = validate_tickers(tickers)
+		self.interval = interval
+		self.root = Path(root) if root is not None else STORE_DIR
+		self.fmt = fmt
+		self.float_dtype = float_dtype
+		self.max_concurrency = max_concurrency
+		self.start = start
+		self.overlap = overlap
+		self.decimal_places = decimal_places
+		self.failed: List[str] = []
+		self._subscribers: List[Subscriber] = []
+		self._loop: Optional[asyncio.AbstractEventLoop] = None
+		self._semaphore: Optional[asyncio.Semaphore] = None
+		self._locks: Dict[str, asyncio.Lock] = {}
+		self._stop: Optional[asyncio.Event] = None
+
+	def _bind_loop(self) -> None:
+		# asyncio primitives belong to one event loop; a new asyncio.run() gets fresh ones
+		loop = asyncio.get_running_loop()
+		if self._loop is not loop:
+			self._loop = loop
+			self._semaphore = asyncio.Semaphore(self.max_concurrency)
+			self._locks = {}
+
+	def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+		"""Call ``callback(event)`` (a function or coroutine function) for every new-data event.
+
+		Returns:
+			A function that removes the subscription
+		"""
+		self._subscribers.append(callback)
+		return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+	async def publish(self, event: NewDataEvent) -> None:
+		"""Deliver ``event`` to every subscriber; a failing subscriber is logged and skipped."""
+		for callback in list(self._subscribers):
+			try:
+				result = callback(event)
+				if inspect.isawaitable(result):
+					await result
+			except Exception as e:
+				logger.error(f"Subscriber {getattr(callback, '__name__', callback)} failed on {event.ticker}: {e}")
+
+	def _stored_tail(self, ticker: str) -> Optional[pd.DataFrame]:
+		if not has_ticker(ticker, self.interval, self.root):
+			return None
+		return read_tail(ticker, self.interval, max(self.overlap, 1), root=self.root, columns=["adj_close"])
+
+	def _write(self, df: pd.DataFrame, ticker: str, append: bool) -> Path:
+		return write_ohlc(df, ticker, self.interval, root=self.root, fmt=self.fmt,
+			float_dtype=self.float_dtype, append=append)
+
+	async def ingest_ticker(self, ticker: str, end: Optional[str] = None) -> Optional[NewDataEvent]:
+		"""Fetch and store the new bars of one ticker.
+
+		Returns:
+			The published event, or None if there were no new bars
+		"""
+		self._bind_loop()
+		lock = self._locks.setdefault(ticker, asyncio.Lock())
+		async with lock, self._semaphore:
+			stored = await asyncio.to_thread(self._stored_tail, ticker)
+			if stored is not None and not stored.empty:
+				stamps = pd.to_datetime(stored["datetime"], utc=True)
+				fresh = await self.source.fetch(ticker, stamps.iloc[0].strftime("%Y-%m-%d"), end, self.interval)
+				if fresh.empty:
+					return None
+				if _overlap_matches(stored, fresh, self.decimal_places):
+					rows = fresh[pd.to_datetime(fresh["datetime"], utc=True) > stamps.max()]
+					if rows.empty:
+						return None
+					await asyncio.to_thread(self._write, rows, ticker, True)
+					replaced = False
+				else:
+					logger.info(f"Adjustment detected for {ticker}; re-downloading full history")
+					stored = None
+			if stored is None or stored.empty:
+				rows = await self.source.fetch(ticker, self.start, end, self.interval)
+				if rows.empty:
+					return None
+				await asyncio.to_thread(self._write, rows, ticker, False)
+				replaced = True
+
+		stamps = pd.to_datetime(rows["datetime"], utc=True)
+		event = NewDataEvent(
+			ticker=ticker,
+			interval=self.interval,
+			start=stamps.min(),
+			end=stamps.max(),
+			rows=len(rows),
+			replaced=replaced,
+			root=self.root,
+		)
+		await self.publish(event)
+		return event
+
+	async def _ingest_or_log(self, ticker: str, end: Optional[str]) -> Optional[NewDataEvent]:
+		try:
+			return await self.ingest_ticker(ticker, end)
+		except Exception as e:
+			logger.error(f"Failed to ingest {ticker}: {e}")
+			self.failed.append(ticker)
+			return None
+
+	async def run_once(self, tickers: Optional[Iterable[str]] = None, end: Optional[str] = None) -> List[NewDataEvent]:
+		"""Ingest every ticker once, at most ``max_concurrency`` at a time.
+
+		Failures are logged and listed in ``failed``; they do not stop the run.
+
+		Returns:
+			Events of the tickers that received new bars, in ticker order
+		"""
+		names = self.tickers if tickers is None else validate_tickers(tickers)
+		self.failed = []
+		with span("data.ingestion.IngestionService.run_once") as s:
+			results = await asyncio.gather(*(self._ingest_or_log(t, end) for t in names))
+			events = [e for e in results if e is not None]
+			s.rows = sum(e.rows for e in events)
+		logger.info(f"Ingested {len(events)} of {len(names)} tickers, {sum(e.rows for e in events)} new rows")
+		if self.failed:
+			logger.warning(f"Failed to ingest: {', '.join(self.failed)}")
+		return events
+
+	async def run(self, every: float, iterations: Optional[int] = None) -> None:
+		"""Call ``run_once`` every ``every`` seconds until ``stop`` or ``iterations`` runs."""
+		self._stop = asyncio.Event()
+		loop = asyncio.get_running_loop()
+		count = 0
+		while not self._stop.is_set():
+			started = loop.time()
+			await self.run_once()
+			count += 1
+			if iterations is not None and count >= iterations:
+				break
+			try:
+				await asyncio.wait_for(self._stop.wait(), timeout=max(every - (loop.time() - started), 0.0))
+			except asyncio.TimeoutError:
+				pass
+
+	def stop(self) -> None:
+		"""Stop ``run`` after the current pass."""
+		if self._stop is not None:
+			self._stop.set()
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description="Ingest bars into the columnar store on a schedule")
+	parser.add_argument("--source", choices=["yfinance", "local", "synthetic"], default="synthetic")
+	parser.add_argument("--tickers", nargs="+", default=["SPY", "QQQ", "IWM"])
+	parser.add_argument("--synthetic-tickers", type=int, default=0,
+		help="Ingest T0000..T<n-1> instead of --tickers (load testing)")
+	parser.add_argument("--interval", default="1d")
+	parser.add_argument("--root", type=Path, default=STORE_DIR)
+	parser.add_argument("--max-concurrency", type=int, default=8)
+	parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per request (local/synthetic)")
+	parser.add_argument("--every", type=float, default=60.0, help="Seconds between runs")
+	parser.add_argument("--iterations", type=int, default=1, help="Number of runs (0: until interrupted)")
+	args = parser.parse_args()
+
+	if args.source == "yfinance":
+		source: DataSource = YFinanceSource()
+	elif args.source == "local":
+		source = LocalFileSource(latency=args.latency)
+	else:
+		source = SyntheticSource(latency=args.latency)
+	tickers = [f"T{i:04d}" for i in range(args.synthetic_tickers)] or args.tickers
+	service = IngestionService(source, tickers, interval=args.interval, root=args.root, max_concurrency=args.max_concurrency)
+	asyncio.run(service.run(args.every, iterations=args.iterations or None))
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,172 @@
+"""Memory-mapped (time x ticker x field) price panel shared across processes.
+
+A panel directory holds ``panel.npy`` (one contiguous array, opened with
+``mmap_mode="r"``), ``dates.npy`` (int64 nanoseconds) and a small
+``index.json`` with tickers, fields and timezone. Opening a panel maps the
+file without reading it, so any number of worker processes slice the same
+page-cached copy. ``PricePanel`` pickles as its path and is re-mapped on
+unpickling. Rebuilding a panel writes new files and renames them over the old
+ones, so processes still mapping the old panel keep reading it unchanged.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+PANEL_FIELDS: Tuple[str, ...] = ("open", "high", "low", "close", "adj_close", "volume")
+
+
+@dataclass
+class PricePanel:
+	path: Path
+	data: np.ndarray
+	dates: pd.DatetimeIndex
+	tickers: List[str]
+	fields: List[str]
+	_ticker_pos: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+
+	def __post_init__(self) -> None:
+		self._ticker_pos = {t: i for i, t in enumerate(self.tickers)}
+
+	def __reduce__(self):
+		# Workers receive only the path and map the file themselves.
+		return (open_price_panel, (str(self.path),))
+
+	@property
+	def shape(self) -> Tuple[int, int, int]:
+		return tuple(self.data.shape)
+
+	def field_matrix(self, name: str = "adj_close") -> np.ndarray:
+		"""(time x ticker) view of one field; no data is copied."""
+		return self.data[:, :, self.fields.index(name)]
+
+	def date_slice(self, start=None, end=None) -> slice:
+		"""Row slice covering ``start``..``end`` inclusive."""
+		lo = 0 if start is None else int(self.dates.searchsorted(pd.Timestamp(start), side="left"))
+		hi = len(self.dates) if end is None else int(self.dates.searchsorted(pd.Timestamp(end), side="right"))
+		return slice(lo, hi)
+
+	def series(self, ticker: str, field: str = "adj_close", start=None, end=None) -> pd.Series:
+		"""One ticker and field as a Series backed by the memory map."""
+		rows = self.date_slice(start, end)
+		values = self.data[rows, self._ticker_pos[ticker], self.fields.index(field)]
+		return pd.Series(values, index=self.dates[rows], name=ticker, copy=False)
+
+	def frame(
+		self,
+		field: str = "adj_close",
+		tickers: Optional[Sequence[str]] = None,
+		start=None,
+		end=None,
+	) -> pd.DataFrame:
+		"""Wide (time x ticker) frame for one field.
+
+		Selecting all tickers keeps a view of the map; a ticker subset is a copy.
+		"""
+		rows = self.date_slice(start, end)
+		values = self.field_matrix(field)[rows]
+		names = self.tickers
+		if tickers is not None:
+			values = values[:, [self._ticker_pos[t] for t in tickers]]
+			names = list(tickers)
+		return pd.DataFrame(values, index=self.dates[rows], columns=names, copy=False)
+
+
+def _read_source(source: Union[str, Path, pd.DataFrame], interval: str) -> Dict[str, Union[Path, pd.DataFrame]]:
+	if isinstance(source, pd.DataFrame):
+		return {t: g.drop(columns="ticker") for t, g in source.groupby("ticker", sort=True)}
+	files = sorted(Path(source).glob(f"*_{interval}.csv"))
+	return {fp.name[: -len(f"_{interval}.csv")]: fp for fp in files}
+
+
+def build_price_panel(
+	source: Union[str, Path, pd.DataFrame],
+	out_dir: Union[str, Path],
+	interval: str = "1d",
+	fields: Sequence[str] = PANEL_FIELDS,
+	dtype: str = "float64",
+) -> PricePanel:
+	"""Build a memory-mapped panel from processed CSVs or a long-format frame.
+
+	Dates are the union of all tickers' timestamps; bars a ticker does not have
+	are NaN. Tickers are written one at a time, so building needs memory for
+	one ticker's history, not the whole panel.
+
+	Args:
+		source: ``data/processed`` style directory of ``{ticker}_{interval}.csv``
+			files, or the long DataFrame returned by ``fetch_ohlc``
+		out_dir: Directory for the panel files
+		interval: Interval suffix of the CSVs to include (default: "1d")
+		fields: Fields to store, in order (default: OHLC, adj_close, volume)
+		dtype: Storage dtype, "float64" or "float32"
+
+	Returns:
+		The opened (read-only) PricePanel
+
+	Raises:
+		ValueError: If the source holds no tickers
+	"""
+	items = _read_source(source, interval)
+	if not items:
+		raise ValueError(f"No {interval} price data found in {source}")
+
+	def load(item, columns=None) -> pd.DataFrame:
+		if isinstance(item, pd.DataFrame):
+			return item if columns is None else item[columns]
+		return pd.read_csv(item, usecols=columns)
+
+	# First pass: timestamps only, to build the union calendar (kept in UTC)
+	stamps = []
+	tz_aware = False
+	for item in items.values():
+		raw = pd.to_datetime(load(item, ["datetime"])["datetime"])
+		tz_aware = tz_aware or raw.dt.tz is not None
+		stamps.append(pd.to_datetime(raw, utc=True).dt.tz_convert(None).to_numpy())
+	dates = pd.DatetimeIndex(np.unique(np.concatenate(stamps))).tz_localize("UTC")
+
+	out = Path(out_dir)
+	out.mkdir(parents=True, exist_ok=True)
+	tickers = list(items)
+	# Write temporary siblings and rename them, so an existing map is never rewritten under its readers
+	names = ("panel.npy", "dates.npy", "index.json")
+	tmp = {name: out / f"{name}.tmp-{os.getpid()}" for name in names}
+	try:
+		data = np.lib.format.open_memmap(
+			tmp["panel.npy"], mode="w+", dtype=dtype, shape=(len(dates), len(tickers), len(fields))
+		)
+		for j, (ticker, item) in enumerate(items.items()):
+			frame = load(item, ["datetime"] + list(fields))
+			frame.index = pd.to_datetime(frame.pop("datetime"), utc=True)
+			frame = frame[~frame.index.duplicated(keep="last")]
+			data[:, j, :] = frame.reindex(dates)[list(fields)].to_numpy(dtype=dtype)
+		data.flush()
+		del data
+
+		with open(tmp["dates.npy"], "wb") as fh:
+			np.save(fh, dates.tz_convert(None).to_numpy().astype("datetime64[ns]").view(np.int64))
+		with open(tmp["index.json"], "w") as fh:
+			json.dump({"tickers": tickers, "fields": list(fields), "tz": "UTC" if tz_aware else None}, fh)
+		for name in names:
+			os.replace(tmp[name], out / name)
+	finally:
+		for path in tmp.values():
+			path.unlink(missing_ok=True)
+	return open_price_panel(out)
+
+
+def open_price_panel(path: Union[str, Path]) -> PricePanel:
+	"""Map an existing panel read-only; only the small index is read into memory."""
+	path = Path(path)
+	with open(path / "index.json") as fh:
+		meta = json.load(fh)
+	data = np.load(path / "panel.npy", mmap_mode="r")
+	dates = pd.DatetimeIndex(np.load(path / "dates.npy").view("datetime64[ns]"))
+	if meta.get("tz"):
+		dates = dates.tz_localize("UTC")
+	return PricePanel(path=path, data=data, dates=dates, tickers=meta["tickers"], fields=meta["fields"])
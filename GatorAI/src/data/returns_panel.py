@@ -0,0 +1,199 @@
+"""Aligned wide price and return matrices built once from long OHLCV data.
+
+:func:`build_returns_panel` pivots the long output of ``fetch_ohlc`` into a
+(time x ticker) matrix of split- and dividend-adjusted prices (``adj_close``
+by default) and derives simple and log returns from it, on the union or the
+intersection of the tickers' calendars. The result is cached on disk under a
+content hash of the input and the build options, as ``.npy`` files that are
+opened memory-mapped, so the backtester, the optimizer and the dashboard read
+the same precomputed arrays instead of each calling ``pct_change``.
+
+Cache layout::
+
+	<cache_dir>/<key>/prices.npy, simple.npy, log.npy, dates.npy, index.json
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+RETURNS_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "cache" / "returns"
+CALENDARS = ("union", "intersection")
+# Bump when the build logic changes so stale cache entries are not reused
+PANEL_VERSION = 1
+
+
+@dataclass
+class ReturnsPanel:
+	"""(time x ticker) prices and returns; arrays may be read-only memory maps.
+
+	Returns on row ``t`` are from bar ``t - 1`` to ``t``; the first row and
+	bars before a ticker's first price are NaN.
+	"""
+	dates: pd.DatetimeIndex
+	tickers: List[str]
+	prices: np.ndarray
+	simple: np.ndarray
+	log: np.ndarray
+	key: str
+	path: Optional[Path] = None
+
+	@property
+	def shape(self):
+		return self.prices.shape
+
+	def price_frame(self, tickers: Optional[Sequence[str]] = None) -> pd.DataFrame:
+		return self._frame(self.prices, tickers)
+
+	def returns_frame(self, kind: str = "simple", tickers: Optional[Sequence[str]] = None) -> pd.DataFrame:
+		"""Wide returns, "simple" or "log", without the all-NaN first row."""
+		if kind not in ("simple", "log"):
+			raise ValueError(f"Unknown return kind '{kind}'. Choose 'simple' or 'log'")
+		return self._frame(self.simple if kind == "simple" else self.log, tickers).iloc[1:]
+
+	def _frame(self, values: np.ndarray, tickers: Optional[Sequence[str]]) -> pd.DataFrame:
+		names = self.tickers
+		if tickers is not None:
+			values = values[:, [self.tickers.index(t) for t in tickers]]
+			names = list(tickers)
+		return pd.DataFrame(values, index=self.dates, columns=names, copy=False)
+
+
+def panel_key(
+	df: pd.DataFrame,
+	price_col: str = "adj_close",
+	calendar: str = "union",
+	fill_limit: Optional[int] = None,
+	dtype: str = "float64",
+) -> str:
+	"""Content hash of the ticker, datetime and price columns plus the build options."""
+	digest = hashlib.blake2b(digest_size=16)
+	digest.update(repr((PANEL_VERSION, price_col, calendar, fill_limit, dtype)).encode())
+	codes, labels = pd.factorize(df["ticker"], sort=True)
+	digest.update("\x1f".join(map(str, labels)).encode())
+	digest.update(np.ascontiguousarray(codes, dtype=np.int64).view(np.uint8))
+	stamps = pd.DatetimeIndex(pd.to_datetime(df["datetime"], utc=True)).as_unit("ns")
+	digest.update(np.ascontiguousarray(stamps.asi8).view(np.uint8))
+	prices = pd.to_numeric(df[price_col], errors="coerce").to_numpy(dtype=np.float64)
+	digest.update(np.ascontiguousarray(prices).view(np.uint8))
+	return digest.hexdigest()
+
+
+def _pivot(df: pd.DataFrame, price_col: str, calendar: str, fill_limit: Optional[int], dtype: str):
+	frame = df[["ticker", "datetime", price_col]]
+	frame = frame[frame[price_col].notna()]
+	codes, labels = pd.factorize(frame["ticker"], sort=True)
+	stamps = pd.DatetimeIndex(pd.to_datetime(frame["datetime"], utc=True)).as_unit("ns").asi8
+	values = pd.to_numeric(frame[price_col], errors="coerce").to_numpy(dtype=np.float64)
+
+	dates, rows = np.unique(stamps, return_inverse=True)
+	prices = np.full((len(dates), len(labels)), np.nan)
+	# Later rows overwrite earlier ones, so the last duplicate timestamp wins
+	prices[rows, codes] = values
+
+	listed = ~np.isnan(prices)
+	if calendar == "intersection":
+		keep = listed.all(axis=1)
+		dates, prices = dates[keep], prices[keep]
+	elif fill_limit != 0:
+		# Carry the last price over bars a listed ticker is missing, so the
+		# return over a gap lands on the bar where trading resumes
+		positions = np.arange(len(dates))[:, None]
+		source = np.maximum.accumulate(np.where(listed, positions, 0), axis=0)
+		seen = np.maximum.accumulate(listed, axis=0)
+		if fill_limit is not None:
+			seen &= positions - source <= fill_limit
+		prices = np.where(seen, np.take_along_axis(prices, source, axis=0), np.nan)
+
+	simple = np.full(prices.shape, np.nan)
+	log = np.full(prices.shape, np.nan)
+	with np.errstate(invalid="ignore", divide="ignore"):
+		simple[1:] = prices[1:] / prices[:-1] - 1.0
+		log[1:] = np.log(prices[1:] / prices[:-1])
+	index = pd.DatetimeIndex(dates.view("datetime64[ns]")).tz_localize("UTC")
+	as_dtype = lambda a: a.astype(dtype, copy=False)
+	return index, [str(t) for t in labels], as_dtype(prices), as_dtype(simple), as_dtype(log)
+
+
+def _write_panel(panel: ReturnsPanel, directory: Path) -> None:
+	# Write into a temporary sibling and rename, so readers never see a partial entry
+	tmp = directory.with_name(directory.name + f".tmp-{os.getpid()}")
+	tmp.mkdir(parents=True, exist_ok=True)
+	for name in ("prices", "simple", "log"):
+		np.save(tmp / f"{name}.npy", getattr(panel, name))
+	np.save(tmp / "dates.npy", panel.dates.tz_convert(None).as_unit("ns").asi8)
+	with open(tmp / "index.json", "w") as fh:
+		json.dump({"tickers": panel.tickers, "key": panel.key}, fh)
+	try:
+		os.replace(tmp, directory)
+	except OSError:
+		# Another process stored the same key first; its arrays are identical
+		shutil.rmtree(tmp, ignore_errors=True)
+
+
+def open_returns_panel(path: Union[str, Path]) -> ReturnsPanel:
+	"""Map a cached panel read-only."""
+	path = Path(path)
+	with open(path / "index.json") as fh:
+		meta = json.load(fh)
+	arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in ("prices", "simple", "log")}
+	dates = pd.DatetimeIndex(np.load(path / "dates.npy").view("datetime64[ns]")).tz_localize("UTC")
+	return ReturnsPanel(dates=dates, tickers=meta["tickers"], key=meta["key"], path=path, **arrays)
+
+
+def build_returns_panel(
+	df: pd.DataFrame,
+	price_col: str = "adj_close",
+	calendar: str = "union",
+	fill_limit: Optional[int] = None,
+	dtype: str = "float64",
+	cache_dir: Optional[Union[str, Path]] = RETURNS_CACHE_DIR,
+) -> ReturnsPanel:
+	"""Build (or load from the cache) the wide price and return panel of a long frame.
+
+	Args:
+		df: Long frame with ``ticker``, ``datetime`` and ``price_col`` columns,
+			e.g. the output of ``fetch_ohlc`` or ``clean_ohlcv``
+		price_col: Price column; the default ``adj_close`` is adjusted for
+			splits and dividends, so returns include corporate actions
+		calendar: "union" (every timestamp any ticker trades; NaN before a
+			ticker's first price) or "intersection" (timestamps all tickers trade)
+		fill_limit: On the union calendar, maximum consecutive missing bars
+			to carry a price over (default: unlimited; 0: no filling)
+		dtype: "float64" or "float32" for the stored arrays
+		cache_dir: Cache directory (None: build in memory without caching)
+
+	Returns:
+		ReturnsPanel, memory-mapped from the cache when ``cache_dir`` is set
+
+	Raises:
+		ValueError: If an option is unknown or a required column is missing
+	"""
+	if calendar not in CALENDARS:
+		raise ValueError(f"Unknown calendar '{calendar}'. Choose from {list(CALENDARS)}")
+	if dtype not in ("float32", "float64"):
+		raise ValueError("dtype must be 'float32' or 'float64'")
+	missing = [c for c in ("ticker", "datetime", price_col) if c not in df.columns]
+	if missing:
+		raise ValueError(f"Columns {missing} not found. Available columns: {list(df.columns)}")
+
+	key = panel_key(df, price_col, calendar, fill_limit, dtype)
+	if cache_dir is not None:
+		directory = Path(cache_dir) / key
+		if (directory / "index.json").exists():
+			return open_returns_panel(directory)
+
+	dates, tickers, prices, simple, log = _pivot(df, price_col, calendar, fill_limit, dtype)
+	panel = ReturnsPanel(dates=dates, tickers=tickers, prices=prices, simple=simple, log=log, key=key)
+	if cache_dir is None:
+		return panel
+	_write_panel(panel, directory)
+	return open_returns_panel(directory)
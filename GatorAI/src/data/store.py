@@ -0,0 +1,257 @@
+"""Columnar on-disk OHLCV store partitioned by interval and ticker.
+
+Layout::
+
+	<root>/interval=<interval>/ticker=<ticker>/part-00000.parquet
+	                                          /part-00001.parquet  (appended)
+
+Each part holds a ``datetime`` column (datetime64) followed by typed price
+columns and an int64 ``volume``. Parquet readers push column projection and
+date-range predicates down to the file; Feather parts are read whole and
+filtered in memory.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+STORE_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "store"
+FORMATS = ("parquet", "feather")
+PRICE_COLUMNS = ["open", "high", "low", "close", "adj_close"]
+
+
+def partition_dir(ticker: str, interval: str, root: Optional[Path] = None) -> Path:
+	"""Directory holding the parts for one ticker and interval."""
+	return Path(root or STORE_DIR) / f"interval={interval}" / f"ticker={ticker}"
+
+
+def _parts(directory: Path) -> List[Path]:
+	return sorted(p for p in directory.glob("part-*") if p.suffix in (".parquet", ".feather"))
+
+
+def _format_of(path: Path) -> str:
+	return path.suffix.lstrip(".")
+
+
+def _typed_frame(df: pd.DataFrame, float_dtype: str) -> pd.DataFrame:
+	out = df.drop(columns=[c for c in ("ticker", "interval") if c in df.columns])
+	if "datetime" not in out.columns:
+		out = out.reset_index().rename(columns={out.index.name or "index": "datetime"})
+	out["datetime"] = pd.to_datetime(out["datetime"])
+	for col in PRICE_COLUMNS:
+		if col in out.columns:
+			out[col] = out[col].astype(float_dtype)
+	if "volume" in out.columns:
+		out["volume"] = out["volume"].fillna(0).astype(np.int64)
+	return out.sort_values("datetime", kind="stable").reset_index(drop=True)
+
+
+def _write_part(df: pd.DataFrame, path: Path, compression: str, row_group_size: int) -> None:
+	tmp = path.with_name(path.name + ".tmp")
+	if _format_of(path) == "parquet":
+		df.to_parquet(tmp, index=False, compression=compression, row_group_size=row_group_size)
+	else:
+		df.to_feather(tmp, compression=compression)
+	os.replace(tmp, path)
+
+
+def write_ohlc(
+	df: pd.DataFrame,
+	ticker: str,
+	interval: str,
+	root: Optional[Path] = None,
+	fmt: str = "parquet",
+	float_dtype: str = "float64",
+	append: bool = False,
+	compression: str = "zstd",
+	row_group_size: int = 50_000,
+) -> Path:
+	"""Write OHLCV rows for one ticker to the store.
+
+	Args:
+		df: Frame with a ``datetime`` column (or datetime index) and OHLCV columns
+		ticker: Ticker symbol
+		interval: Data interval (1d, 1h, 5m, etc.)
+		root: Store root directory (default: data/store)
+		fmt: "parquet" or "feather"
+		float_dtype: "float64" or "float32" for price columns
+		append: Add a new part instead of replacing the partition
+		compression: Codec passed to the writer (default: "zstd")
+		row_group_size: Parquet row-group size; smaller groups give finer date pushdown
+
+	Returns:
+		Path of the part file written
+
+	Raises:
+		ValueError: If the format or float dtype is not supported
+	"""
+	if fmt not in FORMATS:
+		raise ValueError(f"Unsupported store format '{fmt}'. Choose from {FORMATS}")
+	if float_dtype not in ("float32", "float64"):
+		raise ValueError("float_dtype must be 'float32' or 'float64'")
+
+	directory = partition_dir(ticker, interval, root)
+	directory.mkdir(parents=True, exist_ok=True)
+	existing = _parts(directory)
+	typed = _typed_frame(df, float_dtype)
+
+	if append and existing:
+		last = int(existing[-1].stem.split("-")[1])
+		path = directory / f"part-{last + 1:05d}.{fmt}"
+		_write_part(typed, path, compression, row_group_size)
+		return path
+
+	path = directory / f"part-00000.{fmt}"
+	_write_part(typed, path, compression, row_group_size)
+	for old in existing:
+		if old != path:
+			old.unlink()
+	return path
+
+
+def _coerce_bound(value, tz) -> Optional[pd.Timestamp]:
+	if value is None:
+		return None
+	ts = pd.Timestamp(value)
+	if tz is not None and ts.tzinfo is None:
+		ts = ts.tz_localize(tz)
+	elif tz is None and ts.tzinfo is not None:
+		ts = ts.tz_convert(None)
+	return ts
+
+
+def read_table(
+	path: Union[str, Path],
+	columns: Optional[Sequence[str]] = None,
+	start=None,
+	end=None,
+) -> pd.DataFrame:
+	"""Read a part file or a partition directory, keeping ``datetime`` as a column.
+
+	Args:
+		path: A ``.parquet``/``.feather`` file or a partition directory
+		columns: Columns to load (``datetime`` is always included)
+		start: Inclusive lower bound on ``datetime``
+		end: Inclusive upper bound on ``datetime``
+
+	Returns:
+		DataFrame sorted by ``datetime``
+
+	Raises:
+		FileNotFoundError: If the path holds no store parts
+	"""
+	path = Path(path)
+	parts = _parts(path) if path.is_dir() else ([path] if path.exists() else [])
+	if not parts:
+		raise FileNotFoundError(f"No store files found at {path}")
+	cols = None if columns is None else ["datetime"] + [c for c in columns if c != "datetime"]
+
+	frames = []
+	for part in parts:
+		if _format_of(part) == "parquet":
+			import pyarrow.parquet as pq
+
+			tz = getattr(pq.read_schema(part).field("datetime").type, "tz", None)
+			lo, hi = _coerce_bound(start, tz), _coerce_bound(end, tz)
+			filters = [("datetime", ">=", lo)] if lo is not None else []
+			filters += [("datetime", "<=", hi)] if hi is not None else []
+			frames.append(pd.read_parquet(part, columns=cols, filters=filters or None))
+		else:
+			frame = pd.read_feather(part, columns=cols)
+			tz = frame["datetime"].dt.tz
+			lo, hi = _coerce_bound(start, tz), _coerce_bound(end, tz)
+			mask = np.ones(len(frame), dtype=bool)
+			if lo is not None:
+				mask &= (frame["datetime"] >= lo).to_numpy()
+			if hi is not None:
+				mask &= (frame["datetime"] <= hi).to_numpy()
+			frames.append(frame[mask] if not mask.all() else frame)
+
+	out = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+	if len(frames) > 1:
+		out = out.drop_duplicates("datetime", keep="last").sort_values("datetime", kind="stable")
+	return out.reset_index(drop=True)
+
+
+def read_ohlc(
+	ticker: str,
+	interval: str,
+	root: Optional[Path] = None,
+	columns: Optional[Sequence[str]] = None,
+	start=None,
+	end=None,
+) -> pd.DataFrame:
+	"""Read one ticker from the store as a frame indexed by ``datetime``.
+
+	Args:
+		ticker: Ticker symbol
+		interval: Data interval (1d, 1h, 5m, etc.)
+		root: Store root directory (default: data/store)
+		columns: Columns to load (default: all)
+		start: Inclusive lower bound on the timestamp
+		end: Inclusive upper bound on the timestamp
+
+	Returns:
+		DataFrame with a DatetimeIndex named ``datetime``
+	"""
+	df = read_table(partition_dir(ticker, interval, root), columns=columns, start=start, end=end)
+	return df.set_index("datetime")
+
+
+def read_tail(
+	ticker: str,
+	interval: str,
+	n_rows: int,
+	root: Optional[Path] = None,
+	columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+	"""Last ``n_rows`` stored rows for a ticker, reading only the newest parts."""
+	parts = _parts(partition_dir(ticker, interval, root))
+	frames: List[pd.DataFrame] = []
+	count = 0
+	for part in reversed(parts):
+		frame = read_table(part, columns=columns)
+		frames.insert(0, frame)
+		count += len(frame)
+		if count >= n_rows:
+			break
+	if not frames:
+		return pd.DataFrame()
+	return pd.concat(frames, ignore_index=True).tail(n_rows).reset_index(drop=True)
+
+
+def has_ticker(ticker: str, interval: str, root: Optional[Path] = None) -> bool:
+	"""True if the store holds any data for ``ticker`` at ``interval``."""
+	return bool(_parts(partition_dir(ticker, interval, root)))
+
+
+def list_tickers(interval: str, root: Optional[Path] = None) -> List[str]:
+	"""Tickers stored for one interval."""
+	base = Path(root or STORE_DIR) / f"interval={interval}"
+	if not base.exists():
+		return []
+	return sorted(p.name.split("=", 1)[1] for p in base.glob("ticker=*") if _parts(p))
+
+
+def load_long(
+	tickers: Optional[Iterable[str]] = None,
+	interval: str = "1d",
+	root: Optional[Path] = None,
+	columns: Optional[Sequence[str]] = None,
+	start=None,
+	end=None,
+) -> pd.DataFrame:
+	"""Load several tickers in the long format returned by ``fetch_ohlc``."""
+	names = list(tickers) if tickers is not None else list_tickers(interval, root)
+	frames = []
+	for ticker in names:
+		frame = read_table(partition_dir(ticker, interval, root), columns=columns, start=start, end=end)
+		frame.insert(0, "ticker", ticker)
+		frames.append(frame)
+	if not frames:
+		return pd.DataFrame(columns=["ticker", "datetime"] + list(columns or []))
+	return pd.concat(frames, ignore_index=True)
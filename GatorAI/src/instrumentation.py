@@ -0,0 +1,225 @@
+"""Opt-in timing and memory instrumentation for pipeline hot paths.
+
+Instrumented functions record wall time, call count, rows processed and
+(optionally) peak traced memory once instrumentation is enabled, either with
+:func:`enable` or by setting ``GATORAI_PROFILE=1`` before import. While
+disabled, a decorated call costs one attribute check.
+
+Example::
+
+	import instrumentation
+	instrumentation.enable(track_memory=True)
+	run_csv_backtest("data/processed/SPY_1d.csv")
+	print(instrumentation.to_json())
+
+Statistics are per process; workers of a process pool keep their own.
+"""
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+__all__ = [
+	"enable",
+	"disable",
+	"is_enabled",
+	"reset",
+	"instrument",
+	"result_len",
+	"span",
+	"report",
+	"to_json",
+	"log_summary",
+]
+
+
+@dataclass
+class CallStats:
+	calls: int = 0
+	total_time: float = 0.0
+	max_time: float = 0.0
+	rows: int = 0
+	peak_memory: int = 0
+
+
+class _State:
+	enabled = os.environ.get("GATORAI_PROFILE", "") not in ("", "0")
+	track_memory = False
+
+
+_STATE = _State()
+_STATS: Dict[str, CallStats] = {}
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+
+def enable(track_memory: bool = False) -> None:
+	"""Start recording; ``track_memory`` also starts ``tracemalloc`` (slower)."""
+	_STATE.enabled = True
+	_STATE.track_memory = track_memory
+	if track_memory and not tracemalloc.is_tracing():
+		tracemalloc.start()
+
+
+def disable() -> None:
+	"""Stop recording (collected statistics are kept until :func:`reset`)."""
+	_STATE.enabled = False
+	if _STATE.track_memory and tracemalloc.is_tracing():
+		tracemalloc.stop()
+	_STATE.track_memory = False
+
+
+def is_enabled() -> bool:
+	return _STATE.enabled
+
+
+def reset() -> None:
+	"""Drop all collected statistics."""
+	with _LOCK:
+		_STATS.clear()
+
+
+def _memory_stack() -> List[List[int]]:
+	stack = getattr(_LOCAL, "stack", None)
+	if stack is None:
+		stack = _LOCAL.stack = []
+	return stack
+
+
+class _Span:
+	"""Timer for one instrumented region; nested spans share the tracemalloc peak."""
+
+	__slots__ = ("name", "rows", "_t0", "_frame")
+
+	def __init__(self, name: str, rows: Optional[int] = None):
+		self.name = name
+		self.rows = rows
+		self._frame: Optional[List[int]] = None
+
+	def __enter__(self) -> "_Span":
+		if _STATE.track_memory and tracemalloc.is_tracing():
+			current, peak = tracemalloc.get_traced_memory()
+			stack = _memory_stack()
+			if stack:
+				stack[-1][1] = max(stack[-1][1], peak)
+			tracemalloc.reset_peak()
+			# [memory at entry, highest peak seen inside]
+			self._frame = [current, current]
+			stack.append(self._frame)
+		self._t0 = time.perf_counter()
+		return self
+
+	def __exit__(self, *exc) -> None:
+		elapsed = time.perf_counter() - self._t0
+		peak_delta = 0
+		if self._frame is not None:
+			_, peak = tracemalloc.get_traced_memory()
+			stack = _memory_stack()
+			stack.pop()
+			peak = max(peak, self._frame[1])
+			peak_delta = peak - self._frame[0]
+			if stack:
+				stack[-1][1] = max(stack[-1][1], peak)
+		_record(self.name, elapsed, self.rows or 0, peak_delta)
+
+
+class _NullSpan:
+	rows = None
+
+	def __enter__(self) -> "_NullSpan":
+		return self
+
+	def __exit__(self, *exc) -> None:
+		return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _record(name: str, elapsed: float, rows: int, peak_memory: int) -> None:
+	with _LOCK:
+		stat = _STATS.setdefault(name, CallStats())
+		stat.calls += 1
+		stat.total_time += elapsed
+		stat.max_time = max(stat.max_time, elapsed)
+		stat.rows += rows
+		stat.peak_memory = max(stat.peak_memory, peak_memory)
+
+
+def span(name: str, rows: Optional[int] = None):
+	"""Context manager timing a block; set ``.rows`` on the returned span to count rows."""
+	if not _STATE.enabled:
+		return _NULL_SPAN
+	return _Span(name, rows)
+
+
+def instrument(name: Optional[str] = None, rows: Optional[Callable[..., int]] = None):
+	"""Decorator recording calls to the wrapped function when instrumentation is enabled.
+
+	Args:
+		name: Label in the report (default: ``module.qualname``)
+		rows: Optional ``rows(result, *args, **kwargs) -> int`` giving the rows processed
+	"""
+	def decorator(func):
+		label = name or f"{func.__module__}.{func.__qualname__}"
+
+		@functools.wraps(func)
+		def wrapper(*args, **kwargs):
+			if not _STATE.enabled:
+				return func(*args, **kwargs)
+			with _Span(label) as s:
+				result = func(*args, **kwargs)
+				if rows is not None:
+					try:
+						s.rows = int(rows(result, *args, **kwargs))
+					except Exception:
+						s.rows = 0
+			return result
+		return wrapper
+	return decorator
+
+
+def result_len(result: Any, *args, **kwargs) -> int:
+	"""``rows`` helper: length of the returned object."""
+	return len(result) if result is not None else 0
+
+
+def report() -> Dict[str, Dict[str, float]]:
+	"""Collected statistics keyed by label, sorted by total time (descending)."""
+	with _LOCK:
+		items = sorted(_STATS.items(), key=lambda kv: kv[1].total_time, reverse=True)
+	out = {}
+	for label, stat in items:
+		entry = asdict(stat)
+		entry["mean_time"] = stat.total_time / stat.calls if stat.calls else 0.0
+		entry["rows_per_sec"] = stat.rows / stat.total_time if stat.total_time > 0 else 0.0
+		out[label] = entry
+	return out
+
+
+def to_json(path: Optional[Union[str, Path]] = None) -> str:
+	"""Serialize :func:`report` as JSON, optionally writing it to ``path``."""
+	text = json.dumps(report(), indent=2)
+	if path is not None:
+		Path(path).write_text(text)
+	return text
+
+
+def log_summary(logger: Optional[logging.Logger] = None, level: int = logging.INFO) -> None:
+	"""Emit one structured log record per instrumented label."""
+	logger = logger or logging.getLogger(__name__)
+	for label, entry in report().items():
+		logger.log(
+			level,
+			f"{label}: {entry['calls']} calls, {entry['total_time']:.4f}s total, "
+			f"{entry['rows']} rows, peak {entry['peak_memory'] / 1e6:.1f} MB",
+			extra={"profile": {"label": label, **entry}},
+		)
@@ -0,0 +1,197 @@
+"""Named, parameterized features over a price panel, materialized lazily and cached on disk.
+
+A :class:`FeatureStore` wraps a wide (time x ticker) price frame. Features
+are declared as :class:`FeatureDefinition` objects (a builder from
+``FEATURES`` plus its parameters) and computed only when first requested.
+Results are kept in memory and as Parquet files under
+``<root>/<data version>/<definition key>.parquet``, so training runs and the
+dashboard working on the same prices share the precomputed matrices.
+
+Layout::
+
+	<root>/<data version>/<definition key>.parquet   (time x ticker, one file per feature)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+	from ..backtesting.indicators import data_version, rolling_std, rsi, sma
+except ImportError:  # src/ itself is on sys.path, so the subpackages are top-level
+	from backtesting.indicators import data_version, rolling_std, rsi, sma
+
+FEATURE_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "cache" / "features"
+# Bump when a builder changes so stale cache entries are not reused
+FEATURE_VERSION = 1
+
+FeatureBuilder = Callable[..., pd.DataFrame]
+
+
+def _returns(prices: pd.DataFrame, periods: int = 1, lag: int = 0) -> pd.DataFrame:
+	return prices.pct_change(int(periods), fill_method=None).shift(int(lag))
+
+
+def _log_returns(prices: pd.DataFrame, periods: int = 1, lag: int = 0) -> pd.DataFrame:
+	return np.log(prices / prices.shift(int(periods))).shift(int(lag))
+
+
+def _volatility(prices: pd.DataFrame, window: int = 20) -> pd.DataFrame:
+	return rolling_std(prices.pct_change(fill_method=None), int(window))
+
+
+def _momentum(prices: pd.DataFrame, window: int = 20, skip: int = 0) -> pd.DataFrame:
+	return prices.shift(int(skip)) / prices.shift(int(window)) - 1.0
+
+
+def _sma_ratio(prices: pd.DataFrame, window: int = 20) -> pd.DataFrame:
+	return prices / sma(prices, int(window)) - 1.0
+
+
+def _zscore(prices: pd.DataFrame, window: int = 20) -> pd.DataFrame:
+	return (prices - sma(prices, int(window))) / rolling_std(prices, int(window))
+
+
+def _rsi(prices: pd.DataFrame, window: int = 14) -> pd.DataFrame:
+	return rsi(prices, int(window))
+
+
+FEATURES: Dict[str, FeatureBuilder] = {
+	"returns": _returns,
+	"log_returns": _log_returns,
+	"volatility": _volatility,
+	"momentum": _momentum,
+	"sma_ratio": _sma_ratio,
+	"zscore": _zscore,
+	"rsi": _rsi,
+}
+
+
+@dataclass(frozen=True)
+class FeatureDefinition:
+	"""A builder from ``FEATURES`` and its keyword parameters.
+
+	Every builder only uses prices up to each row, so features are known at
+	the close of their row.
+	"""
+	kind: str
+	params: Dict[str, Any] = field(default_factory=dict, hash=False)
+
+	def __post_init__(self) -> None:
+		if self.kind not in FEATURES:
+			raise ValueError(f"Unknown feature '{self.kind}'. Choose from {list(FEATURES)}")
+
+	@property
+	def key(self) -> str:
+		"""Stable hash of the builder, its parameters and ``FEATURE_VERSION``."""
+		spec = json.dumps(
+			{"kind": self.kind, "params": self.params, "version": FEATURE_VERSION},
+			sort_keys=True,
+			default=lambda value: value.item() if hasattr(value, "item") else str(value),
+		)
+		return hashlib.blake2b(spec.encode(), digest_size=12).hexdigest()
+
+	def compute(self, prices: pd.DataFrame) -> pd.DataFrame:
+		return FEATURES[self.kind](prices, **self.params)
+
+
+def panel_version(prices: pd.DataFrame) -> str:
+	"""Content hash of a wide price frame: values, dates and tickers."""
+	digest = hashlib.blake2b(data_version(prices).encode(), digest_size=16)
+	digest.update("\x1f".join(map(str, prices.columns)).encode())
+	digest.update("\x1f".join(map(str, prices.index)).encode())
+	return digest.hexdigest()
+
+
+class FeatureStore:
+	"""Lazily materialized feature matrices over one wide price frame.
+
+	Args:
+		prices: Wide (time x ticker) prices, e.g. ``ReturnsPanel.price_frame()``
+		root: Cache directory (None: keep results in memory only)
+		version: Data version of ``prices`` (default: a content hash)
+	"""
+
+	def __init__(
+		self,
+		prices: pd.DataFrame,
+		root: Optional[Union[str, Path]] = FEATURE_CACHE_DIR,
+		version: Optional[str] = None,
+	):
+		self.prices = prices
+		self.version = version if version is not None else panel_version(prices)
+		self.root = None if root is None else Path(root)
+		self.definitions: Dict[str, FeatureDefinition] = {}
+		self._frames: Dict[str, pd.DataFrame] = {}
+		self.computed = 0
+
+	def define(self, name: str, kind: str, **params) -> "FeatureStore":
+		"""Declare (or redefine) feature ``name``; nothing is computed yet."""
+		definition = FeatureDefinition(kind, params)
+		if self.definitions.get(name) != definition:
+			self._frames.pop(name, None)
+		self.definitions[name] = definition
+		return self
+
+	def __contains__(self, name: str) -> bool:
+		return name in self.definitions
+
+	@property
+	def names(self) -> List[str]:
+		return list(self.definitions)
+
+	def _path(self, definition: FeatureDefinition) -> Optional[Path]:
+		if self.root is None:
+			return None
+		return self.root / self.version / f"{definition.key}.parquet"
+
+	def get(self, name: str) -> pd.DataFrame:
+		"""(time x ticker) matrix of one feature, from memory, the disk cache, or computed."""
+		if name not in self.definitions:
+			raise KeyError(f"Feature '{name}' is not defined. Defined: {self.names}")
+		if name in self._frames:
+			return self._frames[name]
+		definition = self.definitions[name]
+		path = self._path(definition)
+		if path is not None and path.exists():
+			frame = pd.read_parquet(path)
+			frame.index, frame.columns = self.prices.index, self.prices.columns
+		else:
+			frame = definition.compute(self.prices)
+			self.computed += 1
+			if path is not None:
+				path.parent.mkdir(parents=True, exist_ok=True)
+				tmp = path.with_name(path.name + f".tmp-{os.getpid()}")
+				frame.rename(columns=str).to_parquet(tmp)
+				os.replace(tmp, path)
+		self._frames[name] = frame
+		return frame
+
+	def materialize(self, names: Optional[Iterable[str]] = None) -> "FeatureStore":
+		"""Compute (or load) the given features, default all, ahead of use."""
+		for name in self.names if names is None else names:
+			self.get(name)
+		return self
+
+	def features(self, names: Optional[Sequence[str]] = None) -> Dict[str, pd.DataFrame]:
+		"""Mapping of feature name to matrix, the ``features`` input of ``walk_forward_ridge``."""
+		return {name: self.get(name) for name in (self.names if names is None else names)}
+
+	def cube(self, names: Optional[Sequence[str]] = None) -> np.ndarray:
+		"""(time, tickers, features) array of the given features."""
+		return np.stack([f.to_numpy(dtype=np.float64) for f in self.features(names).values()], axis=-1)
+
+	def frame(self, ticker: str, names: Optional[Sequence[str]] = None) -> pd.DataFrame:
+		"""(time x feature) design matrix of one ticker, the ``X`` of ``ReturnForecaster.fit``."""
+		return pd.DataFrame({name: matrix[ticker] for name, matrix in self.features(names).items()})
+
+	def forward_returns(self, horizon: int = 1) -> pd.DataFrame:
+		"""Return over the next ``horizon`` rows, the usual forecasting target."""
+		return self.prices.shift(-horizon) / self.prices - 1.0
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Mapping, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 from sklearn.linear_model import Ridge
 
+try:
+	from ..instrumentation import instrument
+except ImportError:  # src/ itself is on sys.path, so the subpackages are top-level
+	from instrumentation import instrument
+
 
 @dataclass
 class ReturnForecaster:
@@ -23,3 +28,160 @@ class ReturnForecaster:
 			raise RuntimeError("Model not fit.")
 		pred = self.model.predict(X.values)
 		return pd.Series(pred, index=X.index)
+
+
+class RidgeMoments:
+	"""Per-ticker sufficient statistics of ridge regressions, updated by adding and dropping rows.
+
+	Holds the count, sums and cross-products of (features, target) rows for
+	every ticker at once; rows with a missing feature or target are skipped
+	per ticker. As in ``rebalance.RollingMoments``, rows are shifted by a fixed
+	reference before accumulation to keep the centered cross-products well
+	conditioned.
+	"""
+
+	def __init__(self, x_reference: np.ndarray, y_reference: np.ndarray):
+		n_tickers, n_features = x_reference.shape
+		self.x_reference = np.asarray(x_reference, dtype=np.float64)
+		self.y_reference = np.asarray(y_reference, dtype=np.float64)
+		self.n = np.zeros(n_tickers)
+		self.sum_x = np.zeros((n_tickers, n_features))
+		self.sum_y = np.zeros(n_tickers)
+		self.xx = np.zeros((n_tickers, n_features, n_features))
+		self.xy = np.zeros((n_tickers, n_features))
+
+	def _update(self, X: np.ndarray, y: np.ndarray, sign: float) -> None:
+		# X is (rows, tickers, features) and y (rows, tickers)
+		if not len(X):
+			return
+		valid = ~(np.isnan(X).any(axis=-1) | np.isnan(y))
+		Xs = np.where(valid[..., None], X - self.x_reference, 0.0)
+		ys = np.where(valid, y - self.y_reference, 0.0)
+		per_ticker = Xs.transpose(1, 2, 0)  # (tickers, features, rows)
+		self.n += sign * valid.sum(axis=0)
+		self.sum_x += sign * Xs.sum(axis=0)
+		self.sum_y += sign * ys.sum(axis=0)
+		self.xx += sign * (per_ticker @ per_ticker.transpose(0, 2, 1))
+		self.xy += sign * (per_ticker @ ys.T[:, :, None])[..., 0]
+
+	def add(self, X: np.ndarray, y: np.ndarray) -> None:
+		self._update(X, y, 1.0)
+
+	def drop(self, X: np.ndarray, y: np.ndarray) -> None:
+		self._update(X, y, -1.0)
+
+	def solve(self, alpha: float, min_obs: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+		"""Coefficients (tickers x features) and intercepts of ``Ridge(alpha, fit_intercept=True)``.
+
+		Tickers with fewer than ``min_obs`` rows get NaN.
+		"""
+		n = np.maximum(self.n, 1.0)
+		mean_x = self.sum_x / n[:, None]
+		mean_y = self.sum_y / n
+		gram = self.xx - n[:, None, None] * mean_x[:, :, None] * mean_x[:, None, :]
+		gram += alpha * np.eye(gram.shape[-1])
+		rhs = self.xy - n[:, None] * mean_x * mean_y[:, None]
+		try:
+			coef = np.linalg.solve(gram, rhs[..., None])[..., 0]
+		except np.linalg.LinAlgError:
+			coef = (np.linalg.pinv(gram) @ rhs[..., None])[..., 0]
+		intercept = (self.y_reference + mean_y) - ((self.x_reference + mean_x) * coef).sum(axis=-1)
+		too_few = self.n < max(min_obs, 1)
+		coef[too_few] = np.nan
+		intercept[too_few] = np.nan
+		return coef, intercept
+
+
+def _feature_cube(
+	features: Union[Mapping[str, pd.DataFrame], np.ndarray],
+	target: pd.DataFrame,
+) -> np.ndarray:
+	if isinstance(features, Mapping):
+		frames = [f.reindex(index=target.index, columns=target.columns) for f in features.values()]
+		return np.stack([f.to_numpy(dtype=np.float64) for f in frames], axis=-1)
+	cube = np.asarray(features, dtype=np.float64)
+	if cube.ndim == 2:
+		cube = cube[..., None]
+	if cube.shape[:2] != target.shape:
+		raise ValueError(f"features shape {cube.shape} does not match target shape {target.shape}")
+	return cube
+
+
+def _window_means(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+	"""Per-ticker means of the complete (features, target) rows, 0 where there are none."""
+	valid = ~(np.isnan(X).any(axis=-1) | np.isnan(y))
+	count = np.maximum(valid.sum(axis=0), 1)
+	x_mean = np.where(valid[..., None], X, 0.0).sum(axis=0) / count[:, None]
+	y_mean = np.where(valid, y, 0.0).sum(axis=0) / count
+	return x_mean, y_mean
+
+
+@instrument(rows=lambda pred, *args, **kwargs: pred.size)
+def walk_forward_ridge(
+	features: Union[Mapping[str, pd.DataFrame], np.ndarray],
+	target: pd.DataFrame,
+	alpha: float = 1.0,
+	window: Optional[int] = None,
+	refit_every: int = 21,
+	horizon: int = 1,
+	min_train: int = 60,
+	resync_every: Optional[int] = 50,
+) -> pd.DataFrame:
+	"""Out-of-sample ridge forecasts refit every ``refit_every`` rows, one model per ticker.
+
+	``target`` row ``s`` is the return realized ``horizon`` rows later (e.g.
+	``returns.shift(-horizon)``), so a model refit at row ``t`` trains on rows
+	up to ``t - horizon`` only. It then predicts rows ``t`` to
+	``t + refit_every - 1`` from their features. Between refits the per-ticker
+	X'X and X'y are updated with the rows that entered (and, for a rolling
+	window, left) instead of refitting from scratch, and all tickers are solved
+	in one batched call. Coefficients equal those of sklearn's ``Ridge`` fit
+	on the same rows.
+
+	Args:
+		features: Mapping of feature name to a (time x ticker) frame, or an
+			array of shape (time, tickers, features), aligned with ``target``
+		target: Forward returns (time x ticker); NaN rows are skipped per ticker
+		alpha: Ridge penalty (as in ``Ridge(alpha=...)``)
+		window: Rolling training window in rows (default: None, expanding)
+		refit_every: Rows between refits
+		horizon: Rows until a target is known (default: 1)
+		min_train: Minimum training rows before a ticker gets predictions
+		resync_every: Recompute the sums from scratch after this many refits to
+			bound floating-point drift (None: never)
+
+	Returns:
+		Prediction matrix with the index and columns of ``target`` (NaN before
+		the first fit), usable directly as signals for ``run_batched_backtest``
+
+	Raises:
+		ValueError: If shapes do not match or a window parameter is invalid
+	"""
+	if refit_every < 1 or horizon < 0 or (window is not None and window < 1):
+		raise ValueError("refit_every must be >= 1, horizon >= 0 and window >= 1")
+	X = _feature_cube(features, target)
+	y = target.to_numpy(dtype=np.float64)
+	n_obs, n_tickers, _ = X.shape
+	predictions = np.full((n_obs, n_tickers), np.nan)
+	moments: Optional[RidgeMoments] = None
+	lo = hi = 0  # training rows [lo, hi)
+	n_refits = 0
+
+	for t in range(horizon + min_train - 1, n_obs, refit_every):
+		new_hi = t - horizon + 1
+		new_lo = 0 if window is None else max(new_hi - window, 0)
+		resync = resync_every is not None and n_refits % resync_every == 0
+		if moments is None or resync:
+			moments = RidgeMoments(*_window_means(X[new_lo:new_hi], y[new_lo:new_hi]))
+			moments.add(X[new_lo:new_hi], y[new_lo:new_hi])
+		else:
+			moments.add(X[hi:new_hi], y[hi:new_hi])
+			moments.drop(X[lo:new_lo], y[lo:new_lo])
+		lo, hi = new_lo, new_hi
+		n_refits += 1
+
+		coef, intercept = moments.solve(alpha, min_obs=min_train)
+		rows = slice(t, t + refit_every)
+		predictions[rows] = np.einsum("tnk,nk->tn", X[rows], coef) + intercept
+
+	return pd.DataFrame(predictions, index=target.index, columns=target.columns)
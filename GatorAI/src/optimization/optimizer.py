@@ -1,33 +1,241 @@
 from __future__ import annotations
 
-from typing import Optional
+import warnings
+from typing import Optional, Union
 
 import numpy as np
 import pandas as pd
-from numpy.linalg import inv
+from numpy.linalg import LinAlgError
+from scipy.linalg import cho_factor, cho_solve
 
+try:
+	from ..instrumentation import instrument, result_len
+except ImportError:  # src/ itself is on sys.path, so the subpackages are top-level
+	from instrumentation import instrument, result_len
 
+from .risk_models import FactorCovariance, woodbury_solve
+
+Covariance = Union[pd.DataFrame, np.ndarray, FactorCovariance]
+
+
+def _solve_psd(cov: np.ndarray, b: np.ndarray) -> np.ndarray:
+	"""Solve ``cov @ x = b`` by Cholesky, falling back to least squares if not positive definite."""
+	try:
+		return cho_solve(cho_factor(cov, lower=True, check_finite=False), b, check_finite=False)
+	except LinAlgError:
+		return np.linalg.lstsq(cov, b, rcond=None)[0]
+
+
+def _normalize_weights(raw: np.ndarray, long_only: bool, weights_sum_to_one: bool) -> np.ndarray:
+	w = raw / raw.sum()
+	if long_only:
+		w = np.clip(w, 0.0, None)
+		if w.sum() == 0:
+			w = np.full_like(w, 1.0 / len(w))
+		else:
+			w = w / w.sum()
+	if weights_sum_to_one:
+		w = w / w.sum()
+	return w
+
+
+@instrument(rows=lambda w, returns, *args, **kwargs: len(returns))
 def mean_variance_optimize(
 	returns: pd.DataFrame,
 	risk_aversion: float = 1.0,
 	long_only: bool = True,
 	weights_sum_to_one: bool = True,
 	epsilon: float = 1e-8,
+	cov: Optional[Covariance] = None,
 ) -> pd.Series:
+	"""Mean-variance weights ``S^-1 mu``, normalized (and clipped if ``long_only``).
+
+	The long-only weights are the unconstrained solution with negative weights
+	clipped to zero and the rest rescaled, a heuristic that is not the
+	constrained optimum: for that, use :func:`batch_mean_variance`, which
+	solves ``w >= 0`` exactly (its weights also depend on ``risk_aversion``
+	through the budget constraint).
+
+	Args:
+		returns: Returns (time x assets); ``mu`` is their mean
+		risk_aversion: Risk aversion (cancels out in the normalized weights)
+		long_only: Clip negative weights and renormalize
+		weights_sum_to_one: Normalize weights to sum to one
+		epsilon: Ridge added to the covariance diagonal
+		cov: Covariance to use instead of ``returns.cov()``, e.g. from
+			``ledoit_wolf_covariance``, or a ``FactorCovariance``, which is
+			solved by the Woodbury identity without forming the dense matrix
+
+	Returns:
+		Weights indexed by asset
+	"""
 	mu = returns.mean()
-	cov = returns.cov() + np.eye(len(mu)) * epsilon
-	inv_cov = pd.DataFrame(inv(cov.values), index=cov.index, columns=cov.columns)
-	raw = inv_cov @ mu
-	w = raw / raw.sum()
-	if long_only:
-		w = w.clip(lower=0.0)
-		if w.sum() == 0:
-			w = pd.Series(np.full_like(w, 1.0 / len(w)), index=w.index)
+	if isinstance(cov, FactorCovariance):
+		if cov.assets is not None and not cov.assets.equals(mu.index):
+			raise ValueError("Factor covariance assets do not match the return columns")
+		raw = cov.with_ridge(epsilon).solve(mu.to_numpy())
+	else:
+		if cov is None:
+			cov = returns.cov()
+		elif isinstance(cov, pd.DataFrame):
+			cov = cov.reindex(index=mu.index, columns=mu.index)
+		dense = np.asarray(cov, dtype=np.float64) + np.eye(len(mu)) * epsilon
+		raw = _solve_psd(dense, mu.to_numpy())
+	w = _normalize_weights(raw, long_only, weights_sum_to_one)
+	return pd.Series(w, index=mu.index)
+
+
+def _project_simplex(V: np.ndarray, mask: np.ndarray) -> np.ndarray:
+	"""Row-wise Euclidean projection onto {w >= 0, sum(w) = 1}, with masked-out entries fixed at 0."""
+	n = V.shape[1]
+	U = np.where(mask, V, -np.inf)
+	S = -np.sort(-U, axis=1)
+	finite = np.isfinite(S)
+	css = np.cumsum(np.where(finite, S, 0.0), axis=1) - 1.0
+	cond = finite & (S - css / np.arange(1, n + 1) > 0)
+	rho = n - 1 - np.argmax(cond[:, ::-1], axis=1)
+	theta = css[np.arange(len(V)), rho] / (rho + 1)
+	return np.where(mask, np.maximum(V - theta[:, None], 0.0), 0.0)
+
+
+@instrument(rows=result_len)
+def batch_mean_variance(
+	mus: np.ndarray,
+	covs: Union[np.ndarray, FactorCovariance],
+	risk_aversion=1.0,
+	long_only: bool = True,
+	mask: Optional[np.ndarray] = None,
+	epsilon: float = 1e-8,
+	max_iter: int = 2000,
+	tol: float = 1e-10,
+) -> np.ndarray:
+	"""Solve a stack of mean-variance problems at once.
+
+	Each problem is ``min (risk_aversion / 2) w' C w - mu' w`` subject to
+	``sum(w) = 1`` and, if ``long_only``, ``w >= 0``. Without the sign
+	constraint the KKT system is solved in closed form with batched linear
+	algebra; with it, accelerated projected gradient (FISTA with an exact
+	simplex projection and adaptive restart) runs on all problems together.
+
+	Args:
+		mus: Expected returns, shape (n_assets,) or (n_problems, n_assets)
+		covs: Covariances, shape (n_assets, n_assets) or (n_problems, n_assets, n_assets),
+			or one ``FactorCovariance`` shared by all problems (solved in
+			low-rank plus diagonal form, never densified)
+		risk_aversion: Scalar or array of shape (n_problems,)
+		long_only: Enforce ``w >= 0``
+		mask: Optional boolean (n_problems, n_assets) sub-universe selector;
+			assets outside a problem's universe get weight 0
+		epsilon: Ridge added to every covariance diagonal
+		max_iter: Iteration cap for the long-only solver
+		tol: Stop when no weight moves by more than this between iterations
+
+	Returns:
+		Weights of shape (n_problems, n_assets)
+
+	Warns:
+		RuntimeWarning: If the long-only solver stops at ``max_iter`` before
+			reaching ``tol``; the last iterate is returned
+	"""
+	mus = np.atleast_2d(np.asarray(mus, dtype=np.float64))
+	factor = isinstance(covs, FactorCovariance)
+	if not factor:
+		covs = np.asarray(covs, dtype=np.float64)
+	lam = np.atleast_1d(np.asarray(risk_aversion, dtype=np.float64))
+	n_assets = mus.shape[-1]
+	n_problems = max(len(mus), len(lam), len(covs) if not factor and covs.ndim == 3 else 1)
+	if mask is not None:
+		n_problems = max(n_problems, len(np.atleast_2d(mask)))
+	mus = np.broadcast_to(mus, (n_problems, n_assets))
+	lam = np.broadcast_to(lam, (n_problems,))
+	mask = np.broadcast_to(
+		np.ones(n_assets, dtype=bool) if mask is None else np.atleast_2d(np.asarray(mask, dtype=bool)),
+		(n_problems, n_assets),
+	)
+	if factor:
+		covs = covs.with_ridge(epsilon)
+	else:
+		covs = covs + np.eye(n_assets) * epsilon
+	shared_cov = factor or covs.ndim == 2
+
+	if not long_only:
+		# Excluded assets decouple: identity rows/columns, zero mean, zero budget weight.
+		m = mask.astype(np.float64)
+		rhs = np.stack([mus * m, m], axis=-1)
+		if factor:
+			# Zeroed loading rows and a unit specific variance give the same identity rows
+			loadings = covs.loadings * m[:, :, None]
+			sol = woodbury_solve(loadings, covs.factor_cov, covs.specific_var * m + (1.0 - m), rhs)
 		else:
-			w = w / w.sum()
-	if weights_sum_to_one:
-		w = w / w.sum()
-	return w
+			C = covs * (m[:, :, None] * m[:, None, :]) + np.eye(n_assets) * (1.0 - m)[:, None, :]
+			sol = np.linalg.solve(C, rhs)
+		inv_mu, inv_one = sol[..., 0], sol[..., 1]
+		gamma = ((m * inv_mu).sum(axis=1) - lam) / (m * inv_one).sum(axis=1)
+		return (inv_mu - gamma[:, None] * inv_one) / lam[:, None]
+
+	def hess_vec(Y: np.ndarray) -> np.ndarray:
+		if factor:
+			return covs.matvec(Y.T).T
+		return Y @ covs if shared_cov else np.einsum("bij,bj->bi", covs, Y)
+
+	top_eig = covs.max_eigenvalue() if factor else np.linalg.eigvalsh(covs)[..., -1]
+	step = 1.0 / (lam * np.broadcast_to(top_eig, (n_problems,)))
+	W = _project_simplex(np.zeros((n_problems, n_assets)), mask)
+	Y = W.copy()
+	t = np.ones(n_problems)
+	change = np.inf
+	for _ in range(max_iter):
+		grad = lam[:, None] * hess_vec(Y) - mus
+		W_next = _project_simplex(Y - step[:, None] * grad, mask)
+		t_next = (1.0 + np.sqrt(1.0 + 4.0 * t * t)) / 2.0
+		momentum = (t - 1.0) / t_next
+		# Adaptive restart: drop a problem's momentum once it points uphill
+		restart = np.einsum("bi,bi->b", Y - W_next, W_next - W) > 0
+		momentum[restart], t_next[restart] = 0.0, 1.0
+		Y = W_next + momentum[:, None] * (W_next - W)
+		change = np.max(np.abs(W_next - W))
+		W, t = W_next, t_next
+		if change < tol:
+			break
+	else:
+		warnings.warn(
+			f"Long-only solver did not converge in {max_iter} iterations "
+			f"(last weight change {change:.2e} > tol {tol:.0e})",
+			RuntimeWarning,
+		)
+	return W
+
+
+@instrument(rows=result_len)
+def efficient_frontier(
+	returns: pd.DataFrame,
+	risk_aversions,
+	long_only: bool = True,
+	epsilon: float = 1e-8,
+	cov: Optional[Covariance] = None,
+) -> pd.DataFrame:
+	"""Efficient frontier of ``returns`` traced over a range of risk-aversion values.
+
+	``cov`` replaces ``returns.cov()`` as in :func:`mean_variance_optimize`.
+
+	Returns:
+		DataFrame indexed by risk aversion with one weight column per asset plus
+		``expected_return`` and ``volatility`` (per period)
+	"""
+	mu = returns.mean().to_numpy()
+	if cov is None:
+		cov = returns.cov()
+	if isinstance(cov, pd.DataFrame):
+		cov = cov.reindex(index=returns.columns, columns=returns.columns)
+	if not isinstance(cov, FactorCovariance):
+		cov = np.asarray(cov, dtype=np.float64)
+	lam = np.asarray(risk_aversions, dtype=np.float64)
+	W = batch_mean_variance(mu, cov, lam, long_only=long_only, epsilon=epsilon)
+	frontier = pd.DataFrame(W, index=pd.Index(lam, name="risk_aversion"), columns=returns.columns)
+	frontier["expected_return"] = W @ mu
+	variance = cov.variance(W) if isinstance(cov, FactorCovariance) else np.einsum("bi,ij,bj->b", W, cov, W)
+	frontier["volatility"] = np.sqrt(variance)
+	return frontier
 
 
 def placeholder_weights() -> pd.Series:
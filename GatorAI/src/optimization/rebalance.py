@@ -0,0 +1,142 @@
+"""Walk-forward mean-variance rebalancing with incrementally updated window moments."""
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+	from ..backtesting.backtest_engine import BacktestResult, run_portfolio_backtest
+	from ..instrumentation import instrument
+except ImportError:  # src/ itself is on sys.path, so the subpackages are top-level
+	from backtesting.backtest_engine import BacktestResult, run_portfolio_backtest
+	from instrumentation import instrument
+
+from .optimizer import _normalize_weights, _solve_psd
+
+
+class RollingMoments:
+	"""Sum and cross-product of a sliding window, updated by adding and dropping rows.
+
+	Rows are shifted by a fixed reference (the first window's mean) before
+	accumulation, which keeps the ``C - n * mu mu'`` covariance formula well
+	conditioned.
+	"""
+
+	def __init__(self, reference: np.ndarray):
+		n_assets = len(reference)
+		self.reference = np.asarray(reference, dtype=np.float64)
+		self.n = 0
+		self.total = np.zeros(n_assets)
+		self.cross = np.zeros((n_assets, n_assets))
+
+	def add(self, rows: np.ndarray) -> None:
+		if len(rows):
+			X = rows - self.reference
+			self.n += len(X)
+			self.total += X.sum(axis=0)
+			self.cross += X.T @ X
+
+	def drop(self, rows: np.ndarray) -> None:
+		if len(rows):
+			X = rows - self.reference
+			self.n -= len(X)
+			self.total -= X.sum(axis=0)
+			self.cross -= X.T @ X
+
+	def mean(self) -> np.ndarray:
+		return self.reference + self.total / self.n
+
+	def covariance(self) -> np.ndarray:
+		shifted_mean = self.total / self.n
+		return (self.cross - self.n * np.outer(shifted_mean, shifted_mean)) / (self.n - 1)
+
+
+@instrument(rows=lambda w, returns, *args, **kwargs: len(returns))
+def walk_forward_weights(
+	returns: pd.DataFrame,
+	window: int = 252,
+	rebalance_every: int = 21,
+	long_only: bool = True,
+	weights_sum_to_one: bool = True,
+	epsilon: float = 1e-8,
+	resync_every: Optional[int] = 50,
+) -> pd.DataFrame:
+	"""Mean-variance weights re-estimated on a trailing window every ``rebalance_every`` rows.
+
+	Weights computed at row ``t`` use returns up to and including ``t`` and are
+	held until the next rebalance; rows before the first full window are zero.
+	Window mean and covariance are updated with the rows that entered and left
+	since the previous rebalance, and each solve uses a Cholesky factorization.
+
+	Args:
+		returns: Asset returns (time x assets) without missing values
+		window: Number of trailing rows used for estimation
+		rebalance_every: Rows between rebalances
+		long_only: Clip negative weights and renormalize (as ``mean_variance_optimize``)
+		weights_sum_to_one: Normalize weights to sum to one
+		epsilon: Ridge added to the covariance diagonal
+		resync_every: Recompute the window moments from scratch after this many
+			rebalances to bound floating-point drift (None: never)
+
+	Returns:
+		DataFrame of weights with the same index and columns as ``returns``
+
+	Raises:
+		ValueError: If returns contain NaN or the window is too short
+	"""
+	if window < 2 or rebalance_every < 1:
+		raise ValueError("window must be >= 2 and rebalance_every >= 1")
+	X = returns.to_numpy(dtype=np.float64)
+	if np.isnan(X).any():
+		raise ValueError("returns must not contain NaN; align or fill them first")
+
+	n_obs, n_assets = X.shape
+	weights = np.zeros((n_obs, n_assets))
+	ridge = np.eye(n_assets) * epsilon
+	moments: Optional[RollingMoments] = None
+	lo = hi = 0  # rows [lo, hi) are in the window
+	n_rebalances = 0
+
+	for t in range(window - 1, n_obs, rebalance_every):
+		new_lo, new_hi = t + 1 - window, t + 1
+		resync = resync_every is not None and n_rebalances % resync_every == 0
+		if moments is None or resync:
+			moments = RollingMoments(X[new_lo:new_hi].mean(axis=0))
+			moments.add(X[new_lo:new_hi])
+		else:
+			moments.add(X[hi:new_hi])
+			moments.drop(X[lo:new_lo])
+		lo, hi = new_lo, new_hi
+		n_rebalances += 1
+
+		raw = _solve_psd(moments.covariance() + ridge, moments.mean())
+		weights[t:t + rebalance_every] = _normalize_weights(raw, long_only, weights_sum_to_one)
+
+	return pd.DataFrame(weights, index=returns.index, columns=returns.columns)
+
+
+def walk_forward_backtest(
+	prices: pd.DataFrame,
+	window: int = 252,
+	rebalance_every: int = 21,
+	cost_bps: float = 0.0,
+	**weight_kwargs,
+) -> Tuple[pd.DataFrame, BacktestResult]:
+	"""Compute walk-forward weights from prices and backtest them as one portfolio.
+
+	Args:
+		prices: Price matrix (time x assets) without missing values
+		window: Number of trailing return rows used for estimation
+		rebalance_every: Rows between rebalances
+		cost_bps: Transaction costs in basis points per unit of turnover
+		**weight_kwargs: Passed to :func:`walk_forward_weights`
+
+	Returns:
+		Tuple of the weight matrix (aligned to ``prices``) and the portfolio BacktestResult
+	"""
+	returns = prices.pct_change().iloc[1:]
+	weights = walk_forward_weights(returns, window=window, rebalance_every=rebalance_every, **weight_kwargs)
+	weights = weights.reindex(prices.index, fill_value=0.0)
+	return weights, run_portfolio_backtest(prices, weights, cost_bps=cost_bps)
@@ -1,19 +1,240 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, replace
+from typing import Optional
+
 import numpy as np
 import pandas as pd
+from scipy.signal import lfilter
+from sklearn.covariance import OAS, LedoitWolf
+
+try:
+	from ..instrumentation import instrument
+except ImportError:  # src/ itself is on sys.path, so the subpackages are top-level
+	from instrumentation import instrument
 
 
 def sample_covariance(returns: pd.DataFrame) -> pd.DataFrame:
 	return returns.cov()
 
 
-def ewma_covariance(returns: pd.DataFrame, lambda_: float = 0.94) -> pd.DataFrame:
-	# RiskMetrics-style EWMA covariance
+def _shrunk_covariance(estimator, returns: pd.DataFrame) -> pd.DataFrame:
+	X = returns.dropna().to_numpy(dtype=np.float64)
+	fit = estimator.fit(X)
+	cov = pd.DataFrame(fit.covariance_, index=returns.columns, columns=returns.columns)
+	cov.attrs["shrinkage"] = float(fit.shrinkage_)
+	return cov
+
+
+@instrument(rows=lambda cov, returns, *args, **kwargs: len(returns))
+def ledoit_wolf_covariance(returns: pd.DataFrame) -> pd.DataFrame:
+	"""Ledoit-Wolf shrinkage of the sample covariance towards a scaled identity.
+
+	Rows with a missing return are dropped. As in sklearn's ``LedoitWolf``, the
+	sample covariance is the maximum-likelihood one (divided by n_obs); the
+	fitted shrinkage intensity is in ``cov.attrs["shrinkage"]``.
+	"""
+	return _shrunk_covariance(LedoitWolf(store_precision=False), returns)
+
+
+@instrument(rows=lambda cov, returns, *args, **kwargs: len(returns))
+def oas_covariance(returns: pd.DataFrame) -> pd.DataFrame:
+	"""Oracle Approximating Shrinkage covariance (sklearn's ``OAS``), as :func:`ledoit_wolf_covariance`."""
+	return _shrunk_covariance(OAS(store_precision=False), returns)
+
+
+def woodbury_solve(
+	loadings: np.ndarray,
+	factor_cov: np.ndarray,
+	specific_var: np.ndarray,
+	b: np.ndarray,
+) -> np.ndarray:
+	"""Solve ``(B F B' + diag(d)) x = b`` without forming the n x n matrix.
+
+	Uses ``S^-1 = D^-1 - D^-1 B (I + F B' D^-1 B)^-1 F B' D^-1``, which needs a
+	k x k solve only and stays valid for a singular ``F``. Leading axes
+	broadcast, so a stack of problems with their own loadings is solved at once.
+
+	Args:
+		loadings: B, shape (..., n_assets, n_factors)
+		factor_cov: F, shape (n_factors, n_factors)
+		specific_var: d, shape (..., n_assets), all positive
+		b: Right-hand sides, shape (..., n_assets) or (..., n_assets, n_rhs)
+
+	Returns:
+		x with the shape of ``b``
+	"""
+	vector = b.ndim == specific_var.ndim
+	rhs = b[..., None] if vector else b
+	inv_d = 1.0 / specific_var[..., None]
+	scaled_b = rhs * inv_d  # D^-1 b
+	scaled_loadings = loadings * inv_d  # D^-1 B
+	loadings_t = np.swapaxes(loadings, -1, -2)
+	k = factor_cov.shape[-1]
+	capacitance = np.eye(k) + factor_cov @ (loadings_t @ scaled_loadings)
+	inner = np.linalg.solve(capacitance, factor_cov @ (loadings_t @ scaled_b))
+	x = scaled_b - scaled_loadings @ inner
+	return x[..., 0] if vector else x
+
+
+@dataclass
+class FactorCovariance:
+	"""Covariance in low-rank plus diagonal form, ``B F B' + diag(d)``.
+
+	Memory and the cost of a solve or product are O(n_assets * n_factors^2)
+	rather than O(n_assets^2) and O(n_assets^3), so the optimizers can work
+	on universes of thousands of assets without the dense matrix.
+	"""
+	loadings: np.ndarray  # B, (assets, factors)
+	factor_cov: np.ndarray  # F, (factors, factors)
+	specific_var: np.ndarray  # d, (assets,)
+	assets: Optional[pd.Index] = None
+
+	@property
+	def n_assets(self) -> int:
+		return len(self.specific_var)
+
+	@property
+	def n_factors(self) -> int:
+		return self.factor_cov.shape[0]
+
+	def with_ridge(self, epsilon: float) -> "FactorCovariance":
+		"""Copy with ``epsilon`` added to the diagonal."""
+		return replace(self, specific_var=self.specific_var + epsilon)
+
+	def matvec(self, x: np.ndarray) -> np.ndarray:
+		"""``S @ x`` for x of shape (n_assets,) or (n_assets, m)."""
+		d = self.specific_var if x.ndim == 1 else self.specific_var[:, None]
+		return self.loadings @ (self.factor_cov @ (self.loadings.T @ x)) + d * x
+
+	def solve(self, b: np.ndarray) -> np.ndarray:
+		"""``S^-1 @ b`` by the Woodbury identity (see :func:`woodbury_solve`)."""
+		return woodbury_solve(self.loadings, self.factor_cov, self.specific_var, np.asarray(b, dtype=np.float64))
+
+	def variance(self, weights: np.ndarray) -> np.ndarray:
+		"""Portfolio variance ``w' S w`` of weights shaped (n_assets,) or (n_portfolios, n_assets)."""
+		W = np.atleast_2d(weights)
+		exposures = W @ self.loadings
+		var = np.einsum("pk,kl,pl->p", exposures, self.factor_cov, exposures) + (W * W) @ self.specific_var
+		return var if np.ndim(weights) == 2 else var[0]
+
+	def max_eigenvalue(self) -> float:
+		"""Upper bound on the largest eigenvalue: ``max(d) + lambda_max(B F B')`` (Weyl)."""
+		eigval, eigvec = np.linalg.eigh(self.factor_cov)
+		root = self.loadings @ (eigvec * np.sqrt(np.maximum(eigval, 0.0)))
+		top = np.linalg.eigvalsh(root.T @ root)[-1] if self.n_factors else 0.0
+		return float(top + self.specific_var.max())
+
+	def to_dense(self) -> pd.DataFrame:
+		"""The full n x n matrix; for checks and small universes only."""
+		cov = self.loadings @ self.factor_cov @ self.loadings.T + np.diag(self.specific_var)
+		assets = self.assets if self.assets is not None else pd.RangeIndex(self.n_assets)
+		return pd.DataFrame(cov, index=assets, columns=assets)
+
+
+def _top_components(X: np.ndarray, k: int):
+	"""Leading ``k`` singular values and right singular vectors of X, from the smaller Gram matrix."""
+	n_obs, n_assets = X.shape
+	if n_obs < n_assets:
+		eigval, U = np.linalg.eigh(X @ X.T)
+		eigval, U = eigval[::-1][:k], U[:, ::-1][:, :k]
+		s = np.sqrt(np.maximum(eigval, 0.0))
+		V = (X.T @ U) / np.where(s > 0, s, 1.0)
+	else:
+		eigval, V = np.linalg.eigh(X.T @ X)
+		eigval, V = eigval[::-1][:k], V[:, ::-1][:, :k]
+		s = np.sqrt(np.maximum(eigval, 0.0))
+	return s, V
+
+
+@instrument(rows=lambda cov, returns, *args, **kwargs: len(returns))
+def factor_covariance(
+	returns: pd.DataFrame,
+	n_factors: int = 10,
+	min_specific: float = 0.01,
+) -> FactorCovariance:
+	"""Statistical (PCA) factor model of the sample covariance.
+
+	The factors are the leading principal components of the demeaned returns,
+	so ``F`` is diagonal and ``B`` orthonormal; each asset's specific variance
+	is its sample variance minus the part the factors explain. Missing returns
+	are set to the column mean.
+
+	Args:
+		returns: Returns (time x assets)
+		n_factors: Number of principal components kept (capped by the data rank)
+		min_specific: Floor on the specific variance, as a fraction of each
+			asset's sample variance; keeps ``diag(d)`` positive definite
+
+	Returns:
+		FactorCovariance whose diagonal matches the sample variances
+	"""
+	if n_factors < 0:
+		raise ValueError("n_factors must be >= 0")
+	X = (returns - returns.mean()).fillna(0.0).to_numpy(dtype=np.float64)
+	n_obs, n_assets = X.shape
+	if n_obs < 2:
+		raise ValueError("Need at least 2 observations for a factor covariance")
+	k = min(n_factors, n_obs - 1, n_assets)
+	s, V = _top_components(X, k)
+	factor_var = s * s / (n_obs - 1)
+	total_var = (X * X).sum(axis=0) / (n_obs - 1)
+	explained = (V * V) @ factor_var
+	floor = np.maximum(min_specific * total_var, np.finfo(np.float64).tiny)
+	specific = np.maximum(total_var - explained, floor)
+	return FactorCovariance(loadings=V, factor_cov=np.diag(factor_var), specific_var=specific, assets=returns.columns)
+
+
+@instrument(rows=lambda cov, returns, *args, **kwargs: len(returns))
+def ewma_covariance(returns: pd.DataFrame, lambda_: float = 0.94, chunk_size: int = 256) -> pd.DataFrame:
+	"""RiskMetrics-style EWMA covariance of demeaned returns.
+
+	Observation ``t`` of ``n`` gets weight ``lambda_ ** (n - 1 - t)``, normalized
+	to sum to one. The weighted cross-product is accumulated recursively over
+	blocks of ``chunk_size`` rows, so memory is O(chunk_size * n_assets +
+	n_assets ** 2) regardless of the number of observations.
+	"""
 	ret = returns - returns.mean()
-	weights = np.array([lambda_ ** i for i in range(len(ret))][::-1])
-	weights = weights / weights.sum()
-	X = ret.values
-	w_diag = np.diag(weights)
-	cov = X.T @ w_diag @ X
+	X = ret.to_numpy(dtype=np.float64)
+	n_assets = X.shape[1]
+	S = np.zeros((n_assets, n_assets))
+	total_weight = 0.0
+	for start in range(0, len(X), chunk_size):
+		block = X[start:start + chunk_size]
+		w = lambda_ ** np.arange(len(block) - 1, -1, -1, dtype=np.float64)
+		decay = lambda_ ** len(block)
+		S = decay * S + (block * w[:, None]).T @ block
+		total_weight = decay * total_weight + w.sum()
+	cov = S / total_weight if total_weight > 0 else np.full((n_assets, n_assets), np.nan)
 	return pd.DataFrame(cov, index=returns.columns, columns=returns.columns)
+
+
+def ewma_covariance_series(
+	returns: pd.DataFrame,
+	lambda_: float = 0.94,
+	demean: bool = False,
+	chunk_size: int = 256,
+) -> np.ndarray:
+	"""EWMA covariance at every observation, as a (time x assets x assets) array.
+
+	Entry ``t`` uses observations up to and including ``t`` only, so the series
+	can drive rolling-risk backtests. With ``demean=True`` returns are centred on
+	the full-sample mean (look-ahead) and the last entry equals
+	:func:`ewma_covariance`.
+	"""
+	ret = returns - returns.mean() if demean else returns
+	X = ret.to_numpy(dtype=np.float64)
+	n_obs, n_assets = X.shape
+	out = np.empty((n_obs, n_assets, n_assets))
+	S = np.zeros((1, n_assets, n_assets))
+	total_weight = np.zeros(1)
+	for start in range(0, n_obs, chunk_size):
+		block = X[start:start + chunk_size]
+		outer = block[:, :, None] * block[:, None, :]
+		# S_t = lambda * S_{t-1} + x_t x_t', run along the time axis of the block
+		S_block, _ = lfilter([1.0], [1.0, -lambda_], outer, axis=0, zi=lambda_ * S)
+		W_block, _ = lfilter([1.0], [1.0, -lambda_], np.ones(len(block)), zi=lambda_ * total_weight)
+		out[start:start + len(block)] = S_block / W_block[:, None, None]
+		S = S_block[-1:]
+		total_weight = W_block[-1:]
+	return out
@@ -7,7 +7,17 @@ src_path = str(root / "src")
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
-from backtesting.backtest_engine import run_vectorized_backtest
+from backtesting.backtest_engine import run_batched_backtest, run_vectorized_backtest
+from backtesting.bootstrap import bootstrap_metrics, stationary_bootstrap_indices
+from backtesting.downsample import MultiResolutionSeries, downsample, lttb_indices
+from backtesting.event_engine import TradeLog, run_event_backtest
+from backtesting.indicators import IndicatorCache, bollinger, cached_indicator, ema, rolling_std, rsi, sma
+from backtesting.metrics import compute_metrics, max_drawdown
+from backtesting.streaming import iter_price_chunks, run_streaming_backtest
+from backtesting.strategies import family_positions
+import backtesting.sweep as sweep_module
+from backtesting.sweep import run_parameter_sweep
+import numpy as np
 import pandas as pd
 
 
@@ -17,3 +27,324 @@ def test_backtest_runs():
 	res = run_vectorized_backtest(prices, signal)
 	assert hasattr(res, "equity_curve")
 	assert len(res.equity_curve) == 4
+
+
+def test_batched_backtest_matches_single_series():
+	rng = np.random.default_rng(0)
+	idx = pd.date_range("2020-01-01", periods=50, freq="B")
+	prices = pd.DataFrame(100 * np.cumprod(1 + rng.normal(0, 0.01, (50, 3)), axis=0), index=idx, columns=["A", "B", "C"])
+	signals = pd.DataFrame(rng.integers(0, 2, (50, 3)).astype(float), index=idx, columns=prices.columns)
+	batch = run_batched_backtest(prices, signals, cost_bps=5.0)
+	for col, res in zip(prices.columns, batch.to_results()):
+		single = run_vectorized_backtest(prices[col], signals[col], cost_bps=5.0)
+		np.testing.assert_allclose(res.equity_curve.values, single.equity_curve.values)
+		for key in ("cagr", "vol", "sharpe"):
+			assert abs(res.stats[key] - single.stats[key]) < 1e-10
+
+	stacked = run_batched_backtest(prices, np.stack([signals.values, 1.0 - signals.values]))
+	assert stacked.equity_curve.shape == (2, 50, 3)
+	assert len(stacked.stats_frame()) == 6
+
+
+def test_parameter_sweep_ranks_and_matches_engine():
+	rng = np.random.default_rng(1)
+	prices = pd.Series(100 * np.cumprod(1 + rng.normal(0.0003, 0.01, 400)), index=pd.date_range("2020-01-01", periods=400, freq="B"))
+	ranges = {"fast": range(5, 30, 5), "slow": range(20, 80, 10)}
+	res = run_parameter_sweep(prices, "ma_crossover", ranges, cost_bps=1.0)
+	assert (res["fast"] < res["slow"]).all()
+	assert res["sharpe"].is_monotonic_decreasing
+
+	best = res.iloc[0]
+	signal = (prices.rolling(int(best["fast"])).mean() > prices.rolling(int(best["slow"])).mean()).astype(float)
+	single = run_vectorized_backtest(prices, signal, cost_bps=1.0)
+	assert abs(single.stats["sharpe"] - best["sharpe"]) < 1e-5
+
+	pruned = run_parameter_sweep(prices, "ma_crossover", ranges, cost_bps=1.0, prune_quantile=0.5)
+	assert len(pruned) <= len(res)
+
+	family_ranges = {
+		"rsi": ({"window": [7, 14], "lower": [25, 30], "upper": [70, 75]}, 8),
+		"macd": ({"fast": [8, 12], "slow": [26], "signal": [9]}, 2),
+		"bollinger": ({"window": [10, 20], "num_std": [1.5, 2.0]}, 4),
+	}
+	for family, (family_range, n_sets) in family_ranges.items():
+		assert len(run_parameter_sweep(prices, family, family_range)) == n_sets
+
+
+def test_compute_metrics_matches_pandas_reference():
+	"""Fused kernel agrees with straightforward pandas calculations, column by column."""
+	rng = np.random.default_rng(3)
+	idx = pd.date_range("2020-01-01", periods=300, freq="B")
+	rets = pd.DataFrame(rng.normal(0.0003, 0.01, (300, 4)), index=idx, columns=list("ABCD"))
+	rets.iloc[::7] = 0.0
+	table = compute_metrics(rets)
+	assert list(table.index) == list("ABCD")
+
+	for col in rets.columns:
+		r = rets[col]
+		equity = (1.0 + r).cumprod()
+		row = table.loc[col]
+		assert np.isclose(row["vol"], r.std() * np.sqrt(252))
+		assert np.isclose(row["sharpe"], r.mean() * 252 / (r.std() * np.sqrt(252)))
+		downside = np.sqrt((r.clip(upper=0.0) ** 2).mean())
+		assert np.isclose(row["sortino"], r.mean() * 252 / (downside * np.sqrt(252)))
+		assert np.isclose(row["max_drawdown"], max_drawdown(equity))
+		assert np.isclose(row["calmar"], row["cagr"] / abs(row["max_drawdown"]))
+		assert np.isclose(row["hit_rate"], (r > 0).sum() / (r != 0).sum())
+		drawdown = equity / equity.cummax() - 1.0
+		trough = drawdown.idxmin()
+		assert row["max_drawdown_start"] == equity[:trough].idxmax()
+		assert row["max_drawdown_start"] < row["max_drawdown_end"]
+
+	# 1-D input gives scalars; a stacked (strategies, time, assets) array keeps its leading axes
+	single = compute_metrics(rets["A"])
+	assert np.isclose(single["sharpe"], table.loc["A", "sharpe"])
+	stacked = compute_metrics(np.stack([rets.to_numpy()] * 3), axis=-2)
+	assert stacked["sharpe"].shape == (3, 4)
+	assert np.allclose(stacked["sharpe"][2], table["sharpe"].to_numpy())
+
+
+def test_vectorized_backtest_reports_extended_stats():
+	prices = pd.Series([100, 110, 99, 105, 120, 118], index=pd.date_range("2020-01-01", periods=6))
+	signal = pd.Series([1, 1, 1, 0, 1, 1], index=prices.index)
+	res = run_vectorized_backtest(prices, signal, cost_bps=10.0)
+	assert np.isclose(res.stats["max_drawdown"], max_drawdown(res.equity_curve))
+	assert res.stats["max_drawdown_start"] == prices.index[1]
+	assert np.isclose(res.stats["turnover"], 3 / 6 * 252)
+
+
+def test_event_backtest_fills_costs_and_trade_log():
+	idx = pd.date_range("2020-01-01", periods=6)
+	bars = pd.DataFrame({
+		"open": [10.0, 11.0, 12.0, 13.0, 14.0, 15.0],
+		"close": [10.5, 11.5, 12.5, 13.5, 14.5, 15.5],
+	}, index=idx)
+	signal = pd.Series([1, 1, 3, -1, 0, 0], index=idx)
+	res = run_event_backtest(
+		bars, signal, quantity=10, initial_cash=1000.0,
+		slippage_bps=100.0, commission_per_unit=0.1, max_position=20,
+	)
+	trades = res.trades.to_frame()
+	# Orders fill at the next open: +10 on bar 1, +10 (capped at 20) on bar 3, -30 on bar 4, +10 on bar 5
+	assert trades["bar"].tolist() == [1, 3, 4, 5]
+	assert trades["quantity"].tolist() == [10.0, 10.0, -30.0, 10.0]
+	assert trades["side"].tolist() == ["BUY", "BUY", "SELL", "BUY"]
+	assert np.allclose(trades["price"], [11.11, 13.13, 13.86, 15.15])
+	assert res.positions.tolist() == [0.0, 10.0, 10.0, 20.0, -10.0, 0.0]
+
+	# Closing 20 units bought at an average of 12.12 at 13.86; then covering 10 short at 15.15
+	assert np.allclose(trades["realized_pnl"], [0.0, 0.0, 20 * (13.86 - 12.12), 10 * (13.86 - 15.15)])
+	cash = 1000.0 - (10 * 11.11 + 10 * 13.13 - 30 * 13.86 + 10 * 15.15) - 0.1 * 60
+	assert np.isclose(res.cash.iloc[-1], cash)
+	assert np.isclose(res.stats["final_equity"], cash)
+	assert np.isclose(res.stats["realized_pnl"], cash - 1000.0 + res.stats["total_commission"])
+	assert res.stats["n_trades"] == 4
+
+
+def test_trade_log_grows_by_doubling():
+	log = TradeLog(capacity=2)
+	for i in range(5):
+		log.append(i, np.datetime64("2020-01-01"), 1.0, 10.0 + i, 0.0, 0.0, i + 1.0, 0.0)
+	assert len(log) == 5
+	assert len(log._data) == 8
+	assert log.to_frame()["price"].tolist() == [10.0, 11.0, 12.0, 13.0, 14.0]
+
+
+def test_streaming_backtest_matches_vectorized_across_chunk_sizes(tmp_path):
+	rng = np.random.default_rng(5)
+	idx = pd.date_range("2021-01-01", periods=1000, freq="h")
+	prices = pd.Series(100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.01, len(idx))), index=idx)
+	signal = (prices > prices.rolling(24, min_periods=1).mean()).astype(float)
+	expected = run_vectorized_backtest(prices, signal, cost_bps=5.0)
+
+	for size in (1, 37, 1000):
+		chunks = ((prices.iloc[i:i + size], signal.iloc[i:i + size]) for i in range(0, len(idx), size))
+		res = run_streaming_backtest(chunks, cost_bps=5.0, keep_series=True)
+		assert np.array_equal(res.equity_curve.to_numpy(), expected.equity_curve.to_numpy())
+		for key, value in expected.stats.items():
+			if isinstance(value, float):
+				assert np.isclose(res.stats[key], value, rtol=1e-10), key
+			else:
+				assert res.stats[key] == value, key
+
+	# Buy and hold straight from a file, read in chunks
+	path = tmp_path / "TEST_1h.csv"
+	pd.DataFrame({"datetime": idx, "adj_close": prices.to_numpy()}).to_csv(path, index=False)
+	res = run_streaming_backtest(iter_price_chunks(path, chunksize=64))
+	hold = run_vectorized_backtest(prices, pd.Series(1.0, index=idx))
+	assert res.stats["n_obs"] == 1000
+	assert res.returns.empty
+	assert np.isclose(res.stats["total_return"], hold.equity_curve.iloc[-1] - 1.0)
+	assert res.stats["max_drawdown_end"] == hold.stats["max_drawdown_end"]
+
+
+def test_indicators_match_pandas_on_panels_with_late_listings():
+	rng = np.random.default_rng(11)
+	panel = pd.DataFrame(100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.01, (200, 3)), axis=0), columns=list("XYZ"))
+	panel.iloc[:30, 1] = np.nan  # Y starts trading later
+
+	pd.testing.assert_frame_equal(sma(panel, 20), panel.rolling(20).mean(), check_exact=False)
+	pd.testing.assert_frame_equal(ema(panel, span=12), panel.ewm(span=12, adjust=False).mean(), check_exact=False)
+	delta = panel.diff()
+	gain = delta.clip(lower=0.0).ewm(alpha=1 / 14, adjust=False).mean()
+	loss = (-delta).clip(lower=0.0).ewm(alpha=1 / 14, adjust=False).mean()
+	expected = 100.0 - 100.0 / (1.0 + gain / loss)
+	expected.iloc[:14] = np.nan
+	expected.iloc[:44, 1] = np.nan
+	pd.testing.assert_frame_equal(rsi(panel, 14), expected, check_exact=False)
+
+
+def test_rolling_moments_stay_precise_on_long_high_priced_series():
+	from numpy.lib.stride_tricks import sliding_window_view
+
+	rng = np.random.default_rng(12)
+	prices = 1000.0 + np.cumsum(rng.normal(0.0, 0.01, 500_000))
+	windows = sliding_window_view(prices, 20)
+	np.testing.assert_allclose(rolling_std(prices, 20)[19:], windows.std(axis=1), rtol=1e-9)
+	np.testing.assert_allclose(sma(prices, 20)[19:], windows.mean(axis=1), rtol=1e-12)
+	assert np.isnan(rolling_std(prices, 20)[:19]).all()
+
+
+def test_indicators_reject_windows_below_one():
+	import pytest
+
+	x = np.linspace(100.0, 110.0, 50)
+	for func in (sma, rolling_std, rsi, bollinger):
+		for window in (0, -2):
+			with pytest.raises(ValueError, match="window"):
+				func(x, window)
+	with pytest.raises(ValueError, match="span"):
+		ema(x, span=0)
+	with pytest.raises(ValueError, match="alpha"):
+		ema(x, alpha=1.5)
+	assert np.allclose(sma(x, 1), x)
+
+
+def test_ema_carries_over_nans_inside_the_series():
+	np.testing.assert_allclose(ema(np.array([1.0, 2.0, np.nan, 3.0, 4.0, 5.0]), span=3), [1.0, 1.5, 1.5, 2.25, 3.125, 4.0625])
+	rng = np.random.default_rng(13)
+	panel = pd.DataFrame(100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.01, (120, 3)), axis=0), columns=list("XYZ"))
+	panel.iloc[:10, 0] = np.nan
+	panel.iloc[[40, 41, 77], 0] = np.nan
+	panel.iloc[60, 2] = np.nan
+	expected = panel.ewm(span=12, adjust=False, ignore_na=True).mean()
+	pd.testing.assert_frame_equal(ema(panel, span=12), expected, check_exact=False)
+	assert rsi(panel, 14).iloc[30:].notna().all().all()
+
+
+def test_indicator_cache_reuses_and_evicts():
+	rng = np.random.default_rng(12)
+	panel = pd.DataFrame(100.0 + rng.normal(0.0, 1.0, (100, 2)).cumsum(axis=0), columns=["A", "B"])
+	cache = IndicatorCache(max_entries=3)
+
+	first = cached_indicator("sma", panel, 10, cache=cache)
+	again = cached_indicator("sma", panel["A"], 10, cache=cache)
+	assert cache.info()["misses"] == 2 and cache.info()["hits"] == 1
+	pd.testing.assert_series_equal(again, first["A"])
+
+	# A new data version is a different key; the least recently used entry ("B") is evicted
+	cached_indicator("sma", panel["A"] + 1.0, 10, cache=cache)
+	cached_indicator("sma", panel["A"] * 2.0, 10, cache=cache)
+	assert len(cache) == 3
+	cached_indicator("sma", panel, 10, cache=cache)
+	assert cache.info()["misses"] == 5
+
+	# Strategy builders share the cache across calls on the same data
+	prices = panel["A"].to_numpy()
+	cache.clear()
+	family_positions("ma_crossover", prices, [(5, 20), (10, 20)], cache, ticker="A")
+	family_positions("ma_crossover", prices, [(5, 20)], cache, ticker="A")
+	assert cache.info() == {"entries": 3, "nbytes": 3 * prices.nbytes, "hits": 3, "misses": 3}
+
+
+
+def test_downsampling_keeps_extremes_and_shape():
+	rng = np.random.default_rng(13)
+	index = pd.date_range("2024-01-01", periods=50_000, freq="min")
+	equity = pd.Series(np.cumprod(1.0 + rng.normal(0.0, 0.001, len(index))), index=index)
+	equity.iloc[12_345] *= 0.5  # single-bar spike
+
+	reduced = downsample(equity, 1000)
+	assert len(reduced) <= 1002 and reduced.index.is_monotonic_increasing
+	assert reduced.min() == equity.min() and reduced.max() == equity.max()
+	assert reduced.index[0] == index[0] and reduced.index[-1] == index[-1]
+
+	picks = lttb_indices(equity.to_numpy(), 500)
+	assert len(picks) == 500 and picks[0] == 0 and picks[-1] == len(index) - 1
+	assert np.all(np.diff(picks) > 0)
+	assert len(downsample(equity.iloc[:100], 1000)) == 100
+
+	# Zooming in reads finer pyramid levels; the full range stays within budget
+	pyramid = MultiResolutionSeries(equity, min_points=1000)
+	full = pyramid.view(max_points=1000)
+	assert len(full) <= 1000 and full.min() == equity.min()
+	zoom = pyramid.view(index[1000], index[1500], max_points=1000)
+	pd.testing.assert_series_equal(zoom, equity.loc[index[1000]:index[1500]])
+
+
+def test_stationary_bootstrap_blocks_and_seeded_workers():
+	rows = stationary_bootstrap_indices(2000, 50, 10.0, np.random.default_rng(14))
+	assert rows.shape == (2000, 50) and rows.min() >= 0 and rows.max() < 2000
+	continues = np.diff(rows, axis=0) % 2000 == 1
+	assert 0.85 < continues.mean() < 0.95  # a new block starts with probability 1 / 10
+
+	rng = np.random.default_rng(15)
+	returns = pd.DataFrame(rng.normal(0.0005, 0.01, (750, 3)), columns=["a", "b", "c"])
+	serial = bootstrap_metrics(returns, n_paths=300, seed=7, max_bytes=2**20)
+	parallel = bootstrap_metrics(returns, n_paths=300, seed=7, max_bytes=2**20, max_workers=2)
+	for name, values in serial.samples.items():
+		assert values.shape == (300, 3)
+		np.testing.assert_array_equal(values, parallel.samples[name])
+
+	table = serial.intervals(0.9)
+	assert list(table.index.get_level_values("column").unique()) == ["a", "b", "c"]
+	assert (table["lower"] <= table["upper"]).all()
+	sharpe = table.loc[("a", "sharpe")]
+	assert sharpe["lower"] < sharpe["estimate"] < sharpe["upper"]
+	# Sharpe standard error of i.i.d. returns is about sqrt(periods_per_year / n_obs)
+	assert 0.7 < sharpe["std"] / np.sqrt(252 / 750) < 1.3
+
+	normal = bootstrap_metrics(returns["a"], n_paths=400, method="normal", seed=1, dtype="float64")
+	single = normal.intervals()
+	assert list(single.index) == list(serial.samples)
+	assert abs(normal.samples["vol"].mean() - single.loc["vol", "estimate"]) < 0.01
+
+
+def test_parameter_sweep_attaches_bootstrap_intervals():
+	rng = np.random.default_rng(16)
+	prices = pd.Series(100.0 * np.cumprod(1.0 + rng.normal(0.0003, 0.01, 500)))
+	results = run_parameter_sweep(
+		prices, "ma_crossover", {"fast": [5, 10], "slow": [20, 50]}, n_bootstrap=200, seed=3
+	)
+	assert len(results) == 4
+	for name in ("sharpe", "max_drawdown", "cagr"):
+		assert (results[f"{name}_lower"] <= results[f"{name}_upper"]).all()
+	assert (results["max_drawdown_upper"] <= 0).all()
+
+
+def test_bootstrap_draws_do_not_depend_on_batching(monkeypatch):
+	rng = np.random.default_rng(17)
+	returns = pd.DataFrame(rng.normal(0.0005, 0.01, (300, 4)), columns=list("abcd"))
+	full = bootstrap_metrics(returns, n_paths=150, seed=5, max_bytes=2**20)
+	part = bootstrap_metrics(returns[["c"]], n_paths=150, seed=5, max_bytes=2**30)
+	for name, values in full.samples.items():
+		np.testing.assert_allclose(values[:, 2], part.samples[name][:, 0], rtol=1e-6)
+
+	calls = []
+
+	def recording(net, *args, **kwargs):
+		calls.append((net, kwargs["seed"]))
+		return bootstrap_metrics(net, *args, **kwargs)
+
+	monkeypatch.setattr(sweep_module, "bootstrap_metrics", recording)
+	prices = pd.Series(100.0 * np.cumprod(1.0 + rng.normal(0.0003, 0.01, 300)))
+	ranges = {"fast": range(2, 30), "slow": range(10, 40)}
+	results = run_parameter_sweep(prices, "ma_crossover", ranges, n_bootstrap=20, seed=None)
+	assert len(results) > 512 and len(calls) == 2
+	seed = calls[0][1]
+	assert seed is not None and calls[1][1] == seed
+	# One draw over every row reproduces the per-batch intervals
+	whole = bootstrap_metrics(pd.concat([net for net, _ in calls], axis=1), 20, seed=seed).intervals()
+	for net, _ in calls:
+		batch = bootstrap_metrics(net, 20, seed=seed).intervals()
+		pd.testing.assert_frame_equal(batch, whole.loc[batch.index], rtol=1e-6)
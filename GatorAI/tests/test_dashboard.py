@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+# Add src to path for testing
+root = Path(__file__).resolve().parents[1]
+src_path = str(root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from dashboard import services
+import numpy as np
+import pandas as pd
+
+
+def _upload(n=300):
+	rng = np.random.default_rng(4)
+	close = 100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.01, n))
+	frame = pd.DataFrame({
+		"Date": pd.date_range("2022-01-03", periods=n, freq="B"),
+		"Open": close,
+		"Close": close,
+		"Volume": 1000,
+	})
+	return frame.to_csv(index=False).encode()
+
+
+def test_services_cache_backtests_on_file_hash_and_params():
+	services.clear_caches()
+	data = _upload()
+	digest = services.file_digest(data)
+	prices = services.load_prices(digest, "SPY_1d.csv", data)
+	assert list(prices["ticker"].unique()) == ["SPY"]
+	bars = services.ticker_bars(digest, "SPY", prices)
+
+	params = services.strategy_params("ma_crossover", 10, 30)
+	first = services.run_backtest(digest, "SPY", "ma_crossover", params, 1.0, 252, bars)
+	again = services.run_backtest(digest, "SPY", "ma_crossover", params, 1.0, 252, bars)
+	services.run_backtest(digest, "SPY", "rsi", services.strategy_params("rsi", 14, 30), 1.0, 252, bars)
+	pd.testing.assert_series_equal(first["equity"], again["equity"])
+	assert len(first["trades"]) > 0
+	assert services.trade_outcomes(first["trades"]).sum() == (first["trades"]["realized_pnl"] != 0).sum()
+
+	stats = services.cache_stats()
+	assert stats.loc["run_backtest"].tolist() == [3, 1, 2]
+	assert stats.loc["indicators", "misses"] == 3  # two SMAs and one RSI
+
+	services.clear_caches()
+	assert services.cache_stats().loc["indicators"].tolist() == [0, 0, 0]
+	services.run_backtest(digest, "SPY", "ma_crossover", params, 1.0, 252, bars)
+	assert services.cache_stats().loc["run_backtest", "misses"] == 1
+
+
+def test_parse_range():
+	import pytest
+
+	assert services.parse_range("10-50") == tuple(float(v) for v in range(10, 51, 5))
+	assert services.parse_range("5, 8, 13") == (5.0, 8.0, 13.0)
+	assert services.parse_range("1.5-2.5", max_values=3) == (1.5, 2.0, 2.5)
+	assert services.parse_range("0-5")[0] == 0.0
+	for text in ("0-5", "3, 0, 8"):
+		with pytest.raises(ValueError):
+			services.parse_range(text, minimum=1)
+
+
+def test_strategy_params_reject_crossed_rsi_bands():
+	import pytest
+
+	assert services.strategy_params("rsi", 14, 30) == (14, 30.0, 70.0)
+	for lower in (50, 80):
+		with pytest.raises(ValueError):
+			services.strategy_params("rsi", 14, lower)
+	for family, params in (("ma_crossover", (0, 30)), ("macd", (12, 0)), ("bollinger", (0, 2))):
+		with pytest.raises(ValueError):
+			services.strategy_params(family, *params)
@@ -8,7 +8,15 @@ src_path = str(root / "src")
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
-from backtesting.backtest_runner import run_csv_backtest
+from backtesting.backtest_engine import run_batched_backtest
+from backtesting.backtest_runner import run_csv_backtest, run_directory_backtest, run_panel_backtest
+from data.clean_data import clean_ohlcv
+from data.fetch_data import TokenBucket, fetch_ohlc
+from data.ingestion import DataSource, IngestionService, LocalFileSource, SyntheticSource
+from data.returns_panel import build_returns_panel
+from data.memmap_panel import build_price_panel, open_price_panel
+from data.store import partition_dir, read_ohlc, write_ohlc
+import numpy as np
 
 
 def test_placeholder_data_dirs():
@@ -38,3 +46,319 @@ def test_csv_reading():
 		# Skip test if data doesn't exist
 		import pytest
 		pytest.skip("No processed data found - run fetch_data.py first")
+
+
+def test_directory_backtest_reports_failures(tmp_path):
+	"""Parallel runner collects stats per file and records failures."""
+	idx = pd.date_range("2020-01-01", periods=30, freq="B")
+	for i, t in enumerate(["AAA", "BBB", "CCC"]):
+		prices = 100 + i + pd.Series(range(30), dtype=float)
+		pd.DataFrame({"datetime": idx, "adj_close": prices}).to_csv(tmp_path / f"{t}_1d.csv", index=False)
+	pd.DataFrame({"datetime": idx, "close": 1.0}).to_csv(tmp_path / "BAD_1d.csv", index=False)
+
+	res = run_directory_backtest(tmp_path, max_workers=2, cost_bps=1.0)
+	assert len(res) == 4
+	assert res["error"].notna().sum() == 1
+	assert "Price column" in res.loc[str(tmp_path / "BAD_1d.csv"), "error"]
+	ok = res[res["error"].isna()]
+	assert (ok["n_obs"] == 30).all()
+	assert (ok["total_return"] > 0).all()
+
+
+def _fake_download(ticker, start, end, interval):
+	"""Offline stand-in for the yfinance download."""
+	idx = pd.date_range(start, end, freq="B", name="Date")
+	base = float(len(ticker))
+	return pd.DataFrame({
+		"Open": base, "High": base + 1, "Low": base - 1, "Close": base,
+		"Adj Close": base, "Volume": 1000,
+	}, index=idx)
+
+
+def test_concurrent_fetch_keeps_long_format(tmp_path):
+	calls = {}
+
+	def flaky_download(ticker, start, end, interval):
+		calls[ticker] = calls.get(ticker, 0) + 1
+		if ticker == "BAD":
+			raise ConnectionError("offline")
+		if ticker == "QQQ" and calls[ticker] == 1:
+			raise ConnectionError("transient")
+		return _fake_download(ticker, start, end, interval)
+
+	df = fetch_ohlc(
+		["SPY", "QQQ", "BAD", "IWM"], start="2024-01-01", end="2024-01-31",
+		max_workers=3, rate_limit=1000, retry_delay=0.01,
+		download_fn=flaky_download, output_dir=tmp_path,
+	)
+	assert list(df.columns) == ["ticker", "datetime", "open", "high", "low", "close", "adj_close", "volume"]
+	assert list(df["ticker"].unique()) == ["SPY", "QQQ", "IWM"]
+	assert calls["QQQ"] == 2 and calls["BAD"] == 3
+	assert (tmp_path / "IWM_1d.csv").exists() and not (tmp_path / "BAD_1d.csv").exists()
+
+
+def test_token_bucket_limits_rate():
+	import time
+	bucket = TokenBucket(rate=50, capacity=1)
+	t0 = time.monotonic()
+	for _ in range(6):
+		bucket.acquire()
+	assert time.monotonic() - t0 >= 0.09
+
+
+def test_incremental_fetch_appends_and_detects_adjustments(tmp_path):
+	fetch_ohlc(["SPY"], start="2024-01-01", end="2024-01-31", download_fn=_fake_download, output_dir=tmp_path)
+	path = tmp_path / "SPY_1d.csv"
+	n_before = len(pd.read_csv(path))
+	original, inode = path.read_bytes(), path.stat().st_ino
+	requested = []
+
+	def tracked(ticker, start, end, interval):
+		requested.append(start)
+		return _fake_download(ticker, start, end, interval)
+
+	new = fetch_ohlc(["SPY"], start="2024-01-01", end="2024-02-15", download_fn=tracked, output_dir=tmp_path, incremental=True)
+	stored = pd.read_csv(path)
+	assert requested[0] > "2024-01-20"
+	assert len(new) > 0 and len(stored) == n_before + len(new)
+	assert stored["datetime"].is_unique
+	# Appended in place: the old bytes are untouched and the file is not replaced
+	assert path.read_bytes().startswith(original) and path.stat().st_ino == inode
+
+	def adjusted(ticker, start, end, interval):
+		df = _fake_download(ticker, start, end, interval)
+		df["Adj Close"] = df["Adj Close"] * 0.5
+		return df
+
+	full = fetch_ohlc(["SPY"], start="2024-01-01", end="2024-02-15", download_fn=adjusted, output_dir=tmp_path, incremental=True)
+	assert len(full) == len(stored)
+	assert (pd.read_csv(path)["adj_close"] == 1.5).all()
+
+
+def test_csv_append_rolls_back_a_failed_write(tmp_path, monkeypatch):
+	import os
+	import pytest
+	from data.fetch_data import _append_csv
+
+	path = tmp_path / "SPY_1d.csv"
+	path.write_bytes(b"datetime,close\n2024-01-02,1.0")  # no trailing newline
+	_append_csv(pd.DataFrame({"datetime": ["2024-01-03"], "close": [2.0]}), path)
+	assert path.read_bytes() == b"datetime,close\n2024-01-02,1.0\n2024-01-03,2.0\n"
+
+	before = path.read_bytes()
+
+	def failing_fsync(fd):
+		raise OSError("disk full")
+
+	monkeypatch.setattr(os, "fsync", failing_fsync)
+	with pytest.raises(OSError):
+		_append_csv(pd.DataFrame({"datetime": ["2024-01-04"], "close": [3.0]}), path)
+	assert path.read_bytes() == before
+
+
+def test_columnar_store_roundtrip_and_pushdown(tmp_path):
+	df = fetch_ohlc(
+		["SPY"], start="2024-01-01", end="2024-01-31", download_fn=_fake_download,
+		output_dir=tmp_path, store_format="parquet", float_dtype="float32",
+	)
+	full = read_ohlc("SPY", "1d", root=tmp_path)
+	assert len(full) == len(df)
+	assert full["adj_close"].dtype == np.float32 and full["volume"].dtype == np.int64
+	assert isinstance(full.index, pd.DatetimeIndex)
+
+	window = read_ohlc("SPY", "1d", root=tmp_path, columns=["close"], start="2024-01-10", end="2024-01-12")
+	assert list(window.columns) == ["close"] and len(window) == 3
+
+	fetch_ohlc(
+		["SPY"], start="2024-01-01", end="2024-02-15", download_fn=_fake_download,
+		output_dir=tmp_path, store_format="parquet", float_dtype="float32", incremental=True,
+	)
+	parts = sorted(partition_dir("SPY", "1d", tmp_path).iterdir())
+	assert len(parts) == 2
+	assert read_ohlc("SPY", "1d", root=tmp_path).index.is_unique
+
+	stats = run_csv_backtest(partition_dir("SPY", "1d", tmp_path))
+	assert stats["n_obs"] == len(read_ohlc("SPY", "1d", root=tmp_path))
+	assert run_csv_backtest(partition_dir("SPY", "1d", tmp_path), date_col="date")["n_obs"] == stats["n_obs"]
+
+	write_ohlc(df, "SPY", "1d", root=tmp_path, fmt="feather")
+	assert len(read_ohlc("SPY", "1d", root=tmp_path, start="2024-01-10")) < len(df)
+
+
+def test_memmap_panel_zero_copy(tmp_path):
+	import pickle
+	long_df = fetch_ohlc(["SPY", "QQQ"], start="2024-01-01", end="2024-01-31", download_fn=_fake_download, output_dir=tmp_path)
+	extra = long_df[long_df["ticker"] == "SPY"].iloc[:5].assign(ticker="IWM")
+	panel = build_price_panel(pd.concat([long_df, extra]), tmp_path / "panel")
+
+	assert panel.shape == (len(long_df) // 2, 3, 6)
+	assert isinstance(panel.data, np.memmap) and not panel.data.flags.writeable
+	spy = panel.series("SPY")
+	assert np.shares_memory(spy.to_numpy(), panel.data)
+	assert panel.series("IWM").notna().sum() == 5
+
+	reopened = pickle.loads(pickle.dumps(panel))
+	assert isinstance(reopened.data, np.memmap)
+	assert reopened.frame("close", start="2024-01-10").index[0] == pd.Timestamp("2024-01-10")
+
+	res = run_panel_backtest(tmp_path / "panel", max_workers=2)
+	assert set(res.index) == {"SPY", "QQQ", "IWM"} and res["error"].isna().all()
+	assert res.loc["IWM", "n_obs"] == 5
+
+	from_csv = build_price_panel(tmp_path, tmp_path / "panel_csv")
+	assert from_csv.tickers == ["QQQ", "SPY"]
+	np.testing.assert_allclose(from_csv.series("SPY").to_numpy(), open_price_panel(tmp_path / "panel").series("SPY").to_numpy())
+
+	# Rebuilding replaces the files; the old map keeps its data
+	before = panel.series("SPY").to_numpy().copy()
+	rebuilt = build_price_panel(pd.concat([long_df, extra]).assign(adj_close=1.0), tmp_path / "panel")
+	np.testing.assert_array_equal(panel.series("SPY").to_numpy(), before)
+	assert (rebuilt.series("SPY") == 1.0).all()
+	assert sorted(p.name for p in (tmp_path / "panel").iterdir()) == ["dates.npy", "index.json", "panel.npy"]
+
+
+def test_clean_ohlcv_matches_per_ticker_pandas():
+	rng = np.random.default_rng(5)
+	frames = []
+	for ticker in ["SPY", "QQQ", "IWM"]:
+		close = 100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.01, 300))
+		frames.append(pd.DataFrame({
+			"ticker": ticker,
+			"datetime": pd.date_range("2024-01-01", periods=300, freq="h").astype(str),
+			"open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+			"adj_close": close, "volume": rng.integers(1, 1000, 300).astype(float),
+		}))
+	raw = pd.concat(frames, ignore_index=True)
+	raw.loc[rng.choice(len(raw), 40, replace=False), ["open", "high", "low", "close", "adj_close", "volume"]] = np.nan
+	raw.loc[[0, 300, 600], "close"] = np.nan  # first bar of each ticker cannot be filled
+	raw.loc[10, "high"] = raw.loc[10, "low"] * 0.5  # inverted bar
+	raw.loc[20, ["open", "high", "low", "close", "adj_close"]] *= 3.0  # spike
+	duplicates = raw.iloc[[5, 305]].assign(volume=-1.0)
+	shuffled = pd.concat([raw.sample(frac=1.0, random_state=0), duplicates])
+
+	out = clean_ohlcv(shuffled, float_dtype="float32")
+
+	expected = raw.assign(datetime=pd.to_datetime(raw["datetime"], utc=True))
+	expected = expected.sort_values(["ticker", "datetime"], kind="stable")
+	expected.loc[expected.index.isin(duplicates.index), "volume"] = -1.0  # keep="last"
+	missing = expected["close"].isna()
+	prices = ["open", "high", "low", "close", "adj_close"]
+	expected[prices] = expected.groupby("ticker")[prices].ffill()
+	expected = expected[expected[prices].notna().all(axis=1)]
+	assert len(out) == len(expected) == 900 - 3
+	np.testing.assert_array_equal(out["ticker"], expected["ticker"])
+	np.testing.assert_array_equal(out["datetime"], expected["datetime"])
+	np.testing.assert_allclose(out["close"], expected["close"], rtol=1e-6)
+	assert out["close"].dtype == np.float32 and out["volume"].dtype == np.int64
+	assert str(out["datetime"].dt.tz) == "UTC"
+
+	assert out["filled"].sum() == missing.loc[expected.index].sum()
+	assert (out.loc[out["filled"], "volume"] == 0).all()
+	flagged = set(out.loc[out["bad_ohlc"], "datetime"].astype(str) + out.loc[out["bad_ohlc"], "ticker"])
+	assert str(expected.loc[10, "datetime"]) + "SPY" in flagged
+	assert out["outlier"].sum() == 2  # the spike and the reversal after it
+
+	# Rows without a ticker are dropped, not attributed to the last ticker
+	orphans = raw.iloc[[700, 701]].assign(ticker=np.nan, close=1.0)
+	with_orphans = clean_ohlcv(pd.concat([shuffled, orphans]).astype({"ticker": "str"}), float_dtype="float32")
+	pd.testing.assert_frame_equal(with_orphans, out)
+	assert len(clean_ohlcv(shuffled, drop_invalid=True)) == len(out) - out["bad_ohlc"].sum()
+
+
+def test_returns_panel_calendars_and_disk_cache(tmp_path):
+	rng = np.random.default_rng(6)
+	dates = pd.date_range("2024-01-01", periods=60, freq="D", tz="UTC")
+	frames = []
+	for ticker, first in [("SPY", 0), ("QQQ", 10)]:
+		close = 100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.01, 60 - first))
+		frames.append(pd.DataFrame({"ticker": ticker, "datetime": dates[first:], "adj_close": close}))
+	long = pd.concat(frames, ignore_index=True)
+	long = long.drop(index=[20]).sample(frac=1.0, random_state=1)  # SPY misses one bar
+
+	panel = build_returns_panel(long, cache_dir=tmp_path)
+	wide = long.pivot(index="datetime", columns="ticker", values="adj_close")[panel.tickers]
+	expected = wide.ffill()
+	pd.testing.assert_frame_equal(panel.price_frame(), expected, check_names=False, check_freq=False, check_index_type=False)
+	pd.testing.assert_frame_equal(
+		panel.returns_frame(), expected.pct_change(fill_method=None).iloc[1:], check_names=False, check_freq=False, check_index_type=False
+	)
+	np.testing.assert_allclose(panel.returns_frame("log"), np.log(expected).diff().iloc[1:])
+
+	# Same content and options map to the same memory-mapped cache entry
+	again = build_returns_panel(long.copy(), cache_dir=tmp_path)
+	assert again.key == panel.key and isinstance(again.prices, np.memmap)
+	build_returns_panel(long.assign(adj_close=long["adj_close"] * 2.0), cache_dir=tmp_path)
+	assert len(list(tmp_path.iterdir())) == 2
+
+	common = build_returns_panel(long, calendar="intersection", cache_dir=None)
+	assert common.shape == (49, 2) and not np.isnan(common.prices).any()
+
+	# The batched engine consumes the precomputed returns directly
+	signals = np.ones(panel.shape)
+	direct = run_batched_backtest(np.asarray(panel.prices), signals)
+	shared = run_batched_backtest(panel.prices, signals, returns=panel.simple)
+	np.testing.assert_allclose(shared.equity_curve, direct.equity_curve)
+
+
+def test_ingestion_service_appends_and_publishes_offline(tmp_path):
+	import asyncio
+
+	class CountingSource(SyntheticSource):
+		in_flight = peak = 0
+
+		async def fetch(self, ticker, start, end, interval):
+			if ticker == "BAD":
+				raise ConnectionError("offline")
+			CountingSource.in_flight += 1
+			CountingSource.peak = max(CountingSource.peak, CountingSource.in_flight)
+			try:
+				return await super().fetch(ticker, start, end, interval)
+			finally:
+				CountingSource.in_flight -= 1
+
+	source = CountingSource(latency=0.01)
+	tickers = [f"T{i:02d}" for i in range(12)] + ["BAD"]
+	service = IngestionService(source, tickers, root=tmp_path / "store", max_concurrency=3)
+	events, invalidated = [], []
+
+	async def invalidate(event):
+		invalidated.append(event.ticker)
+
+	service.subscribe(events.append)
+	service.subscribe(invalidate)
+
+	first = asyncio.run(service.run_once(end="2024-01-31"))
+	assert len(first) == 12 and all(e.replaced for e in first)
+	assert service.failed == ["BAD"] and CountingSource.peak == 3
+	second = asyncio.run(service.run_once(end="2024-02-15"))
+	assert [e.rows for e in second] == [11] * 12 and not any(e.replaced for e in second)
+	assert asyncio.run(service.run_once(end="2024-02-15")) == []
+	assert len(events) == 24 and invalidated == [e.ticker for e in events]
+
+	stored = read_ohlc("T05", "1d", root=tmp_path / "store")
+	expected = source.bars("T05", None, "2024-02-15", "1d")
+	np.testing.assert_allclose(stored["adj_close"].to_numpy(), expected["adj_close"].to_numpy())
+	assert stored.index.is_unique and stored.index[-1] == pd.Timestamp("2024-02-15", tz="UTC")
+
+	source.bars("SPY", "2023-01-01", "2023-06-30", "1d").to_csv(tmp_path / "SPY_1d.csv", index=False)
+	local = IngestionService(LocalFileSource(tmp_path), ["SPY"], root=tmp_path / "local", start="2023-03-01")
+	asyncio.run(local.run(every=0.0, iterations=2))
+	assert len(read_ohlc("SPY", "1d", root=tmp_path / "local")) == len(pd.bdate_range("2023-03-01", "2023-06-30"))
+
+
+def test_synthetic_source_generates_only_the_requested_range():
+	import asyncio
+	import pytest
+
+	source = SyntheticSource(block=64)
+	full = source.bars("SPY", None, "2021-06-30", "1h")
+	expected = pd.date_range(source.origin, pd.Timestamp("2021-06-30", tz="UTC"), freq="h")
+	assert (full["datetime"].to_numpy() == expected[expected.dayofweek < 5].to_numpy()).all()
+	tail = asyncio.run(source.fetch("SPY", "2021-06-12 05:30", "2021-06-30", "1h"))
+	later = full[full["datetime"] >= pd.Timestamp("2021-06-12 05:30", tz="UTC")].reset_index(drop=True)
+	pd.testing.assert_frame_equal(tail, later)
+	assert (full["open"].iloc[1:].to_numpy() == full["close"].iloc[:-1].to_numpy()).all()
+	assert source.bars("SPY", "2022-01-01", "2021-06-30", "1h").empty
+
+	with pytest.raises(TypeError):
+		DataSource()
@@ -0,0 +1,83 @@
+import subprocess
+import sys
+import json
+from pathlib import Path
+
+# Add src to path for testing
+root = Path(__file__).resolve().parents[1]
+src_path = str(root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import instrumentation
+from backtesting.backtest_engine import run_vectorized_backtest
+from optimization.optimizer import mean_variance_optimize
+import numpy as np
+import pandas as pd
+
+
+def _prices(n=200):
+	rng = np.random.default_rng(0)
+	return pd.Series(100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.01, n)))
+
+
+def test_instrumentation_records_calls_and_rows(tmp_path):
+	"""Enabled instrumentation counts calls, rows and memory for decorated functions."""
+	instrumentation.reset()
+	instrumentation.enable(track_memory=True)
+	try:
+		price = _prices()
+		signal = (price > price.rolling(20, min_periods=1).mean()).astype(float)
+		run_vectorized_backtest(price, signal)
+		run_vectorized_backtest(price, signal)
+		rets = pd.DataFrame(np.random.default_rng(1).normal(0.0, 0.01, (50, 3)), columns=list("ABC"))
+		mean_variance_optimize(rets)
+		with instrumentation.span("custom_block", rows=7):
+			np.ones(10_000).sum()
+	finally:
+		instrumentation.disable()
+
+	rep = instrumentation.report()
+	bt = rep["backtesting.backtest_engine.run_vectorized_backtest"]
+	assert bt["calls"] == 2
+	assert bt["rows"] == 2 * len(price)
+	assert bt["total_time"] > 0 and bt["peak_memory"] > 0
+	assert rep["optimization.optimizer.mean_variance_optimize"]["rows"] == 50
+	assert rep["custom_block"]["rows"] == 7
+
+	out = tmp_path / "profile.json"
+	instrumentation.to_json(out)
+	assert json.loads(out.read_text()).keys() == rep.keys()
+
+
+def test_instrumentation_disabled_records_nothing():
+	instrumentation.reset()
+	assert not instrumentation.is_enabled()
+	price = _prices(50)
+	res = run_vectorized_backtest(price, pd.Series(1.0, index=price.index))
+	assert len(res.returns) == 50
+	assert instrumentation.report() == {}
+
+
+# Modules with cross-package imports, importable both as top-level packages (src on sys.path) and as GatorAI.src.*
+PACKAGE_MODULES = [
+	"backtesting.backtest_engine",
+	"backtesting.backtest_runner",
+	"backtesting.bootstrap",
+	"backtesting.event_engine",
+	"backtesting.streaming",
+	"optimization.optimizer",
+	"optimization.risk_models",
+	"optimization.ml_models",
+	"optimization.rebalance",
+	"optimization.feature_store",
+	"data.fetch_data",
+	"data.ingestion",
+]
+
+
+def test_modules_import_as_gatorai_package():
+	"""The notebooks import ``GatorAI.src.<package>``; that must not depend on src being on sys.path."""
+	imports = "; ".join(f"import GatorAI.src.{name}" for name in PACKAGE_MODULES)
+	proc = subprocess.run([sys.executable, "-c", imports], cwd=root.parent, capture_output=True, text=True)
+	assert proc.returncode == 0, proc.stderr
@@ -7,7 +7,18 @@ src_path = str(root / "src")
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
-from optimization.optimizer import mean_variance_optimize, placeholder_weights
+from optimization.feature_store import FeatureStore
+from optimization.ml_models import walk_forward_ridge
+from optimization.optimizer import batch_mean_variance, efficient_frontier, mean_variance_optimize, placeholder_weights
+from optimization.rebalance import walk_forward_backtest, walk_forward_weights
+from optimization.risk_models import (
+	ewma_covariance,
+	ewma_covariance_series,
+	factor_covariance,
+	ledoit_wolf_covariance,
+	oas_covariance,
+)
+import numpy as np
 import pandas as pd
 
 
@@ -33,3 +44,162 @@ def test_placeholder_weights():
 	assert abs(weights["SPY"] - 0.5) < 1e-6, f"SPY weight is {weights['SPY']}, not 0.5"
 	assert abs(weights["QQQ"] - 0.3) < 1e-6, f"QQQ weight is {weights['QQQ']}, not 0.3"
 	assert abs(weights["IWM"] - 0.2) < 1e-6, f"IWM weight is {weights['IWM']}, not 0.2"
+
+
+def test_ewma_covariance_matches_dense_weights():
+	rng = np.random.default_rng(3)
+	ret = pd.DataFrame(rng.normal(0, 0.01, (600, 4)), columns=list("ABCD"))
+	X = (ret - ret.mean()).values
+	w = 0.94 ** np.arange(len(X))[::-1]
+	expected = (X * (w / w.sum())[:, None]).T @ X
+	cov = ewma_covariance(ret, chunk_size=64)
+	np.testing.assert_allclose(cov.values, expected, rtol=1e-10, atol=1e-18)
+
+	series = ewma_covariance_series(ret, demean=True, chunk_size=50)
+	assert series.shape == (600, 4, 4)
+	np.testing.assert_allclose(series[-1], expected, rtol=1e-10, atol=1e-18)
+	prefix = ewma_covariance_series(ret.iloc[:100])
+	np.testing.assert_allclose(ewma_covariance_series(ret)[99], prefix[-1])
+
+
+def test_walk_forward_weights_match_static_optimizer():
+	rng = np.random.default_rng(4)
+	ret = pd.DataFrame(rng.normal(0.0005, 0.01, (300, 3)), columns=["SPY", "QQQ", "IWM"])
+	w = walk_forward_weights(ret, window=60, rebalance_every=20, resync_every=None)
+	assert (w.iloc[:59] == 0).all().all()
+	for t in (59, 139, 299):
+		expected = mean_variance_optimize(ret.iloc[t - 59:t + 1])
+		np.testing.assert_allclose(w.iloc[t].values, expected.values, atol=1e-8)
+
+	prices = 100 * (1 + ret).cumprod()
+	weights, res = walk_forward_backtest(prices, window=60, rebalance_every=20, cost_bps=2.0)
+	assert weights.index.equals(prices.index)
+	held = weights.shift(1).fillna(0)
+	manual = (held * prices.pct_change().fillna(0)).sum(axis=1) - held.diff().abs().fillna(0).sum(axis=1) * 2e-4
+	np.testing.assert_allclose(res.returns.values, manual.values, atol=1e-12)
+
+
+def test_batch_mean_variance_matches_scipy():
+	import warnings
+
+	import pytest
+	from scipy.optimize import minimize
+
+	rng = np.random.default_rng(5)
+	cov = np.cov(rng.normal(0, 0.01, (200, 6)).T)
+	mu = rng.normal(0.0005, 0.0005, 6)
+	lams = np.array([1.0, 20.0, 500.0])
+	with warnings.catch_warnings():
+		warnings.simplefilter("error", RuntimeWarning)
+		W = batch_mean_variance(mu, cov, lams)
+	assert np.allclose(W.sum(axis=1), 1.0) and (W >= 0).all()
+	with pytest.warns(RuntimeWarning, match="did not converge"):
+		batch_mean_variance(mu, cov, lams, max_iter=3)
+	for lam, w in zip(lams, W):
+		obj = lambda x: lam / 2 * x @ cov @ x - mu @ x
+		ref = minimize(obj, np.full(6, 1 / 6), method="SLSQP", bounds=[(0, None)] * 6,
+			constraints=[{"type": "eq", "fun": lambda x: x.sum() - 1}], options={"ftol": 1e-15, "maxiter": 500})
+		assert obj(w) <= ref.fun + 1e-10
+
+	mask = np.ones((2, 6), dtype=bool)
+	mask[1, :3] = False
+	sub = batch_mean_variance(mu, cov, 5.0, long_only=False, mask=mask)
+	assert np.allclose(sub.sum(axis=1), 1.0) and np.all(sub[1, :3] == 0)
+
+	ret = pd.DataFrame(rng.normal(0.0005, 0.01, (300, 4)), columns=list("ABCD"))
+	frontier = efficient_frontier(ret, np.logspace(0, 3, 50))
+	assert frontier["volatility"].is_monotonic_decreasing
+
+
+def test_walk_forward_ridge_matches_sklearn_refits():
+	from sklearn.linear_model import Ridge
+
+	rng = np.random.default_rng(8)
+	n_obs, tickers = 400, ["SPY", "QQQ", "IWM"]
+	index = pd.date_range("2022-01-03", periods=n_obs, freq="B")
+	features = {name: pd.DataFrame(rng.normal(0.0, 1.0, (n_obs, 3)), index=index, columns=tickers) for name in ("mom", "vol")}
+	target = 0.002 * features["mom"] - 0.001 * features["vol"] + rng.normal(0.0, 0.01, (n_obs, 3))
+	target.iloc[rng.random(target.shape) < 0.05] = np.nan
+	features["mom"].iloc[rng.random(target.shape) < 0.02] = np.nan
+
+	horizon, window, refit_every = 5, 120, 25
+	pred = walk_forward_ridge(
+		features, target, alpha=3.0, window=window, refit_every=refit_every, horizon=horizon, min_train=60, resync_every=4
+	)
+	assert pred.shape == target.shape and pred.iloc[:horizon + 59].isna().all().all()
+	X = np.stack([features["mom"].to_numpy(), features["vol"].to_numpy()], axis=-1)
+	y = target.to_numpy()
+	for t in (64, 164, 389):
+		hi = t - horizon + 1
+		lo = max(hi - window, 0)
+		for j in range(len(tickers)):
+			rows = ~(np.isnan(X[lo:hi, j]).any(axis=1) | np.isnan(y[lo:hi, j]))
+			model = Ridge(alpha=3.0).fit(X[lo:hi, j][rows], y[lo:hi, j][rows])
+			expected = model.predict(np.nan_to_num(X[t:t + 1, j]))[0]
+			if np.isnan(X[t, j]).any() or rows.sum() < 60:
+				assert np.isnan(pred.iloc[t, j])
+			else:
+				assert abs(pred.iloc[t, j] - expected) < 1e-12
+
+
+def test_feature_store_materializes_lazily_and_reuses_disk_cache(tmp_path):
+	rng = np.random.default_rng(9)
+	index = pd.date_range("2023-01-02", periods=300, freq="B", tz="UTC")
+	prices = pd.DataFrame(100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.01, (300, 3)), axis=0), index=index, columns=["SPY", "QQQ", "IWM"])
+
+	store = FeatureStore(prices, root=tmp_path)
+	store.define("ret", "returns").define("vol", "volatility", window=20).define("mom", "momentum", window=60, skip=5)
+	assert store.computed == 0 and not any(tmp_path.iterdir())
+
+	pd.testing.assert_frame_equal(store.get("vol"), prices.pct_change().rolling(20).std(ddof=0), check_freq=False)
+	pd.testing.assert_frame_equal(store.get("mom"), prices.shift(5) / prices.shift(60) - 1.0)
+	assert store.computed == 2
+
+	# A second store over the same prices reads the Parquet files instead of recomputing
+	again = FeatureStore(prices, root=tmp_path).define("vol", "volatility", window=20)
+	pd.testing.assert_frame_equal(again.get("vol"), store.get("vol"))
+	assert again.computed == 0
+	again.define("vol", "volatility", window=10)
+	again.get("vol")
+	assert again.computed == 1
+	other = FeatureStore(prices * 1.01, root=tmp_path)
+	assert other.version != store.version
+
+	# Feature matrices feed the forecasters directly
+	assert store.cube().shape == (300, 3, 3)
+	pred = walk_forward_ridge(store.features(), store.forward_returns(1), refit_every=50)
+	assert pred.shape == prices.shape and pred.iloc[-1].notna().all()
+	assert list(store.frame("SPY").columns) == ["ret", "vol", "mom"]
+
+
+def test_factor_covariance_woodbury_matches_dense():
+	from sklearn.covariance import LedoitWolf
+
+	rng = np.random.default_rng(6)
+	exposures = rng.normal(0, 1, (40, 3))
+	ret = pd.DataFrame(rng.normal(0, 0.01, (120, 3)) @ exposures.T + rng.normal(0.0004, 0.005, (120, 40)))
+	lw = ledoit_wolf_covariance(ret)
+	np.testing.assert_allclose(lw.values, LedoitWolf().fit(ret.values).covariance_)
+	assert 0 < lw.attrs["shrinkage"] < 1 and 0 < oas_covariance(ret).attrs["shrinkage"] < 1
+
+	fc = factor_covariance(ret, n_factors=3)
+	dense = fc.to_dense().values
+	np.testing.assert_allclose(np.diag(dense), ret.var().values)
+	b = rng.normal(size=(40, 2))
+	np.testing.assert_allclose(fc.solve(b), np.linalg.solve(dense, b), rtol=1e-8)
+	w = rng.dirichlet(np.ones(40), 5)
+	np.testing.assert_allclose(fc.variance(w), np.einsum("pi,ij,pj->p", w, dense, w))
+	assert fc.max_eigenvalue() >= np.linalg.eigvalsh(dense)[-1] - 1e-12
+
+	np.testing.assert_allclose(mean_variance_optimize(ret, cov=fc), mean_variance_optimize(ret, cov=fc.to_dense()), atol=1e-10)
+	mu = ret.mean().values
+	mask = np.ones((2, 40), dtype=bool)
+	mask[1, ::3] = False
+	np.testing.assert_allclose(
+		batch_mean_variance(mu, fc, 5.0, long_only=False, mask=mask),
+		batch_mean_variance(mu, dense, 5.0, long_only=False, mask=mask),
+		atol=1e-8,
+	)
+	frontier = efficient_frontier(ret, [1.0, 50.0, 1000.0], cov=fc)
+	expected = efficient_frontier(ret, [1.0, 50.0, 1000.0], cov=fc.to_dense())
+	np.testing.assert_allclose(frontier.values, expected.values, atol=1e-6)
@@ -0,0 +1,55 @@
+import json
+import sys
+from pathlib import Path
+
+# Add scripts (and src, which run_benchmarks adds itself) to path for testing
+root = Path(__file__).resolve().parents[1]
+scripts_path = str(root / "scripts")
+if scripts_path not in sys.path:
+    sys.path.insert(0, scripts_path)
+
+import generate_sample_data
+import run_benchmarks
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_generate_sample_data(tmp_path, monkeypatch):
+	ohlcv = generate_sample_data.synthetic_ohlcv(2, 50)
+	assert list(ohlcv.columns) == ["ticker", "datetime", "open", "high", "low", "close", "adj_close", "volume"]
+	assert len(ohlcv) == 100 and list(ohlcv["ticker"].unique()) == ["T0000", "T0001"]
+	assert (ohlcv["high"] >= ohlcv[["open", "close"]].max(axis=1)).all()
+	assert (ohlcv["low"] <= ohlcv[["open", "close"]].min(axis=1)).all()
+
+	monkeypatch.setattr(generate_sample_data, "EXAMPLES", tmp_path / "examples")
+	generate_sample_data.main()
+	written = sorted(p.name for p in (tmp_path / "examples").iterdir())
+	assert written == ["IWM_returns.csv", "QQQ_returns.csv", "SPY_returns.csv"]
+	spy = pd.read_csv(tmp_path / "examples" / "SPY_returns.csv", index_col=0)
+	assert list(spy.columns) == ["SPY"] and len(spy) == 30
+
+
+def test_run_benchmarks_run_and_compare(tmp_path, monkeypatch, capsys):
+	monkeypatch.setitem(run_benchmarks.TIERS, "tiny", (3, 200))
+	output = tmp_path / "current.json"
+	monkeypatch.setattr(sys, "argv", [
+		"run_benchmarks.py", "run", "--tiers", "tiny", "--repeat", "1", "--output", str(output), "--compare", str(output),
+	])
+	run_benchmarks.main()
+	report = json.loads(output.read_text())
+	assert "tiny/run_csv_backtest" in report["results"] and "numpy" in report["meta"]
+	assert all(np.isfinite(res["median"]) and res["repeat"] == 1 for res in report["results"].values())
+	assert run_benchmarks.compare(report, report, 0.25)
+
+	baseline = json.loads(output.read_text())
+	for res in baseline["results"].values():
+		res["median"] /= 10.0
+	(tmp_path / "baseline.json").write_text(json.dumps(baseline))
+	monkeypatch.setattr(sys, "argv", [
+		"run_benchmarks.py", "compare", str(tmp_path / "baseline.json"), str(output),
+	])
+	with pytest.raises(SystemExit) as exit_info:
+		run_benchmarks.main()
+	assert exit_info.value.code == 1
+	assert "REGRESSION" in capsys.readouterr().out